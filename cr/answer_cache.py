@@ -0,0 +1,61 @@
+"""On-disk cache of one-shot answers keyed by question, repo state and models."""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from . import config
+from .snapshot_cache import snapshot_key
+
+logger = logging.getLogger(__name__)
+
+
+def answer_key(
+    repo_path: str | Path,
+    question: str,
+    history: list[tuple[str, str]] | None = None,
+    repo_key: str | None = None,
+) -> str:
+    """Compute the cache key for a question about the repo's current state.
+
+    repo_key is the repository's snapshot_key, if the caller already computed it.
+    """
+    payload = json.dumps(
+        {
+            "question": question,
+            "history": history or [],
+            "snapshot": repo_key or snapshot_key(Path(repo_path).resolve()),
+            "models": [config.MAIN_MODEL, config.SUB_MODEL],
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_answer(key: str) -> tuple[str, list[str]] | None:
+    """Return the cached (answer, sources) for key, or None on a miss."""
+    cache_path = config.ANSWERS_DIR / f"{key}.json"
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data["answer"], data.get("sources", [])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable answer cache %s: %s", cache_path, e)
+        return None
+
+
+def save_answer(key: str, answer: str, sources: list[str]) -> None:
+    """Store an answer under key, ignoring write failures."""
+    cache_path = config.ANSWERS_DIR / f"{key}.json"
+    try:
+        config.ANSWERS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"answer": answer, "sources": sources}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Failed to write answer cache %s: %s", cache_path, e)
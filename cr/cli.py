@@ -2,45 +2,90 @@
 """CLI for Gemini RLM Codebase Review Tool."""
 
 import argparse
+import os
 import sys
+import threading
 from pathlib import Path
 
-from .render import (
-    console,
-    print_answer,
-    print_error,
-    print_files,
-    print_help,
-    print_history,
-    print_info,
-    print_repo_info,
-    print_step,
-    print_welcome,
-)
-from .rlm_runner import CodebaseReviewRLM
-from .snapshot import build_snapshot
-from .types import CodebaseSnapshot
+# REPL inputs that end the session
+QUIT_COMMANDS = frozenset({"quit", "exit", "q"})
 
 
 def run_interactive(repo_path: Path):
     """Run interactive Q&A mode."""
-    print_info("Building codebase snapshot...")
-    try:
-        snapshot = build_snapshot(repo_path)
-    except Exception as e:
-        print_error(f"Failed to build snapshot: {e}")
-        sys.exit(1)
+    # Imported here so `cr --help` and `cr serve` don't pay for rich/dspy
+    from .render import (
+        console,
+        print_answer,
+        print_error,
+        print_files,
+        print_help,
+        print_history,
+        print_info,
+        print_repo_info,
+        print_step,
+        print_welcome,
+    )
+    from .rlm_runner import CodebaseReviewRLM
+    from .snapshot_cache import load_or_build
 
-    print_welcome(str(repo_path), snapshot.repo_info["total_files"])
+    # Build the snapshot in the background so the prompt appears immediately;
+    # it is joined the first time a command or question needs it.
+    built: dict = {}
+    repo_str = str(repo_path)
+
+    def build() -> None:
+        try:
+            snapshot = load_or_build(repo_path)
+            built["total_files"] = snapshot.repo_info["total_files"]
+            built["snapshot"] = snapshot
+        except Exception as e:
+            built["error"] = e
+
+    builder = threading.Thread(target=build, name="cr-snapshot", daemon=True)
+    builder.start()
+
+    def get_snapshot():
+        if builder.is_alive():
+            print_info("Waiting for codebase snapshot...")
+            builder.join()
+        if "error" in built:
+            print_error(f"Failed to build snapshot: {built['error']}")
+            sys.exit(1)
+        return built["snapshot"]
+
+    print_welcome(repo_str, "indexing...")
 
     # Initialize RLM with step callback
     rlm = CodebaseReviewRLM(on_step=print_step)
     history: list[tuple[str, str]] = []
 
+    def reset() -> None:
+        get_snapshot()
+        history.clear()
+        console.clear()
+        print_welcome(repo_str, built["total_files"])
+
+    # REPL command name -> handler
+    commands = {
+        "help": print_help,
+        "reset": reset,
+        "history": lambda: print_history(history),
+        "files": lambda: print_files(get_snapshot().file_tree),
+        "info": lambda: print_repo_info(get_snapshot().repo_info),
+    }
+
+    # Write the prompt directly rather than through rich's render pipeline
+    prompt = "\x1b[1;36m?\x1b[0m " if console.is_terminal and not console.no_color else "? "
+
     while True:
         try:
-            console.print("[bold cyan]?[/bold cyan] ", end="")
-            question = input().strip()
+            sys.stdout.write(prompt)
+            sys.stdout.flush()
+            line = sys.stdin.readline()
+            if not line:
+                raise EOFError
+            question = line.strip()
 
             if not question:
                 continue
@@ -48,24 +93,11 @@ def run_interactive(repo_path: Path):
             cmd = question.lower()
 
             # Handle commands
-            if cmd in ("quit", "exit", "q"):
+            if cmd in QUIT_COMMANDS:
                 break
-            if cmd == "help":
-                print_help()
-                continue
-            if cmd == "reset":
-                history.clear()
-                console.clear()
-                print_welcome(str(repo_path), snapshot.repo_info["total_files"])
-                continue
-            if cmd == "history":
-                print_history(history)
-                continue
-            if cmd == "files":
-                print_files(snapshot.file_tree)
-                continue
-            if cmd == "info":
-                print_repo_info(snapshot.repo_info)
+            handler = commands.get(cmd)
+            if handler:
+                handler()
                 continue
 
             # Run question
@@ -83,6 +115,7 @@ def run_interactive(repo_path: Path):
                     question=question,
                     history=history,
                     save_trace_file=True,
+                    snapshot=get_snapshot(),
                 )
                 print_answer(answer, sources)
                 history.append((question, answer))
@@ -102,11 +135,43 @@ def run_interactive(repo_path: Path):
     console.print("\n[dim]Goodbye![/dim]")
 
 
-def run_one_shot(repo_path: Path, question: str):
+def run_one_shot(repo_path: Path, question: str, use_cache: bool = True):
     """Run a single question and exit."""
+    from .answer_cache import answer_key, load_answer, save_answer
+    from .daemon import query_daemon
+    from .render import console, print_answer, print_error, print_info, print_step
+    from .snapshot_cache import load_or_build, snapshot_key
+
+    # Walk the repo once; the key names both the cached answer and the snapshot
+    repo_key = snapshot_key(repo_path.resolve()) if use_cache and repo_path.is_dir() else None
+
+    # Reuse a previous answer to the same question on an unchanged repo
+    key = answer_key(repo_path, question, repo_key=repo_key) if use_cache else None
+    if key is not None:
+        cached = load_answer(key)
+        if cached is not None:
+            print_info("Using cached answer (pass --no-cache to recompute)")
+            print_answer(*cached)
+            return
+
+    # Hand the question to a warm daemon for this repo if one is running
+    try:
+        reply = query_daemon(repo_path, question)
+    except RuntimeError as e:
+        print_error(str(e))
+        sys.exit(1)
+    if reply is not None:
+        answer, sources = reply
+        print_answer(answer, sources)
+        if key is not None:
+            save_answer(key, answer, sources)
+        return
+
+    from .rlm_runner import CodebaseReviewRLM
+
     print_info("Building codebase snapshot...")
     try:
-        snapshot = build_snapshot(repo_path)
+        snapshot = load_or_build(repo_path, key=repo_key)
     except Exception as e:
         print_error(f"Failed to build snapshot: {e}")
         sys.exit(1)
@@ -124,55 +189,138 @@ def run_one_shot(repo_path: Path, question: str):
             repo_path=repo_path,
             question=question,
             save_trace_file=True,
+            snapshot=snapshot,
         )
         print_answer(answer, sources)
         print_info(f"Trace saved to ~/.cr/traces/")
+        if key is not None:
+            save_answer(key, answer, sources)
 
     except Exception as e:
         print_error(str(e))
         sys.exit(1)
 
 
-def main():
-    """Main entry point."""
-    parser = argparse.ArgumentParser(
-        description="Gemini RLM Codebase Review Tool",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-    )
-
-    subparsers = parser.add_subparsers(dest="command", help="Available commands")
-
-    # review command (one-shot)
+def _add_review_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Register the one-shot `review` command."""
     review_parser = subparsers.add_parser("review", help="Ask a single question about the codebase")
     review_parser.add_argument("--repo", "-r", type=str, default=".", help="Path to repository (default: .)")
     review_parser.add_argument("--question", "-q", type=str, required=True, help="Question to ask")
+    review_parser.add_argument("--no-cache", action="store_true", help="Ignore and don't reuse cached answers")
 
-    # ask command (interactive)
+
+def _add_ask_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Register the interactive `ask` command."""
     ask_parser = subparsers.add_parser("ask", help="Interactive Q&A mode")
     ask_parser.add_argument("--repo", "-r", type=str, default=".", help="Path to repository (default: .)")
 
-    # serve command (Part 2 API server)
+
+def _add_serve_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Register the `serve` command (Part 2 API server)."""
     serve_parser = subparsers.add_parser("serve", help="Start the API server for web UI")
     serve_parser.add_argument("--host", type=str, default=None, help="Host to bind (default: from .env or 127.0.0.1)")
     serve_parser.add_argument("--port", type=int, default=None, help="Port to bind (default: from .env or 8000)")
 
+
+def _add_daemon_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Register the `daemon` command that keeps a snapshot warm for `review`."""
+    daemon_parser = subparsers.add_parser("daemon", help="Keep a repo loaded and answer `review` questions")
+    daemon_parser.add_argument("--repo", "-r", type=str, default=".", help="Path to repository (default: .)")
+
+
+# Subcommand name -> function registering its parser, in help order
+SUBCOMMANDS = {
+    "review": _add_review_parser,
+    "ask": _add_ask_parser,
+    "serve": _add_serve_parser,
+    "daemon": _add_daemon_parser,
+}
+
+
+def _sniff_subcommand(argv: list[str]) -> str | None:
+    """Return the subcommand named in argv, or None if there isn't a known one.
+
+    Only the first non-flag token is considered, so `cr review -q ask` resolves
+    to `review`.
+    """
+    for token in argv:
+        if token.startswith("-"):
+            continue
+        return token if token in SUBCOMMANDS else None
+    return None
+
+
+# Precomputed `cr --help` output so bare `cr` and `cr --help` skip argparse.
+# Must match _build_parser(None).format_help(); tests/test_cli.py checks it.
+_HELP_TEXT = """\
+usage: cr [-h] {review,ask,serve,daemon} ...
+
+Gemini RLM Codebase Review Tool
+
+positional arguments:
+  {review,ask,serve,daemon}
+                        Available commands
+    review              Ask a single question about the codebase
+    ask                 Interactive Q&A mode
+    serve               Start the API server for web UI
+    daemon              Keep a repo loaded and answer `review` questions
+
+options:
+  -h, --help            show this help message and exit
+"""
+
+
+def _build_parser(command: str | None) -> argparse.ArgumentParser:
+    """Build the argument parser, with only `command`'s subparser if given."""
+    parser = argparse.ArgumentParser(
+        prog="cr",
+        description="Gemini RLM Codebase Review Tool",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+
+    # Only build the parser for the requested command; fall back to all of
+    # them for global help or an unknown command so usage lists every choice.
+    if command:
+        SUBCOMMANDS[command](subparsers)
+    else:
+        for add_parser in SUBCOMMANDS.values():
+            add_parser(subparsers)
+    return parser
+
+
+def main():
+    """Main entry point."""
+    argv = sys.argv[1:]
+
+    # Fast path: global help doesn't need argparse at all
+    if not argv or argv == ["-h"] or argv == ["--help"]:
+        sys.stdout.write(_HELP_TEXT)
+        sys.exit(0 if argv else 1)
+
+    parser = _build_parser(_sniff_subcommand(argv))
     args = parser.parse_args()
 
     if args.command == "review":
-        repo_path = Path(args.repo).resolve()
-        run_one_shot(repo_path, args.question)
+        repo_path = Path(os.path.abspath(args.repo))
+        run_one_shot(repo_path, args.question, use_cache=not args.no_cache)
     elif args.command == "ask":
-        repo_path = Path(args.repo).resolve()
+        repo_path = Path(os.path.abspath(args.repo))
         run_interactive(repo_path)
     elif args.command == "serve":
         from .config import API_HOST, API_PORT
-        from .server import app
-        import uvicorn
+        from .render import print_info
+        from .server import run_server
 
         host = args.host or API_HOST
         port = args.port or API_PORT
         print_info(f"Starting API server at http://{host}:{port}")
-        uvicorn.run(app, host=host, port=port)
+        run_server(host, port)
+    elif args.command == "daemon":
+        from .daemon import serve_daemon
+
+        serve_daemon(Path(os.path.abspath(args.repo)))
     else:
         parser.print_help()
         sys.exit(1)
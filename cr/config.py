@@ -1,27 +1,79 @@
 """Shared configuration loaded from .env"""
 
+import fnmatch
 import os
+import re
 import warnings
+from collections.abc import Sequence
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Make environment loading explicit with opt-out mechanism
-if os.getenv("CR_AUTO_LOAD_DOTENV", "true").lower() == "true":
-    load_dotenv()
 
+def _find_env_file(name: str = ".env") -> Path | None:
+    """Find the nearest env file in the working directory or its parents."""
+    cwd = Path.cwd()
+    for directory in (cwd, *cwd.parents):
+        candidate = directory / name
+        if candidate.is_file():
+            return candidate
+    return None
 
-def _get_int(env_var: str, default: int, name: str) -> int:
+
+def _load_env_file(path: Path) -> None:
+    """Load KEY=VALUE lines from an env file without overriding the environment.
+
+    Supports comments, blank lines, an optional ``export`` prefix and quoted
+    values. Variable interpolation is intentionally not supported.
+
+    Args:
+        path: Path to the env file
+    """
+    try:
+        data = path.read_text(encoding="utf-8")
+    except OSError:
+        return
+
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):]
+        key, sep, value = line.partition("=")
+        key = key.strip()
+        if not sep or not key:
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        elif " #" in value:
+            value = value.split(" #", 1)[0].rstrip()
+        os.environ.setdefault(key, value)
+
+
+# Make environment loading explicit with opt-out mechanism. Skip it entirely
+# when the environment is already configured (e.g. CI, containers).
+if os.getenv("CR_AUTO_LOAD_DOTENV", "true").lower() == "true" and not os.environ.get("GEMINI_API_KEY"):
+    _env_file = _find_env_file()
+    if _env_file is not None:
+        _load_env_file(_env_file)
+
+# Snapshot the environment once; all settings below read from this dict
+_ENV = dict(os.environ)
+
+
+def _get_int(env_var: str, default: int, name: str, env: dict[str, str] = _ENV) -> int:
     """Safely convert environment variable to int with fallback.
 
     Args:
         env_var: Environment variable name
         default: Default value if env var is not set or invalid
         name: Human-readable name for error messages
+        env: Environment mapping to read from
 
     Returns:
         Integer value from env var or default
     """
-    value = os.getenv(env_var, str(default))
+    value = env.get(env_var, str(default))
     try:
         result = int(value)
         if result < 0:
@@ -47,51 +99,76 @@ def _parse_list_env(value: str | None) -> list[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+_DIRS_READY = False
+
+
 def ensure_cache_dirs() -> None:
-    """Create cache directories if they don't exist."""
-    TRACES_DIR.mkdir(parents=True, exist_ok=True)
-    REVIEWS_DIR.mkdir(parents=True, exist_ok=True)
+    """Create cache directories if they don't exist (once per process)."""
+    global _DIRS_READY
+    if _DIRS_READY:
+        return
+    __getattr__("TRACES_DIR").mkdir(parents=True, exist_ok=True)
+    __getattr__("REVIEWS_DIR").mkdir(parents=True, exist_ok=True)
+    _DIRS_READY = True
 
 
 # LLM Configuration
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-MAIN_MODEL = os.getenv("MAIN_MODEL", "gemini/gemini-3-pro-preview")
-SUB_MODEL = os.getenv("SUB_MODEL", "gemini/gemini-3-flash-preview")
+GEMINI_API_KEY = _ENV.get("GEMINI_API_KEY")
+MAIN_MODEL = _ENV.get("MAIN_MODEL", "gemini/gemini-3-pro-preview")
+SUB_MODEL = _ENV.get("SUB_MODEL", "gemini/gemini-3-flash-preview")
 MAX_ITERATIONS = _get_int("MAX_ITERATIONS", 20, "MAX_ITERATIONS")
 MAX_LLM_CALLS = _get_int("MAX_LLM_CALLS", 25, "MAX_LLM_CALLS")
 
 # Repo snapshot constraints
 MAX_FILE_BYTES = _get_int("MAX_FILE_BYTES", 200000, "MAX_FILE_BYTES")  # 200KB per file
 MAX_TOTAL_BYTES = _get_int("MAX_TOTAL_BYTES", 5000000, "MAX_TOTAL_BYTES")  # 5MB total
-INCLUDE_GLOBS = _parse_list_env(os.getenv("INCLUDE_GLOBS"))
-EXCLUDE_GLOBS = _parse_list_env(os.getenv("EXCLUDE_GLOBS"))
+INCLUDE_GLOBS = _parse_list_env(_ENV.get("INCLUDE_GLOBS"))
+EXCLUDE_GLOBS = _parse_list_env(_ENV.get("EXCLUDE_GLOBS"))
 
-# Cache/trace directory
-CR_CACHE_DIR = Path(os.getenv("CR_CACHE_DIR", os.path.expanduser("~/.cr")))
-TRACES_DIR = CR_CACHE_DIR / "traces"
-REVIEWS_DIR = CR_CACHE_DIR / "reviews"
+# Cache/trace directories (CR_CACHE_DIR and the *_DIR entries below) are
+# computed on first access by __getattr__ below.
+_CACHE_SUBDIRS = {
+    "TRACES_DIR": "traces",
+    "REVIEWS_DIR": "reviews",
+    "SNAPSHOTS_DIR": "snapshots",
+    "ANSWERS_DIR": "answers",
+    "MR_CACHE_DIR": "merge_requests",
+}
 
 # GitHub API configuration (Part 2)
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-GITHUB_API_BASE = os.getenv("GITHUB_API_BASE", "https://api.github.com")
+GITHUB_TOKEN = _ENV.get("GITHUB_TOKEN")
+GITHUB_API_BASE = _ENV.get("GITHUB_API_BASE", "https://api.github.com")
 
 # GitLab API configuration
-GITLAB_TOKEN = os.getenv("GITLAB_TOKEN")
-GITLAB_API_BASE = os.getenv("GITLAB_API_BASE", "https://gitlab.com/api/v4")
+GITLAB_TOKEN = _ENV.get("GITLAB_TOKEN")
+GITLAB_API_BASE = _ENV.get("GITLAB_API_BASE", "https://gitlab.com/api/v4")
+# Skip the GraphQL MR query (for GitLab instances older than 13.x)
+GITLAB_USE_REST = _ENV.get("GITLAB_USE_REST", "false").lower() == "true"
+# Reuse MR payloads cached under CR_CACHE_DIR while the MR is unchanged
+GITLAB_MR_CACHE = _ENV.get("GITLAB_MR_CACHE", "true").lower() == "true"
 
 # API Server configuration
-API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_HOST = _ENV.get("API_HOST", "127.0.0.1")
 API_PORT = _get_int("API_PORT", 8000, "API_PORT")
+# Configure the RLM modules in the background when the server starts
+WARMUP_ON_STARTUP = _ENV.get("CR_WARMUP", "true").lower() == "true"
 
 # RLM display limits (moved from diff_rlm.py magic numbers)
-MAX_VISIBLE_FILES = 50
+MAX_VISIBLE_FILES = 50  # Files fetched into `file_data` for Q&A
+# Files whose diff is shown inline in the Q&A prompt; the rest are read via the REPL
+MAX_PROMPT_FILES = _get_int("DIFF_PROMPT_VISIBLE_FILES", 5, "DIFF_PROMPT_VISIBLE_FILES")
 MAX_REVIEW_FILES = 100  # Higher limit for auto-review (uses patches only)
 MAX_FILE_CONTENT_CHARS = 10000
 MAX_PATCH_CHARS = 5000
 MAX_RLM_OUTPUT_CHARS = 5000
 
+# Cap on simultaneous file-content requests to the Git host (avoids secondary rate limits)
+MAX_CONCURRENT_FETCHES = max(1, _get_int("MAX_CONCURRENT_FETCHES", 8, "MAX_CONCURRENT_FETCHES"))
+# Seconds to wait for a single file before leaving it out of the prompt
+FILE_FETCH_TIMEOUT = max(1, _get_int("FILE_FETCH_TIMEOUT", 10, "FILE_FETCH_TIMEOUT"))
+
 # Default ignore patterns (always excluded)
-DEFAULT_IGNORE_PATTERNS = [
+DEFAULT_IGNORE_PATTERNS = (
     "node_modules",
     ".venv",
     "venv",
@@ -152,11 +229,11 @@ DEFAULT_IGNORE_PATTERNS = [
     "Cargo.lock",
     ".DS_Store",
     "Thumbs.db",
-]
+)
 
 # Priority patterns for inclusion (checked first when building snapshot)
 # These files are included first before hitting the MAX_TOTAL_BYTES limit
-PRIORITY_PATTERNS = [
+PRIORITY_PATTERNS = (
     # Documentation
     "README*",
     "readme*",
@@ -194,4 +271,50 @@ PRIORITY_PATTERNS = [
     "tests/**",
     "test/**",
     "spec/**",
-]
+)
+
+
+def _compile_globs(patterns: Sequence[str]) -> re.Pattern:
+    """Combine glob patterns into one regex matching any of them."""
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+_IGNORE_RE = _compile_globs(DEFAULT_IGNORE_PATTERNS)
+_PRIORITY_RE = _compile_globs(PRIORITY_PATTERNS)
+_EXCLUDE_RE = _compile_globs(EXCLUDE_GLOBS) if EXCLUDE_GLOBS else None
+_INCLUDE_RE = _compile_globs(INCLUDE_GLOBS) if INCLUDE_GLOBS else None
+
+
+def is_ignored(name: str) -> bool:
+    """Check if a path or path component matches DEFAULT_IGNORE_PATTERNS."""
+    return _IGNORE_RE.match(name) is not None
+
+
+def is_priority(name: str) -> bool:
+    """Check if a path or file name matches PRIORITY_PATTERNS."""
+    return _PRIORITY_RE.match(name) is not None
+
+
+def is_excluded(rel_path: str) -> bool:
+    """Check if a repo-relative path matches the user's EXCLUDE_GLOBS."""
+    return _EXCLUDE_RE is not None and _EXCLUDE_RE.match(rel_path) is not None
+
+
+def is_included(rel_path: str) -> bool:
+    """Check if a repo-relative path matches INCLUDE_GLOBS (everything does when unset)."""
+    return _INCLUDE_RE is None or _INCLUDE_RE.match(rel_path) is not None
+
+
+def __getattr__(name: str) -> Path:
+    """Lazily compute cache directory paths on first access (PEP 562)."""
+    cached: Path | None = globals().get(name)
+    if cached is not None:
+        return cached
+    if name == "CR_CACHE_DIR":
+        value = Path(_ENV["CR_CACHE_DIR"] if "CR_CACHE_DIR" in _ENV else os.path.expanduser("~/.cr"))
+    elif name in _CACHE_SUBDIRS:
+        value = __getattr__("CR_CACHE_DIR") / _CACHE_SUBDIRS[name]
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
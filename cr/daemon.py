@@ -0,0 +1,165 @@
+"""Long-running review daemon that keeps a repo snapshot warm between CLI calls.
+
+`cr daemon --repo .` serves questions over a UNIX socket using one JSON object
+per line: `{"repo": ..., "question": ...}` -> `{"status": "ok", "answer": ...,
+"sources": [...]}`. `cr review` tries the daemon first and falls back to
+answering in-process when none is running for the repository.
+"""
+
+import json
+import logging
+import socket
+import socketserver
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from . import config
+from .types import CodebaseSnapshot
+
+if TYPE_CHECKING:
+    from .rlm_runner import CodebaseReviewRLM
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the daemon to accept a connection
+CONNECT_TIMEOUT = 1.0
+
+
+def socket_path() -> Path:
+    """Return the path of the daemon's UNIX socket."""
+    return config.CR_CACHE_DIR / "daemon.sock"
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Answer line-delimited JSON questions on one connection."""
+
+    server: "ReviewDaemon"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.server.answer(request)
+            except Exception as e:
+                logger.exception("Daemon request failed")
+                response = {"status": "error", "error": str(e)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class ReviewDaemon(socketserver.UnixStreamServer):
+    """UNIX socket server holding a snapshot and RLM for a single repository."""
+
+    def __init__(self, path: Path, repo_path: Path, rlm: "CodebaseReviewRLM | None" = None) -> None:
+        from .rlm_runner import CodebaseReviewRLM
+
+        self.repo_path = repo_path
+        self.rlm = rlm or CodebaseReviewRLM()
+        self._snapshot: CodebaseSnapshot | None = None
+        self._snapshot_key: str | None = None
+        super().__init__(str(path), DaemonHandler)
+
+    def get_snapshot(self) -> CodebaseSnapshot:
+        """Return the in-memory snapshot, rebuilding it if the repo changed."""
+        from .snapshot_cache import load_or_build, snapshot_key
+
+        key = snapshot_key(self.repo_path)
+        if key != self._snapshot_key or self._snapshot is None:
+            self._snapshot = load_or_build(self.repo_path)
+            self._snapshot_key = key
+        return self._snapshot
+
+    def answer(self, request: dict) -> dict:
+        """Handle a single decoded request."""
+        if Path(request.get("repo", "")) != self.repo_path:
+            return {"status": "wrong_repo", "repo": str(self.repo_path)}
+
+        answer, sources, _trace = self.rlm.run(
+            repo_path=self.repo_path,
+            question=request["question"],
+            history=request.get("history") or None,
+            save_trace_file=True,
+            snapshot=self.get_snapshot(),
+        )
+        return {"status": "ok", "answer": answer, "sources": sources}
+
+
+def _daemon_alive(path: Path) -> bool:
+    """Check whether something is accepting connections on path."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+
+
+def serve_daemon(repo_path: Path) -> None:
+    """Run the daemon for repo_path until interrupted."""
+    from .render import print_info
+
+    path = socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        if _daemon_alive(path):
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        path.unlink()
+
+    with ReviewDaemon(path, repo_path) as server:
+        server.get_snapshot()
+        print_info(f"Daemon serving {repo_path} on {path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
+
+
+def query_daemon(repo_path: Path, question: str) -> tuple[str, list[str]] | None:
+    """Ask a running daemon a question about repo_path.
+
+    Args:
+        repo_path: Resolved path to the repository
+        question: The question to answer
+
+    Returns:
+        Tuple of (answer, sources), or None if no daemon is serving repo_path
+
+    Raises:
+        RuntimeError: If the daemon failed to answer the question
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = socket_path()
+    if not path.exists():
+        return None
+
+    request = json.dumps({"repo": str(repo_path), "question": question}).encode() + b"\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+            sock.settimeout(None)  # Answers can take as long as the LLM does
+            sock.sendall(request)
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+
+    if not line:
+        return None
+    try:
+        response = json.loads(line)
+    except ValueError:
+        # A daemon that died mid-reply, or a socket owned by something else
+        return None
+    status = response.get("status")
+    if status == "ok":
+        return response["answer"], response.get("sources", [])
+    if status == "error":
+        raise RuntimeError(response.get("error", "Daemon request failed"))
+    return None
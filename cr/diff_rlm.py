@@ -6,19 +6,28 @@ Two main RLM modules:
 """
 
 import asyncio
+import io
 import logging
+import re
+import threading
 from pathlib import Path
 from typing import AsyncGenerator
 
 import dspy
+import orjson
+from dspy.predict.rlm import _strip_code_fences
+from dspy.primitives.prediction import Prediction
 from dspy.primitives.python_interpreter import PythonInterpreter
+from dspy.primitives.repl_types import REPLHistory
 
 from .config import (
+    FILE_FETCH_TIMEOUT,
     MAIN_MODEL,
-    MAX_FILE_CONTENT_CHARS,
+    MAX_CONCURRENT_FETCHES,
     MAX_ITERATIONS,
     MAX_LLM_CALLS,
     MAX_PATCH_CHARS,
+    MAX_PROMPT_FILES,
     MAX_REVIEW_FILES,
     MAX_RLM_OUTPUT_CHARS,
     MAX_VISIBLE_FILES,
@@ -29,163 +38,365 @@ from .diff_types import (
     DiffCitation,
     DiffFileContext,
     DiffSelection,
+    FileContents,
     LineAnnotation,
     PRInfo,
     ReviewIssue,
     RLMIteration,
 )
+from .lru import LRUCache
+from .providers.base import MergeRequestProvider
 from .providers.registry import get_provider_for_review
 from .rlm_runner import build_deno_command
 
+logger = logging.getLogger(__name__)
 
 
 def _build_patch_context(files: list[dict]) -> str:
     """Build a text representation of diff context using git patches."""
-    parts = []
-    
-    parts.append(f"## Metadata: Analyzing {len(files)} files based on git patches:")
+    buf = io.StringIO()
+    write = buf.write
+
+    write(f"## Metadata: Analyzing {len(files)} files based on git patches:")
     for f in files:
-        status = f.get("status", "modified")
-        additions = f.get("additions", 0)
-        deletions = f.get("deletions", 0)
-        parts.append(f"- {f['path']} ({status}) +{additions} -{deletions}")
-    parts.append("---\n")
+        write(f"\n- {f['path']} ({f.get('status', 'modified')}) +{f.get('additions', 0)} -{f.get('deletions', 0)}")
+    write("\n---\n")
 
     for f in files:
-        path = f["path"]
-        status = f.get("status", "modified")
-        additions = f.get("additions", 0)
-        deletions = f.get("deletions", 0)
+        write(
+            f"\n## File: {f['path']} ({f.get('status', 'modified')})\n"
+            f"Stats: +{f.get('additions', 0)} -{f.get('deletions', 0)}"
+        )
+
         patch = f.get("patch", "")
-        
-        parts.append(f"## File: {path} ({status})")
-        parts.append(f"Stats: +{additions} -{deletions}")
-        
         if patch:
-            parts.append("\n### Diff Patch:")
-            parts.append(patch)
+            write("\n\n### Diff Patch:\n")
+            write(patch)
         else:
-            parts.append("\n(No patch available - likely binary or too large)")
-            
-        parts.append("\n---\n")
-    
-    return "\n".join(parts)
+            write("\n\n(No patch available - likely binary or too large)")
+
+        write("\n\n---\n")
+
+    return buf.getvalue()
 
 
 def _build_diff_context_text(files: list[DiffFileContext]) -> str:
     """Build a text representation of diff context for RLM input."""
-    parts = []
-    
+    buf = io.StringIO()
+    write = buf.write
+
     # 1. List ALL files at the top
-    parts.append(f"## Metadata: Found {len(files)} files in this PR (listing all):")
+    write(f"## Metadata: Found {len(files)} files in this PR (listing all):")
     for f in files:
-        parts.append(f"- {f.path} ({f.status}) +{f.additions} -{f.deletions}")
-    parts.append("\nNOTE: Full content for ALL files is available in the python global variable `file_data`.\n")
-    parts.append("---\n")
+        write(f"\n- {f.path} ({f.status}) +{f.additions} -{f.deletions}")
+    write("\n\nNOTE: Full content for ALL files is available in the python global variable `file_data`.\n")
+    write("\n---\n")
 
     # 2. Show content for the first N files to save prompt tokens
     # The Model can use the REPL to read the others from `file_data` if needed.
-    
     for i, f in enumerate(files):
-        if i >= MAX_VISIBLE_FILES:
-            parts.append(f"## File: {f.path} ({f.status})")
-            parts.append("(Content truncated in prompt. Use `print(file_data['" + f.path + "']['new'])` to read)")
-            parts.append("\n---\n")
+        if i >= MAX_PROMPT_FILES:
+            write(
+                f"\n## File: {f.path} ({f.status})\n"
+                f"(Content truncated in prompt. Use `print(file_data['{f.path}']['new'])` to read)\n"
+                "\n---\n"
+            )
             continue
 
-        parts.append(f"## File: {f.path} ({f.status})")
-        parts.append(f"Changes: +{f.additions} -{f.deletions}")
-        
-        if f.old_file and f.new_file:
-            parts.append("\n### Old Version:")
-            parts.append(f.old_file.contents[:MAX_FILE_CONTENT_CHARS])  # Limit size
-            parts.append("\n### New Version:")
-            parts.append(f.new_file.contents[:MAX_FILE_CONTENT_CHARS])
-        elif f.new_file:
-            parts.append("\n### Added File:")
-            parts.append(f.new_file.contents[:MAX_FILE_CONTENT_CHARS])
-        elif f.old_file:
-            parts.append("\n### Deleted File:")
-            parts.append(f.old_file.contents[:MAX_FILE_CONTENT_CHARS])
-        elif f.patch:
-            parts.append("\n### Patch:")
-            parts.append(f.patch[:MAX_PATCH_CHARS])
-        
-        parts.append("\n---\n")
-    
-    return "\n".join(parts)
+        write(f"\n## File: {f.path} ({f.status})\nChanges: +{f.additions} -{f.deletions}")
+
+        # Prefer the patch (already a minimal diff) over full file previews,
+        # which are limited to MAX_FILE_CONTENT_CHARS
+        if f.patch:
+            write("\n\n### Patch:\n")
+            write(f.patch[:MAX_PATCH_CHARS])
+            if f.old_preview is not None or f.new_preview is not None:
+                write(f"\n\n(Full versions: `file_data['{f.path}']['old']` / `['new']`)")
+        elif f.old_preview is not None and f.new_preview is not None:
+            write("\n\n### Old Version:\n")
+            write(f.old_preview)
+            write("\n\n### New Version:\n")
+            write(f.new_preview)
+        elif f.new_preview is not None:
+            write("\n\n### Added File:\n")
+            write(f.new_preview)
+        elif f.old_preview is not None:
+            write("\n\n### Deleted File:\n")
+            write(f.old_preview)
+
+        write("\n\n---\n")
+
+    return buf.getvalue()
+
+
+# A line starting with ``` opens or closes a code block; group 1 is the info string
+_FENCE_RE = re.compile(r"^```([^\n]*)", re.MULTILINE)
+
+# One "path:line" or "path:start-end" entry; the path runs up to the last colon
+_CITATION_RE = re.compile(r"(.*):\s*(\d+)\s*(?:-\s*(\d+)\s*)?", re.DOTALL)
+# The same entries within a comma-separated string
+_CITATIONS_RE = re.compile(r"(?:\A|(?<=,))\s*([^,]*):\s*(\d+)\s*(?:-\s*(\d+)\s*)?(?=,|\Z)")
+
+# Brackets and whole JSON strings (so brackets inside strings are skipped)
+_JSON_SCAN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]]')
+# Bracketed candidates tried before giving up, so junk like "[[[[..." stays linear
+_MAX_JSON_CANDIDATES = 16
+
+# Formatted conversation per review: (messages, text)
+_CONV_TEXT_CACHE: LRUCache[tuple[tuple[tuple[str, str], ...], str]] = LRUCache(maxsize=64)
+
+# Built prompt text per review, keyed by (review_id, file fingerprint)
+_DIFF_TEXT_CACHE: LRUCache[str] = LRUCache(maxsize=32)
+_PATCH_TEXT_CACHE: LRUCache[str] = LRUCache(maxsize=32)
+
+
+def _contents_key(fc: FileContents | None) -> tuple | str | None:
+    """Identify file contents cheaply, preferring the provider's cache key."""
+    if fc is None:
+        return None
+    return fc.cache_key or (len(fc.contents), hash(fc.contents))
+
+
+def _diff_context_fingerprint(files: list[DiffFileContext]) -> tuple:
+    """Fingerprint everything _build_diff_context_text reads from files."""
+    return tuple(
+        (
+            f.path,
+            f.status,
+            f.additions,
+            f.deletions,
+            _contents_key(f.old_file),
+            _contents_key(f.new_file),
+            hash(f.patch),
+        )
+        for f in files
+    )
+
+
+def _build_diff_context_text_cached(review_id: str, files: list[DiffFileContext]) -> str:
+    """Return _build_diff_context_text(files), reusing the text from earlier turns."""
+    key = (review_id, _diff_context_fingerprint(files))
+    text = _DIFF_TEXT_CACHE.get(key)
+    if text is None:
+        text = _build_diff_context_text(files)
+        _DIFF_TEXT_CACHE[key] = text
+    return text
+
+
+def _build_patch_context_cached(review_id: str, files: list[dict]) -> str:
+    """Return _build_patch_context(files), reusing the text for repeat reviews."""
+    fingerprint = tuple(
+        (f["path"], f.get("status"), f.get("additions"), f.get("deletions"), hash(f.get("patch", "")))
+        for f in files
+    )
+    key = (review_id, fingerprint)
+    text = _PATCH_TEXT_CACHE.get(key)
+    if text is None:
+        text = _build_patch_context(files)
+        _PATCH_TEXT_CACHE[key] = text
+    return text
+
+
+def _format_conversation(review_id: str, conversation: list[dict] | None) -> str:
+    """Format chat history for the prompt, reusing the text from the previous turn."""
+    if not conversation:
+        return "No previous conversation."
+
+    messages = tuple((msg["role"], msg["content"]) for msg in conversation)
+    cached = _CONV_TEXT_CACHE.get(review_id)
+    if cached is not None and messages[:len(cached[0])] == cached[0]:
+        # Same conversation with new turns appended: format only those
+        prev_messages, text = cached
+        new_lines = [f"{role.upper()}: {content}" for role, content in messages[len(prev_messages):]]
+        if new_lines:
+            text = "\n".join([text, *new_lines])
+    else:
+        text = "\n".join([f"{role.upper()}: {content}" for role, content in messages])
+    _CONV_TEXT_CACHE[review_id] = (messages, text)
+    return text
+
+
+def _find_outer_json_array(text: str, start: int = 0) -> tuple[int, int] | None:
+    """Find the first balanced [...] at or after start, skipping JSON strings.
+
+    Returns:
+        (start, end) slice bounds of the array, or None if there isn't one
+    """
+    begin = text.find("[", start)
+    if begin < 0:
+        return None
+    depth = 0
+    for m in _JSON_SCAN_RE.finditer(text, begin):
+        token = m.group()
+        if token == "[":
+            depth += 1
+        elif token == "]":
+            depth -= 1
+            if depth == 0:
+                return begin, m.end()
+    return None
+
+
+def _extract_json_array(text: str) -> list:
+    """Decode the first JSON array embedded in LLM output, or [] if none parses."""
+    pos = 0
+    for _ in range(_MAX_JSON_CANDIDATES):
+        bounds = _find_outer_json_array(text, pos)
+        if bounds is None:
+            break
+        candidate = text[bounds[0]:bounds[1]]
+        try:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            pass
+        try:
+            # LLMs sometimes put raw newlines inside strings
+            return orjson.loads(candidate.replace("\n", " "))
+        except orjson.JSONDecodeError:
+            pos = bounds[0] + 1
+    return []
+
+
+def _citation_from_match(m: re.Match) -> DiffCitation:
+    start_line = int(m.group(2))
+    return DiffCitation(
+        path=m.group(1),
+        side="unified",
+        start_line=start_line,
+        end_line=int(m.group(3)) if m.group(3) else start_line,
+    )
+
+
+def _citation_from_dict(item: dict) -> DiffCitation:
+    get = item.get
+    # Positional args, in DiffCitation field order
+    return DiffCitation(
+        get("path", ""),
+        get("side", "unified"),
+        get("startLine", 1),
+        get("endLine", 1),
+        None,
+        get("reason", ""),
+    )
 
 
 def _parse_citations(raw: str | list) -> list[DiffCitation]:
     """Parse citations from RLM output."""
-    if isinstance(raw, list):
-        items = raw
-    else:
-        items = [s.strip() for s in raw.split(",") if s.strip()]
-    
+    if not isinstance(raw, list):
+        # Comma-separated "path:line" / "path:start-end" entries
+        return [_citation_from_match(m) for m in _CITATIONS_RE.finditer(raw)]
+
+    if all(isinstance(item, dict) for item in raw):
+        # Common case: structured output, already a list of citation dicts
+        return [_citation_from_dict(item) for item in raw]
+
     citations = []
-    for item in items:
+    for item in raw:
         if isinstance(item, dict):
-            citations.append(DiffCitation(
-                path=item.get("path", ""),
-                side=item.get("side", "unified"),
-                start_line=item.get("startLine", 1),
-                end_line=item.get("endLine", 1),
-                reason=item.get("reason", ""),
-            ))
-        elif ":" in str(item):
-            # Parse "path:line" or "path:start-end" format
-            try:
-                path, line_part = str(item).rsplit(":", 1)
-                if "-" in line_part:
-                    start, end = line_part.split("-", 1)
-                    start_line, end_line = int(start), int(end)
-                else:
-                    start_line = end_line = int(line_part)
-                citations.append(DiffCitation(
-                    path=path,
-                    side="unified",
-                    start_line=start_line,
-                    end_line=end_line,
-                ))
-            except (ValueError, IndexError):
-                continue
+            citations.append(_citation_from_dict(item))
+        else:
+            m = _CITATION_RE.fullmatch(str(item))
+            if m:
+                citations.append(_citation_from_match(m))
     return citations
 
 
 def _parse_answer_blocks(answer: str) -> list[AnswerBlock]:
     """Parse answer into markdown and code blocks."""
+    if "```" not in answer:
+        # Common case: plain prose, nothing to split
+        return [AnswerBlock(type="markdown", content=answer)]
+
     blocks = []
-    lines = answer.split("\n")
-    current_block = []
+    pos = 0  # Start of the current block's first line
     in_code = False
     code_lang = None
-    
-    for line in lines:
-        if line.startswith("```") and not in_code:
+
+    # Fence lines alternately open and close code blocks
+    for m in _FENCE_RE.finditer(answer):
+        start = m.start()
+        content = answer[pos:start - 1] if start > pos else None
+        if not in_code:
             # End any current markdown block
-            if current_block:
-                blocks.append(AnswerBlock(type="markdown", content="\n".join(current_block)))
-                current_block = []
+            if content is not None:
+                blocks.append(AnswerBlock(type="markdown", content=content))
             in_code = True
-            code_lang = line[3:].strip() or None
-        elif line.startswith("```") and in_code:
+            code_lang = m.group(1).strip() or None
+        else:
             # End code block
-            blocks.append(AnswerBlock(type="code", content="\n".join(current_block), language=code_lang))
-            current_block = []
+            blocks.append(AnswerBlock(type="code", content=content or "", language=code_lang))
             in_code = False
             code_lang = None
-        else:
-            current_block.append(line)
-    
-    # Handle remaining content
-    if current_block:
+        pos = m.end() + 1  # Skip the fence line's newline
+
+    # Handle remaining content (a fence on the very last line leaves none)
+    if pos <= len(answer):
         block_type = "code" if in_code else "markdown"
-        blocks.append(AnswerBlock(type=block_type, content="\n".join(current_block), language=code_lang if in_code else None))
-    
+        blocks.append(AnswerBlock(type=block_type, content=answer[pos:], language=code_lang if in_code else None))
+
     return blocks
 
 
+def _format_output(result, limit: int = MAX_RLM_OUTPUT_CHARS) -> str:
+    """Render REPL output for display, truncated to limit characters.
+
+    Lists are joined one item per line, stopping once the limit is reached so
+    huge outputs are never fully stringified.
+    """
+    if isinstance(result, str):
+        return result[:limit]
+    if isinstance(result, list):
+        parts = []
+        size = 0
+        for item in result:
+            text = str(item)
+            parts.append(text)
+            size += len(text) + 1
+            if size > limit:
+                break
+        return "\n".join(parts)[:limit]
+    return str(result)[:limit] if result else ""
+
+
+async def _fetch_file_contents(
+    provider: MergeRequestProvider, review_id: str, paths: list[str]
+) -> list[tuple[FileContents | None, FileContents | None]]:
+    """Fetch (old, new) contents for paths concurrently, capping requests in flight.
+
+    A file that takes longer than FILE_FETCH_TIMEOUT comes back as (None, None)
+    so one slow request cannot stall the prompt build. Any other failure cancels
+    the remaining fetches and is re-raised.
+    """
+    # Providers that can batch (GitLab's GraphQL blobs) fetch everything in a few requests
+    fetch_all = getattr(provider, "get_all_file_contents", None)
+    if fetch_all is not None and paths:
+        try:
+            async with asyncio.timeout(FILE_FETCH_TIMEOUT):
+                return await fetch_all(review_id, paths)
+        except TimeoutError:
+            logger.warning("Timed out batch-fetching files for %s, fetching one by one", review_id)
+
+    sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    results: list[tuple[FileContents | None, FileContents | None]] = [(None, None)] * len(paths)
+
+    async def fetch(i: int, path: str) -> None:
+        async with sem:
+            try:
+                async with asyncio.timeout(FILE_FETCH_TIMEOUT):
+                    results[i] = await provider.get_file_contents(review_id, path)
+            except TimeoutError:
+                logger.warning("Timed out fetching %s for %s", path, review_id)
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for i, path in enumerate(paths):
+                tg.create_task(fetch(i, path))
+    except ExceptionGroup as eg:
+        # Surface the provider's own error rather than the group wrapper
+        raise eg.exceptions[0] from eg
+    return results
+
+
 class DiffQARLM:
     """RLM for user-driven Q&A about diffs."""
 
@@ -193,26 +404,32 @@ class DiffQARLM:
         self._rlm = None
         self.lm = None
         self._configured = False
+        self._configure_lock = threading.Lock()
 
     def _ensure_configured(self):
         if self._configured:
             return
-        
-        # dspy.configure removed - using context managers instead
-        self.lm = dspy.LM(MAIN_MODEL)
-        
-        deno_command = build_deno_command()
-        interpreter = PythonInterpreter(deno_command=deno_command)
-        
-        self._rlm = dspy.RLM(
-            signature="diff_context, pr_info, selection, conversation, question -> answer, citations",
-            max_iterations=MAX_ITERATIONS,
-            max_llm_calls=MAX_LLM_CALLS,
-            sub_lm=dspy.LM(SUB_MODEL),
-            verbose=True,
-            interpreter=interpreter,
-        )
-        self._configured = True
+
+        # The server may be warming this up on a worker thread
+        with self._configure_lock:
+            if self._configured:
+                return
+
+            # dspy.configure removed - using context managers instead
+            self.lm = dspy.LM(MAIN_MODEL)
+
+            deno_command = build_deno_command()
+            interpreter = PythonInterpreter(deno_command=deno_command)
+
+            self._rlm = dspy.RLM(
+                signature="diff_context, pr_info, selection, conversation, question -> answer, citations",
+                max_iterations=MAX_ITERATIONS,
+                max_llm_calls=MAX_LLM_CALLS,
+                sub_lm=dspy.LM(SUB_MODEL),
+                verbose=True,
+                interpreter=interpreter,
+            )
+            self._configured = True
 
     async def ask(
         self,
@@ -234,28 +451,25 @@ class DiffQARLM:
         
         # Build context from provided files or fetch
         if file_contexts is None:
-            file_contexts = []
-            # Fetch first few files for context
-            for f in pr_info.files[:5]:
-                old_file, new_file = await provider.get_file_contents(review_id, f["path"])
-                file_contexts.append(DiffFileContext(
+            # Fetch first few files for context, in parallel
+            targets = pr_info.files[:5]
+            results = await _fetch_file_contents(provider, review_id, [f["path"] for f in targets])
+            file_contexts = [
+                DiffFileContext(
                     path=f["path"],
                     old_file=old_file,
                     new_file=new_file,
                     status=f.get("status", "modified"),
                     additions=f.get("additions", 0),
                     deletions=f.get("deletions", 0),
-                ))
+                    patch=f.get("patch"),
+                )
+                for f, (old_file, new_file) in zip(targets, results)
+            ]
 
-        diff_text = _build_diff_context_text(file_contexts)
+        diff_text = _build_diff_context_text_cached(review_id, file_contexts)
 
-        # Format conversation history
-        conv_text = "No previous conversation."
-        if conversation:
-            conv_text = "\n".join([
-                f"{msg['role'].upper()}: {msg['content']}"
-                for msg in conversation
-            ])
+        conv_text = _format_conversation(review_id, conversation)
 
         # Format selection
         selection_text = "No specific selection (reviewing entire changeset)."
@@ -265,8 +479,7 @@ class DiffQARLM:
                 f"lines {selection.start_line}-{selection.end_line} ({selection.mode})"
             )
 
-        # Format PR info
-        pr_text = f"PR #{pr_info.number}: {pr_info.title}\n{pr_info.body or 'No description'}"
+        pr_text = pr_info.prompt_text
 
         # Run RLM asynchronously to avoid blocking the event loop
         # This allows SSE events to be sent while RLM is processing
@@ -300,9 +513,6 @@ class DiffQARLM:
         Yields RLMIteration objects for each iteration, then finally yields
         a tuple of (blocks, citations) as the final result.
         """
-        from dspy.primitives.prediction import Prediction
-        from dspy.primitives.repl_types import REPLHistory
-
         self._ensure_configured()
 
         provider = get_provider_for_review(review_id)
@@ -318,52 +528,37 @@ class DiffQARLM:
             # Limit to prevent excessive API usage/memory
             all_files = pr_info.files[:MAX_VISIBLE_FILES]
             
-            # Create fetch tasks
-            tasks = [provider.get_file_contents(review_id, f["path"]) for f in all_files]
-            results = await asyncio.gather(*tasks)
-            
-            file_contexts = []
-            file_data = {} # Global dict for REPL
-            
-            for f, (old_file, new_file) in zip(all_files, results):
-                # Populate global file_data for REPL access
-                # CRITICAL: Use empty string "" instead of None, because naive REPL injection
-                # might serialize None as "null" (JSON), which causes "NameError: name 'null' is not defined"
-                # when executed as Python code.
-                file_data[f["path"]] = {
-                    "old": old_file.contents if old_file else "",
-                    "new": new_file.contents if new_file else "",
-                    "status": f.get("status"),
-                }
-                
-                # Append to prompt context
-                file_contexts.append(DiffFileContext(
+            results = await _fetch_file_contents(provider, review_id, [f["path"] for f in all_files])
+
+            file_contexts = [
+                DiffFileContext(
                     path=f["path"],
                     old_file=old_file,
                     new_file=new_file,
                     status=f.get("status", "modified"),
                     additions=f.get("additions", 0),
                     deletions=f.get("deletions", 0),
-                ))
-        else:
-            # If contexts provided, build file_data from them
-            file_data = {}
-            for fc in file_contexts:
-                file_data[fc.path] = {
-                    "old": fc.old_file.contents if fc.old_file else "",
-                    "new": fc.new_file.contents if fc.new_file else "",
-                    "status": fc.status,
-                }
-
-        diff_text = _build_diff_context_text(file_contexts)
-
-        # Format conversation history
-        conv_text = "No previous conversation."
-        if conversation:
-            conv_text = "\n".join([
-                f"{msg['role'].upper()}: {msg['content']}"
-                for msg in conversation
-            ])
+                    patch=f.get("patch"),
+                )
+                for f, (old_file, new_file) in zip(all_files, results)
+            ]
+
+        # Global dict for REPL access.
+        # CRITICAL: Use empty string "" instead of None, because naive REPL injection
+        # might serialize None as "null" (JSON), which causes "NameError: name 'null' is not defined"
+        # when executed as Python code.
+        file_data = {
+            fc.path: {
+                "old": fc.old_file.contents if fc.old_file else "",
+                "new": fc.new_file.contents if fc.new_file else "",
+                "status": fc.status,
+            }
+            for fc in file_contexts
+        }
+
+        diff_text = _build_diff_context_text_cached(review_id, file_contexts)
+
+        conv_text = _format_conversation(review_id, conversation)
 
         # Format selection
         selection_text = "No specific selection (reviewing entire changeset)."
@@ -373,8 +568,7 @@ class DiffQARLM:
                 f"lines {selection.start_line}-{selection.end_line} ({selection.mode})"
             )
 
-        # Format PR info
-        pr_text = f"PR #{pr_info.number}: {pr_info.title}\n{pr_info.body or 'No description'}"
+        pr_text = pr_info.prompt_text
 
         # Prepare input args
         input_args = {
@@ -390,6 +584,8 @@ class DiffQARLM:
         output_field_names = list(rlm.signature.output_fields.keys())
         execution_tools = rlm._prepare_execution_tools()
         variables = rlm._build_variables(**input_args)
+        # Inputs don't change between iterations, so format them once
+        variables_info = [variable.format() for variable in variables]
 
         with dspy.context(lm=self.lm):
             with rlm._interpreter_context(execution_tools) as repl:
@@ -397,7 +593,6 @@ class DiffQARLM:
 
                 for iteration in range(rlm.max_iterations):
                     # Execute one iteration manually to capture reasoning/code/output
-                    variables_info = [variable.format() for variable in variables]
                     pred = await rlm.generate_action.acall(
                         variables_info=variables_info,
                         repl_history=history,
@@ -406,7 +601,6 @@ class DiffQARLM:
 
                     # Execute the code
                     try:
-                        from dspy.predict.rlm import _strip_code_fences
                         code = _strip_code_fences(pred.code)
                         
                         # Inject file_data into execution variables
@@ -417,19 +611,13 @@ class DiffQARLM:
                     except Exception as e:
                         result = f"[Error] {e}"
 
-                    # Format output
-                    if isinstance(result, list):
-                        output = "\n".join(map(str, result))
-                    else:
-                        output = str(result) if result else ""
-
                     # Yield the iteration event
                     yield RLMIteration(
                         iteration=iteration + 1,
                         max_iterations=rlm.max_iterations,
                         reasoning=pred.reasoning,
                         code=pred.code,
-                        output=output[:MAX_RLM_OUTPUT_CHARS],  # Limit output size
+                        output=_format_output(result),
                     )
 
                     # Process result to check if done
@@ -470,16 +658,21 @@ class FastAutoReview:
     def __init__(self):
         self._predictor = None
         self.lm = None
+        self._configure_lock = threading.Lock()
 
     def _ensure_configured(self):
         if self._predictor:
             return
 
-        # dspy.configure removed - using context managers instead
-        self.lm = dspy.LM(SUB_MODEL)
-        
-        # Simple ChainOfThought predictor
-        self._predictor = dspy.ChainOfThought(ReviewSignature)
+        with self._configure_lock:
+            if self._predictor:
+                return
+
+            # dspy.configure removed - using context managers instead
+            self.lm = dspy.LM(SUB_MODEL)
+
+            # Simple ChainOfThought predictor
+            self._predictor = dspy.ChainOfThought(ReviewSignature)
 
     async def review(
         self,
@@ -503,8 +696,8 @@ class FastAutoReview:
         # Use patch context directly (faster, standard diffs)
         # Limit to MAX_REVIEW_FILES for auto-review
         target_files = pr_info.files[:MAX_REVIEW_FILES]
-        diff_text = _build_patch_context(target_files)
-        pr_text = f"PR #{pr_info.number}: {pr_info.title}\n{pr_info.body or 'No description'}"
+        diff_text = _build_patch_context_cached(review_id, target_files)
+        pr_text = pr_info.prompt_text
 
         instructions = (
             "Analyze the provided diffs and PR info.\n"
@@ -551,9 +744,6 @@ class FastAutoReview:
         # Parse output
         # DSPy OutputField often returns string representation of list/dict
         # We need to robustly parse it.
-        import json
-        import re
-        
         raw_issues = []
         try:
             # Try to find JSON-like list structure
@@ -561,10 +751,7 @@ class FastAutoReview:
             if isinstance(issues_str, list):
                 raw_issues = issues_str
             else:
-                # Basic cleanup and parse
-                json_match = re.search(r'\[.*\]', issues_str.replace('\n', ' '), re.DOTALL)
-                if json_match:
-                    raw_issues = json.loads(json_match.group(0))
+                raw_issues = _extract_json_array(issues_str)
         except Exception as e:
             logging.error(f"Failed to parse issues JSON: {e}")
             # Fallback: if it failed to parse, maybe it's just text lines?
@@ -1,20 +1,54 @@
 """GitHub PR ingestion for Part 2."""
 
+import asyncio
 import os
 import re
+import secrets
 import subprocess
-import uuid
 from pathlib import Path
 from datetime import datetime
 
 import httpx
 
-from .config import CR_CACHE_DIR, GITHUB_TOKEN, GITHUB_API_BASE
+from .config import GITHUB_TOKEN, GITHUB_API_BASE
 from .diff_types import PRInfo, FileContents, DiffFileContext
+from .lru import LRUCache
+from .providers.base import HTTP2_AVAILABLE
 
 
-# In-memory store for loaded PRs (MVP - no persistence)
-_pr_cache: dict[str, PRInfo] = {}
+_PR_URL_RE = re.compile(r"github\.com/([^/]+)/([^/]+)/pull/(\d+)")
+
+# In-memory store for loaded PRs (MVP - no persistence), bounded so a
+# long-running process doesn't keep every PR it has seen
+_pr_cache: LRUCache[PRInfo] = LRUCache(maxsize=512, ttl=3600.0)
+
+# Shared client so keep-alive connections (and HTTP/2 streams, when h2 is
+# installed) are reused across requests. httpx clients are bound to the event
+# loop that created them.
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            timeout=30.0,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client = _client_loop = None
 
 
 def parse_pr_url(url: str) -> tuple[str, str, int]:
@@ -29,8 +63,7 @@ def parse_pr_url(url: str) -> tuple[str, str, int]:
     Raises:
         ValueError: If URL format is invalid
     """
-    pattern = r"github\.com/([^/]+)/([^/]+)/pull/(\d+)"
-    match = re.search(pattern, url)
+    match = _PR_URL_RE.search(url)
     if not match:
         raise ValueError(f"Invalid GitHub PR URL: {url}")
     return match.group(1), match.group(2), int(match.group(3))
@@ -47,86 +80,95 @@ def _get_headers() -> dict[str, str]:
     return headers
 
 
-async def load_pr(pr_url: str) -> PRInfo:
+# Built once; every request reuses these dicts
+_JSON_HEADERS = _get_headers()
+_RAW_HEADERS = {**_JSON_HEADERS, "Accept": "application/vnd.github.v3.raw"}
+
+
+async def load_pr(pr_url: str, *, client: httpx.AsyncClient | None = None) -> PRInfo:
     """Load PR metadata from GitHub.
     
     Args:
         pr_url: GitHub PR URL
+        client: HTTP client to use instead of the shared one
         
     Returns:
         PRInfo with metadata and file list
     """
     owner, repo, number = parse_pr_url(pr_url)
-    review_id = str(uuid.uuid4())[:8]
+    review_id = secrets.token_hex(4)
     
-    async with httpx.AsyncClient() as client:
-        # Fetch PR metadata
-        pr_resp = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{number}",
-            headers=_get_headers(),
-            timeout=30.0,
-        )
-        pr_resp.raise_for_status()
-        pr_data = pr_resp.json()
-        
-        # Fetch changed files
-        files_resp = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{number}/files",
-            headers=_get_headers(),
+    client = client or _get_client()
+    base_url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
+    headers = _JSON_HEADERS
+    # The four endpoints are independent, so fetch them concurrently
+    pr_resp, files_resp, commits_resp, comments_resp = await asyncio.gather(
+        client.get(f"{base_url}/pulls/{number}", headers=headers, timeout=30.0),
+        client.get(
+            f"{base_url}/pulls/{number}/files",
+            headers=headers,
             params={"per_page": 100},
             timeout=30.0,
-        )
-        files_resp.raise_for_status()
-        files_data = files_resp.json()
-    
-        # Fetch commits
-        commits_resp = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{number}/commits",
-            headers=_get_headers(),
+        ),
+        client.get(
+            f"{base_url}/pulls/{number}/commits",
+            headers=headers,
             params={"per_page": 100},
             timeout=30.0,
-        )
-        commits_list = []
-        if commits_resp.status_code == 200:
-            commits_data = commits_resp.json()
-            commits_list = [
-                {
-                    "sha": c["sha"],
-                    "message": c["commit"]["message"],
-                    "author": {
-                        "name": c["commit"]["author"]["name"],
-                        "date": c["commit"]["author"]["date"],
-                        "login": c["author"]["login"] if c.get("author") else None,
-                        "avatar_url": c["author"]["avatar_url"] if c.get("author") else None,
-                    },
-                    "html_url": c["html_url"],
-                }
-                for c in commits_data
-            ]
-
-        # Fetch comments (using issue comments for main conversation)
-        comments_resp = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{number}/comments",
-            headers=_get_headers(),
+        ),
+        # Issue comments hold the main conversation
+        client.get(
+            f"{base_url}/issues/{number}/comments",
+            headers=headers,
             params={"per_page": 100},
             timeout=30.0,
-        )
-        comments_list = []
-        if comments_resp.status_code == 200:
-             comments_data = comments_resp.json()
-             comments_list = [
-                 {
-                     "id": c["id"],
-                     "user": {
-                         "login": c["user"]["login"],
-                         "avatar_url": c["user"]["avatar_url"],
-                     },
-                     "body": c["body"],
-                     "created_at": c["created_at"],
-                     "html_url": c["html_url"],
-                 }
-                 for c in comments_data
-             ]
+        ),
+        return_exceptions=True,
+    )
+
+    # PR metadata and files are required
+    if isinstance(pr_resp, BaseException):
+        raise pr_resp
+    if isinstance(files_resp, BaseException):
+        raise files_resp
+    pr_resp.raise_for_status()
+    files_resp.raise_for_status()
+    pr_data = pr_resp.json()
+    files_data = files_resp.json()
+
+    # Commits and comments are optional
+    commits_list = []
+    if not isinstance(commits_resp, BaseException) and commits_resp.status_code == 200:
+        commits_list = [
+            {
+                "sha": c["sha"],
+                "message": c["commit"]["message"],
+                "author": {
+                    "name": c["commit"]["author"]["name"],
+                    "date": c["commit"]["author"]["date"],
+                    "login": c["author"]["login"] if c.get("author") else None,
+                    "avatar_url": c["author"]["avatar_url"] if c.get("author") else None,
+                },
+                "html_url": c["html_url"],
+            }
+            for c in commits_resp.json()
+        ]
+
+    comments_list = []
+    if not isinstance(comments_resp, BaseException) and comments_resp.status_code == 200:
+        comments_list = [
+            {
+                "id": c["id"],
+                "user": {
+                    "login": c["user"]["login"],
+                    "avatar_url": c["user"]["avatar_url"],
+                },
+                "body": c["body"],
+                "created_at": c["created_at"],
+                "html_url": c["html_url"],
+            }
+            for c in comments_resp.json()
+        ]
 
     files = [
         {
@@ -177,12 +219,15 @@ def get_cached_pr(review_id: str) -> PRInfo | None:
 async def get_file_contents(
     review_id: str,
     path: str,
+    *,
+    client: httpx.AsyncClient | None = None,
 ) -> tuple[FileContents | None, FileContents | None]:
     """Get old and new file contents for a file in a PR.
     
     Args:
         review_id: The review ID from load_pr
         path: File path within the repo
+        client: HTTP client to use instead of the shared one
         
     Returns:
         Tuple of (old_file, new_file) - either can be None for added/deleted files
@@ -194,43 +239,30 @@ async def get_file_contents(
     owner, repo = pr_info.owner, pr_info.repo
     base_sha, head_sha = pr_info.base_sha, pr_info.head_sha
     
-    async with httpx.AsyncClient() as client:
-        old_file = None
-        new_file = None
-        
-        # Fetch base version
-        try:
-            base_resp = await client.get(
-                f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}",
-                headers={**_get_headers(), "Accept": "application/vnd.github.v3.raw"},
-                params={"ref": base_sha},
-                timeout=30.0,
-            )
-            if base_resp.status_code == 200:
-                old_file = FileContents(
-                    name=path,
-                    contents=base_resp.text,
-                    cache_key=f"{owner}/{repo}/{base_sha}/{path}",
-                )
-        except httpx.HTTPStatusError:
-            pass  # File doesn't exist in base (new file)
-        
-        # Fetch head version
+    headers = _RAW_HEADERS
+
+    client = client or _get_client()
+
+    async def fetch(ref: str) -> FileContents | None:
         try:
-            head_resp = await client.get(
+            resp = await client.get(
                 f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}",
-                headers={**_get_headers(), "Accept": "application/vnd.github.v3.raw"},
-                params={"ref": head_sha},
+                headers=headers,
+                params={"ref": ref},
                 timeout=30.0,
             )
-            if head_resp.status_code == 200:
-                new_file = FileContents(
-                    name=path,
-                    contents=head_resp.text,
-                    cache_key=f"{owner}/{repo}/{head_sha}/{path}",
-                )
         except httpx.HTTPStatusError:
-            pass  # File doesn't exist in head (deleted file)
-    
+            return None
+        if resp.status_code != 200:
+            return None  # File doesn't exist at this ref (added or deleted file)
+        return FileContents(
+            name=path,
+            contents=resp.text,
+            cache_key=f"{owner}/{repo}/{ref}/{path}",
+        )
+
+    # Base and head versions are independent
+    old_file, new_file = await asyncio.gather(fetch(base_sha), fetch(head_sha))
+
     return old_file, new_file
 
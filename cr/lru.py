@@ -0,0 +1,70 @@
+"""Small bounded in-memory cache used for per-review data."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Mapping that keeps at most `maxsize` entries, evicting the least recently used.
+
+    With `ttl` set, entries also expire that many seconds after they were stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, V] = OrderedDict()
+        self._expires: dict[Hashable, float] = {}
+
+    def _expire(self, key: Hashable) -> None:
+        """Drop key if its TTL has passed."""
+        if self.ttl is not None and self._expires.get(key, float("inf")) <= time.monotonic():
+            del self._data[key]
+            del self._expires[key]
+
+    def get(self, key: Hashable, default: V | None = None) -> V | None:
+        """Return the value for key, marking it most recently used."""
+        try:
+            self._expire(key)
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return self._data[key]
+
+    def __setitem__(self, key: Hashable, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if self.ttl is not None:
+            self._expires[key] = time.monotonic() + self.ttl
+        while len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            self._expires.pop(evicted, None)
+
+    def __getitem__(self, key: Hashable) -> V:
+        if key in self._data:
+            self._expire(key)
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        if key not in self._data:
+            return False
+        self._expire(key)
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def pop(self, key: Hashable, default: V | None = None) -> V | None:
+        """Remove key and return its value, or default if missing."""
+        self._expires.pop(key, None)
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+        self._expires.clear()
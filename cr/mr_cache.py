@@ -0,0 +1,74 @@
+"""On-disk cache of merge request API payloads and file contents.
+
+MR payloads are keyed by host, project and IID and revalidated before use.
+File contents are keyed by a cache_key that includes the commit SHA, so
+entries never go stale.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from urllib.parse import quote_plus
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+def mr_cache_path(provider: str, host: str, project_path: str, iid: int) -> Path:
+    """Return the cache file for one merge request."""
+    return config.MR_CACHE_DIR / provider / host / f"{quote_plus(project_path)}_{iid}.json"
+
+
+def load_mr_payload(path: Path) -> dict | None:
+    """Return the cached payload at path, or None on a miss."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable MR cache %s: %s", path, e)
+        return None
+
+
+def save_mr_payload(path: Path, payload: dict) -> None:
+    """Store a payload at path, ignoring write failures."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Failed to write MR cache %s: %s", path, e)
+
+
+def file_cache_path(provider: str, host: str, cache_key: str) -> Path:
+    """Return the cache file for one file at one commit."""
+    digest = hashlib.sha256(cache_key.encode()).hexdigest()
+    return config.MR_CACHE_DIR / provider / host / "files" / digest[:2] / digest
+
+
+def load_file_bytes(path: Path) -> bytes | None:
+    """Return the cached file bytes at path, or None on a miss."""
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning("Ignoring unreadable file cache %s: %s", path, e)
+        return None
+
+
+def save_file_bytes(path: Path, data: bytes) -> None:
+    """Store file bytes at path, ignoring write failures."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Failed to write file cache %s: %s", path, e)
@@ -0,0 +1,40 @@
+"""HTTP client shared by every provider."""
+
+import asyncio
+
+import httpx
+
+from .base import DEFAULT_TIMEOUT, HTTP2_AVAILABLE, BoundedAsyncClient
+
+# Hosts like GitHub ask integrations not to fan out requests; stay under this
+# many at once per host
+MAX_IN_FLIGHT = 10
+
+# One pool for all providers and reviews so keep-alive connections (and
+# HTTP/2 streams, when h2 is installed) are reused. httpx clients are bound
+# to the event loop that created them.
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = BoundedAsyncClient(
+            max_in_flight=MAX_IN_FLIGHT,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=DEFAULT_TIMEOUT,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client = _client_loop = None
@@ -1,22 +1,60 @@
 """Abstract base class for Git hosting providers."""
 
+import asyncio
+import importlib.util
 import logging
-import uuid
+import re
+import secrets
 from abc import ABC, abstractmethod
-from typing import ClassVar
+from typing import Any, ClassVar
 
 import httpx
+import orjson
 
 from ..diff_types import PRInfo, FileContents
+from ..lru import LRUCache
 
 # Constants for API requests
 DEFAULT_TIMEOUT = 30.0
 DEFAULT_PER_PAGE = 100
 REVIEW_ID_LENGTH = 8
 USER_AGENT = "cr-review-tool"
+# Upper bound on pages followed for one list (GitHub caps PR files at 3000)
+MAX_PAGES = 30
+# Bytes read per chunk when streaming raw file contents
+STREAM_CHUNK_SIZE = 65536
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 logger = logging.getLogger(__name__)
 
+_PAGE_PARAM_RE = re.compile(r"[?&]page=(\d+)")
+
+# Last response per request URL: (ETag, body, links), for conditional requests
+_ETAG_CACHE: LRUCache[tuple[str, bytes, dict]] = LRUCache(maxsize=1024)
+
+
+class BoundedAsyncClient(httpx.AsyncClient):
+    """AsyncClient that caps the number of requests in flight to each host.
+
+    Hosts like GitHub throttle clients that fan out many concurrent requests,
+    so sends beyond a host's cap wait for a free slot. Other hosts are not
+    held up.
+    """
+
+    def __init__(self, *, max_in_flight: int, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._max_in_flight = max_in_flight
+        self._slots: dict[str, asyncio.Semaphore] = {}
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        host = request.url.host
+        slots = self._slots.get(host)
+        if slots is None:
+            slots = self._slots[host] = asyncio.Semaphore(self._max_in_flight)
+        async with slots:
+            return await super().send(request, **kwargs)
+
 
 class MergeRequestProvider(ABC):
     """Abstract base for Git hosting providers (GitHub, GitLab, etc.).
@@ -30,17 +68,108 @@ class MergeRequestProvider(ABC):
     
     # Provider identifier (e.g., "github", "gitlab")
     name: ClassVar[str] = "unknown"
+
+    # Regex matching the URLs can_handle accepts; the registry combines these
+    # into one pattern so dispatch is a single scan
+    dispatch_pattern: ClassVar[str] = r"(?!)"
     
+    # Bounds for the in-memory MR cache (entries, seconds)
+    max_size: ClassVar[int] = 512
+    cache_ttl: ClassVar[float] = 3600.0
+
     # In-memory cache for loaded MRs (shared per provider instance)
-    _mr_cache: dict[str, PRInfo]
+    _mr_cache: LRUCache[PRInfo]
     
     def __init__(self) -> None:
-        self._mr_cache = {}
+        self._mr_cache = LRUCache(maxsize=self.max_size, ttl=self.cache_ttl)
 
     @staticmethod
     def _generate_review_id() -> str:
         """Generate a unique review ID."""
-        return str(uuid.uuid4())[:REVIEW_ID_LENGTH]
+        return secrets.token_hex(REVIEW_ID_LENGTH // 2)
+
+    @staticmethod
+    async def _get_json(
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict[str, str],
+        params: dict[str, int] | None = None,
+    ) -> tuple[Any, dict]:
+        """GET a JSON endpoint, revalidating any cached copy with If-None-Match.
+
+        A 304 Not Modified reuses the cached body (and doesn't count against
+        GitHub's rate limit).
+
+        Args:
+            client: HTTP client to use
+            url: API endpoint URL
+            headers: Request headers
+            params: Query parameters
+
+        Returns:
+            Tuple of (decoded JSON, response links)
+
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        key = str(httpx.URL(url, params=params))
+        cached = _ETAG_CACHE.get(key)
+        if cached is not None:
+            headers = {**headers, "If-None-Match": cached[0]}
+        resp = await client.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT)
+        if resp.status_code == 304 and cached is not None:
+            _, content, links = cached
+        else:
+            resp.raise_for_status()
+            content, links = resp.content, resp.links
+            if etag := resp.headers.get("ETag"):
+                _ETAG_CACHE[key] = (etag, content, links)
+        # Decode per call so callers never share (and mutate) a cached object
+        return orjson.loads(content), links
+
+    @staticmethod
+    async def _fetch_all_pages(
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict[str, str],
+        params: dict[str, int] | None = None,
+    ) -> list[dict]:
+        """Fetch every page of a JSON list endpoint.
+
+        The Link header's rel="last" gives the page count, so pages 2..N are
+        fetched concurrently rather than by walking rel="next".
+
+        Args:
+            client: HTTP client to use
+            url: API endpoint URL
+            headers: Request headers
+            params: Query parameters (defaults to per_page=DEFAULT_PER_PAGE)
+
+        Returns:
+            List of JSON objects from all pages
+
+        Raises:
+            httpx.HTTPStatusError: If any page fails
+        """
+        get_json = MergeRequestProvider._get_json
+        params = params or {"per_page": DEFAULT_PER_PAGE}
+        items, links = await get_json(client, url, headers, params)
+        last_url = links.get("last", {}).get("url")
+        match = _PAGE_PARAM_RE.search(last_url) if last_url else None
+        if not match:
+            return items
+
+        last_page = int(match.group(1))
+        if last_page > MAX_PAGES:
+            logger.warning("%s has %d pages, only reading %d", url, last_page, MAX_PAGES)
+            last_page = MAX_PAGES
+        pages = await asyncio.gather(*(
+            get_json(client, url, headers, {**params, "page": page})
+            for page in range(2, last_page + 1)
+        ))
+        for page_items, _ in pages:
+            items.extend(page_items)
+        return items
 
     @staticmethod
     async def _fetch_json_list(
@@ -49,9 +178,9 @@ class MergeRequestProvider(ABC):
         headers: dict[str, str],
         params: dict[str, int] | None = None,
     ) -> list[dict]:
-        """Fetch a JSON list from an API endpoint.
+        """Fetch a JSON list from an API endpoint, following pagination.
 
-        Returns empty list if status is not 200.
+        Returns empty list if any page fails, for lists that are optional.
 
         Args:
             client: HTTP client to use
@@ -62,17 +191,16 @@ class MergeRequestProvider(ABC):
         Returns:
             List of JSON objects, or empty list if request fails
         """
-        params = params or {"per_page": DEFAULT_PER_PAGE}
-        resp = await client.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT)
-        if resp.status_code == 200:
-            return resp.json()
-        logger.warning(
-            "API request failed: %s returned status %d", 
-            url, 
-            resp.status_code
-        )
-        return []
-    
+        try:
+            return await MergeRequestProvider._fetch_all_pages(client, url, headers, params)
+        except httpx.HTTPStatusError as e:
+            logger.warning(
+                "API request failed: %s returned status %d",
+                e.request.url,
+                e.response.status_code,
+            )
+            return []
+
     @classmethod
     @abstractmethod
     def can_handle(cls, url: str) -> bool:
@@ -87,11 +215,13 @@ class MergeRequestProvider(ABC):
         pass
     
     @abstractmethod
-    async def load_mr(self, url: str) -> PRInfo:
+    async def load_mr(self, url: str, include_activity: bool = True) -> PRInfo:
         """Load merge/pull request metadata from the provider.
         
         Args:
             url: The MR/PR URL
+            include_activity: Also fetch commits and comments. Pass False when
+                only metadata and files are needed, skipping the largest payloads.
             
         Returns:
             PRInfo with metadata, files, commits, and comments
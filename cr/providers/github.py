@@ -3,14 +3,155 @@
 Supports GitHub.com and self-hosted GitHub Enterprise via GITHUB_API_BASE.
 """
 
+import asyncio
+import logging
 import re
+from collections.abc import Callable
 from datetime import datetime
+from typing import ClassVar
 
 import httpx
+import orjson
 
 from ..config import GITHUB_TOKEN, GITHUB_API_BASE
 from ..diff_types import PRInfo, FileContents
-from .base import DEFAULT_TIMEOUT, DEFAULT_PER_PAGE, USER_AGENT, MergeRequestProvider
+from ..lru import LRUCache
+from ._http import get_http_client
+from .base import (
+    DEFAULT_TIMEOUT,
+    STREAM_CHUNK_SIZE,
+    USER_AGENT,
+    MergeRequestProvider,
+)
+
+logger = logging.getLogger(__name__)
+
+# Commit/comment lists longer than this are converted off the event loop
+OFFLOAD_THRESHOLD = 50
+
+
+# PR, commits and comments in one round trip. Files stay on REST for the patches.
+_GRAPHQL_PR_QUERY = """
+query($owner: String!, $repo: String!, $number: Int!) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      title body state isDraft
+      baseRefOid headRefOid baseRefName headRefName
+      additions deletions changedFiles
+      author { login avatarUrl }
+      commits(first: 100) {
+        totalCount
+        pageInfo { hasNextPage }
+        nodes { commit { oid message url author { name date user { login avatarUrl } } } }
+      }
+      comments(first: 100) {
+        pageInfo { hasNextPage }
+        nodes { databaseId body createdAt url author { login avatarUrl } }
+      }
+    }
+  }
+}
+"""
+
+
+def _graphql_url() -> str:
+    """Return the GraphQL endpoint for the configured API base."""
+    # GitHub Enterprise serves GraphQL at /api/graphql next to REST's /api/v3
+    if GITHUB_API_BASE.endswith("/api/v3"):
+        return GITHUB_API_BASE.removesuffix("/v3") + "/graphql"
+    return f"{GITHUB_API_BASE}/graphql"
+
+
+def _graphql_user(actor: dict | None) -> dict | None:
+    """Convert a GraphQL actor to the REST user shape."""
+    if actor is None:
+        return None
+    return {"login": actor["login"], "avatar_url": actor["avatarUrl"]}
+
+
+def _graphql_pr_to_rest(pr: dict) -> tuple[dict, list[dict], list[dict]]:
+    """Reshape a GraphQL pullRequest into REST (pr_data, commits, comments)."""
+    # Deleted accounts come back as null; REST reports them as "ghost"
+    ghost = {"login": "ghost", "avatar_url": ""}
+    pr_data = {
+        "title": pr["title"],
+        "body": pr["body"],
+        # REST only knows open/closed; merged PRs are closed
+        "state": "open" if pr["state"] == "OPEN" else "closed",
+        "draft": pr["isDraft"],
+        "base": {"sha": pr["baseRefOid"], "ref": pr["baseRefName"]},
+        "head": {"sha": pr["headRefOid"], "ref": pr["headRefName"]},
+        "user": _graphql_user(pr["author"]) or ghost,
+        "commits": pr["commits"]["totalCount"],
+        "additions": pr["additions"],
+        "deletions": pr["deletions"],
+        "changed_files": pr["changedFiles"],
+    }
+    commits_data = [
+        {
+            "sha": c["oid"],
+            "commit": {
+                "message": c["message"],
+                "author": {"name": c["author"]["name"], "date": c["author"]["date"]},
+            },
+            "author": _graphql_user(c["author"]["user"]),
+            "html_url": c["url"],
+        }
+        for c in (node["commit"] for node in pr["commits"]["nodes"])
+    ]
+    comments_data = [
+        {
+            "id": c["databaseId"],
+            "user": _graphql_user(c["author"]) or ghost,
+            "body": c["body"],
+            "created_at": c["createdAt"],
+            "html_url": c["url"],
+        }
+        for c in pr["comments"]["nodes"]
+    ]
+    return pr_data, commits_data, comments_data
+
+
+def _commit_entry(c: dict) -> dict:
+    """Convert a REST commit to the PRInfo.commits_list shape."""
+    # Look up each nested object once; the PR may have hundreds of commits
+    commit = c["commit"]
+    git_author = commit["author"]
+    user = c.get("author")
+    return {
+        "sha": c["sha"],
+        "message": commit["message"],
+        "author": {
+            "name": git_author["name"],
+            "date": git_author["date"],
+            "login": user["login"] if user else None,
+            "avatar_url": user["avatar_url"] if user else None,
+        },
+        "html_url": c["html_url"],
+    }
+
+
+def _comment_entry(c: dict) -> dict:
+    """Convert a REST issue comment to the PRInfo.comments shape."""
+    user = c["user"]
+    return {
+        "id": c["id"],
+        "user": {
+            "login": user["login"],
+            "avatar_url": user["avatar_url"],
+        },
+        "body": c["body"],
+        "created_at": c["created_at"],
+        "html_url": c["html_url"],
+    }
+
+
+async def _convert_list(convert: Callable[[dict], dict], items: list[dict]) -> list[dict]:
+    """Apply convert to each item, on a worker thread when the list is long."""
+    if len(items) > OFFLOAD_THRESHOLD:
+        # Keeps the event loop free for concurrent file fetches on big PRs
+        return await asyncio.to_thread(lambda: [convert(item) for item in items])
+    return [convert(item) for item in items]
 
 
 class GitHubProvider(MergeRequestProvider):
@@ -22,13 +163,21 @@ class GitHubProvider(MergeRequestProvider):
     """
     
     name = "github"
+    dispatch_pattern = r"github[^/]*/[^/]+/[^/]+/pull/[0-9]+"
+
+    # File contents by "owner/repo/sha/path", shared across instances. A SHA
+    # never changes, so entries stay valid for as long as memory allows.
+    _file_cache: ClassVar[LRUCache[FileContents | None]] = LRUCache(maxsize=2048, ttl=3600.0)
     
     # Pattern matches github.com or any domain with /pull/ in the path
-    _URL_PATTERN = re.compile(r"github[^/]*/([^/]+)/([^/]+)/pull/(\d+)")
+    _URL_PATTERN = re.compile(r"github[^/]*/([^/]+)/([^/]+)/pull/([0-9]+)", re.ASCII)
     
     @classmethod
     def can_handle(cls, url: str) -> bool:
         """Return True if URL looks like a GitHub PR URL."""
+        # Cheap substring check first; the registry tries every provider per URL
+        if "/pull/" not in url:
+            return False
         # Match github.com or any domain containing 'github' with /pull/ path
         return bool(cls._URL_PATTERN.search(url))
     
@@ -50,6 +199,14 @@ class GitHubProvider(MergeRequestProvider):
             raise ValueError(f"Invalid GitHub PR URL: {url}")
         return match.group(1), match.group(2), int(match.group(3))
     
+    def __init__(self) -> None:
+        super().__init__()
+        # Built once; every request reuses these dicts
+        self._json_headers = self._get_headers()
+        self._raw_headers = {**self._json_headers, "Accept": "application/vnd.github.v3.raw"}
+        # GraphQL only accepts bearer auth
+        self._graphql_headers = {**self._json_headers, "Authorization": f"bearer {GITHUB_TOKEN}"}
+
     def _get_headers(self) -> dict[str, str]:
         """Get HTTP headers for GitHub API requests."""
         headers = {
@@ -60,11 +217,105 @@ class GitHubProvider(MergeRequestProvider):
             headers["Authorization"] = f"token {GITHUB_TOKEN}"
         return headers
     
-    async def load_mr(self, url: str) -> PRInfo:
+    async def _fetch_metadata(
+        self,
+        client: httpx.AsyncClient,
+        owner: str,
+        repo: str,
+        number: int,
+        include_activity: bool = True,
+    ) -> tuple[dict, list[dict], list[dict]]:
+        """Fetch PR metadata, commits and comments as REST-shaped JSON.
+
+        Uses a single GraphQL query when a token is configured (GraphQL requires
+        auth), falling back to three concurrent REST requests. Without
+        include_activity only the PR itself is fetched.
+
+        Returns:
+            Tuple of (pr_data, commits_data, comments_data)
+        """
+        base_url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
+        if not include_activity:
+            pr_data, _links = await self._get_json(client, f"{base_url}/pulls/{number}", self._json_headers)
+            return pr_data, [], []
+
+        if GITHUB_TOKEN:
+            try:
+                return await self._fetch_metadata_graphql(client, owner, repo, number)
+            except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
+                logger.warning("GraphQL PR query failed, falling back to REST: %s", e)
+
+        headers = self._json_headers
+        pr_result, commits_data, comments_data = await asyncio.gather(
+            self._get_json(client, f"{base_url}/pulls/{number}", headers),
+            self._fetch_json_list(client, f"{base_url}/pulls/{number}/commits", headers),
+            self._fetch_json_list(client, f"{base_url}/issues/{number}/comments", headers),
+            return_exceptions=True,
+        )
+
+        # PR metadata is required
+        if isinstance(pr_result, BaseException):
+            raise pr_result
+        pr_data, _links = pr_result
+
+        # Commits and comments are optional
+        if isinstance(commits_data, BaseException):
+            logger.warning("Failed to fetch commits for %s/%s#%d: %s", owner, repo, number, commits_data)
+            commits_data = []
+        if isinstance(comments_data, BaseException):
+            logger.warning("Failed to fetch comments for %s/%s#%d: %s", owner, repo, number, comments_data)
+            comments_data = []
+
+        return pr_data, commits_data, comments_data
+
+    async def _fetch_metadata_graphql(
+        self,
+        client: httpx.AsyncClient,
+        owner: str,
+        repo: str,
+        number: int,
+    ) -> tuple[dict, list[dict], list[dict]]:
+        """Fetch PR metadata, commits and comments with one GraphQL query.
+
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+            ValueError: If the response carries GraphQL errors
+        """
+        resp = await client.post(
+            _graphql_url(),
+            json={
+                "query": _GRAPHQL_PR_QUERY,
+                "variables": {"owner": owner, "repo": repo, "number": number},
+            },
+            headers=self._graphql_headers,
+            timeout=DEFAULT_TIMEOUT,
+        )
+        resp.raise_for_status()
+        payload = orjson.loads(resp.content)
+        if payload.get("errors"):
+            raise ValueError(payload["errors"][0].get("message", "GraphQL error"))
+
+        pr = payload["data"]["repository"]["pullRequest"]
+        pr_data, commits_data, comments_data = _graphql_pr_to_rest(pr)
+
+        # Rare long lists are read in full over REST rather than via GraphQL cursors
+        base_url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
+        if pr["commits"]["pageInfo"]["hasNextPage"]:
+            commits_data = await self._fetch_json_list(
+                client, f"{base_url}/pulls/{number}/commits", self._json_headers
+            ) or commits_data
+        if pr["comments"]["pageInfo"]["hasNextPage"]:
+            comments_data = await self._fetch_json_list(
+                client, f"{base_url}/issues/{number}/comments", self._json_headers
+            ) or comments_data
+        return pr_data, commits_data, comments_data
+
+    async def load_mr(self, url: str, include_activity: bool = True) -> PRInfo:
         """Load PR metadata from GitHub.
 
         Args:
             url: GitHub PR URL
+            include_activity: Also fetch commits and comments
 
         Returns:
             PRInfo with metadata and file list
@@ -72,66 +323,26 @@ class GitHubProvider(MergeRequestProvider):
         owner, repo, number = self.parse_pr_url(url)
         review_id = self._generate_review_id()
 
-        async with httpx.AsyncClient() as client:
-            # Fetch PR metadata
-            pr_resp = await client.get(
-                f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{number}",
-                headers=self._get_headers(),
-                timeout=DEFAULT_TIMEOUT,
-            )
-            pr_resp.raise_for_status()
-            pr_data = pr_resp.json()
-
-            # Fetch changed files
-            files_resp = await client.get(
+        client = get_http_client()
+        # Files come from REST (GraphQL has no patches); the rest is fetched alongside
+        files_data, metadata = await asyncio.gather(
+            self._fetch_all_pages(
+                client,
                 f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{number}/files",
-                headers=self._get_headers(),
-                params={"per_page": DEFAULT_PER_PAGE},
-                timeout=DEFAULT_TIMEOUT,
-            )
-            files_resp.raise_for_status()
-            files_data = files_resp.json()
+                self._json_headers,
+            ),
+            self._fetch_metadata(client, owner, repo, number, include_activity),
+            return_exceptions=True,
+        )
+        for result in (files_data, metadata):
+            if isinstance(result, BaseException):
+                raise result
+        pr_data, commits_data, comments_data = metadata
 
-            # Fetch commits using helper
-            commits_data = await self._fetch_json_list(
-                client,
-                f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{number}/commits",
-                self._get_headers(),
-            )
-            commits_list = [
-                {
-                    "sha": c["sha"],
-                    "message": c["commit"]["message"],
-                    "author": {
-                        "name": c["commit"]["author"]["name"],
-                        "date": c["commit"]["author"]["date"],
-                        "login": c["author"]["login"] if c.get("author") else None,
-                        "avatar_url": c["author"]["avatar_url"] if c.get("author") else None,
-                    },
-                    "html_url": c["html_url"],
-                }
-                for c in commits_data
-            ]
-
-            # Fetch comments using helper
-            comments_data = await self._fetch_json_list(
-                client,
-                f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{number}/comments",
-                self._get_headers(),
-            )
-            comments_list = [
-                {
-                    "id": c["id"],
-                    "user": {
-                        "login": c["user"]["login"],
-                        "avatar_url": c["user"]["avatar_url"],
-                    },
-                    "body": c["body"],
-                    "created_at": c["created_at"],
-                    "html_url": c["html_url"],
-                }
-                for c in comments_data
-            ]
+        commits_list, comments_list = await asyncio.gather(
+            _convert_list(_commit_entry, commits_data),
+            _convert_list(_comment_entry, comments_data),
+        )
 
         files = [
             {
@@ -192,42 +403,42 @@ class GitHubProvider(MergeRequestProvider):
         owner, repo = pr_info.owner, pr_info.repo
         base_sha, head_sha = pr_info.base_sha, pr_info.head_sha
 
-        async with httpx.AsyncClient() as client:
-            old_file = None
-            new_file = None
+        client = get_http_client()
 
-            # Fetch base version
+        async def fetch(ref: str) -> FileContents | None:
+            cache_key = f"{owner}/{repo}/{ref}/{path}"
+            if cache_key in self._file_cache:
+                return self._file_cache[cache_key]
             try:
-                base_resp = await client.get(
+                # Stream into one buffer and decode once, rather than holding
+                # the response bytes alongside the decoded text
+                async with client.stream(
+                    "GET",
                     f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}",
-                    headers={**self._get_headers(), "Accept": "application/vnd.github.v3.raw"},
-                    params={"ref": base_sha},
+                    headers=self._raw_headers,
+                    params={"ref": ref},
                     timeout=DEFAULT_TIMEOUT,
-                )
-                if base_resp.status_code == 200:
-                    old_file = FileContents(
-                        name=path,
-                        contents=base_resp.text,
-                        cache_key=f"{owner}/{repo}/{base_sha}/{path}",
-                    )
+                ) as resp:
+                    if resp.status_code == 404:
+                        # File doesn't exist at this ref (added or deleted file)
+                        self._file_cache[cache_key] = None
+                        return None
+                    if resp.status_code != 200:
+                        return None
+                    buf = bytearray()
+                    async for chunk in resp.aiter_bytes(STREAM_CHUNK_SIZE):
+                        buf += chunk
             except httpx.HTTPStatusError:
-                pass  # File doesn't exist in base (new file)
+                return None
+            file = FileContents(
+                name=path,
+                contents=buf.decode("utf-8", errors="replace"),
+                cache_key=cache_key,
+            )
+            self._file_cache[cache_key] = file
+            return file
 
-            # Fetch head version
-            try:
-                head_resp = await client.get(
-                    f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}",
-                    headers={**self._get_headers(), "Accept": "application/vnd.github.v3.raw"},
-                    params={"ref": head_sha},
-                    timeout=DEFAULT_TIMEOUT,
-                )
-                if head_resp.status_code == 200:
-                    new_file = FileContents(
-                        name=path,
-                        contents=head_resp.text,
-                        cache_key=f"{owner}/{repo}/{head_sha}/{path}",
-                    )
-            except httpx.HTTPStatusError:
-                pass  # File doesn't exist in head (deleted file)
+        # Base and head versions are independent
+        old_file, new_file = await asyncio.gather(fetch(base_sha), fetch(head_sha))
 
         return old_file, new_file
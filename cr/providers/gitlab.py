@@ -3,15 +3,138 @@
 Supports GitLab.com and self-hosted GitLab via GITLAB_API_BASE.
 """
 
+import asyncio
+import functools
+import logging
 import re
 from datetime import datetime
+from pathlib import Path
 from urllib.parse import quote_plus
 
 import httpx
+import orjson
 
-from ..config import GITLAB_TOKEN, GITLAB_API_BASE
+from ..config import (
+    GITLAB_API_BASE,
+    GITLAB_MR_CACHE,
+    GITLAB_TOKEN,
+    GITLAB_USE_REST,
+    MAX_CONCURRENT_FETCHES,
+)
 from ..diff_types import PRInfo, FileContents
-from .base import DEFAULT_TIMEOUT, DEFAULT_PER_PAGE, USER_AGENT, MergeRequestProvider
+from ..mr_cache import (
+    file_cache_path,
+    load_file_bytes,
+    load_mr_payload,
+    mr_cache_path,
+    save_file_bytes,
+    save_mr_payload,
+)
+from ._http import get_http_client
+from .base import (
+    DEFAULT_PER_PAGE,
+    DEFAULT_TIMEOUT,
+    STREAM_CHUNK_SIZE,
+    USER_AGENT,
+    MergeRequestProvider,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# MR, commits and notes in one round trip. Files stay on REST for the diffs.
+_GRAPHQL_MR_QUERY = """
+query($projectPath: ID!, $iid: String!) {
+  project(fullPath: $projectPath) {
+    mergeRequest(iid: $iid) {
+      title description state draft sourceBranch targetBranch updatedAt
+      diffRefs { baseSha headSha }
+      diffStats { path additions deletions }
+      author { username avatarUrl }
+      commits(first: 100) {
+        pageInfo { hasNextPage }
+        nodes { sha message webUrl authoredDate authorName authorEmail }
+      }
+      notes(first: 100) {
+        pageInfo { hasNextPage }
+        nodes { id body createdAt system author { username avatarUrl } }
+      }
+    }
+  }
+}
+"""
+
+# Raw contents of many files at one ref
+_GRAPHQL_BLOBS_QUERY = """
+query($projectPath: ID!, $ref: String!, $paths: [String!]!) {
+  project(fullPath: $projectPath) {
+    repository {
+      blobs(ref: $ref, paths: $paths) { nodes { path rawBlob } }
+    }
+  }
+}
+"""
+# Paths per blobs query (GitLab's default GraphQL page size)
+GRAPHQL_BLOB_BATCH = 100
+
+
+def _graphql_url(api_base: str) -> str:
+    """Return the GraphQL endpoint next to a REST API base."""
+    # REST lives at /api/v4, GraphQL at /api/graphql
+    return api_base.removesuffix("/v4") + "/graphql"
+
+
+def _graphql_mr_to_rest(mr: dict) -> tuple[dict, list[dict], list[dict]]:
+    """Reshape a GraphQL mergeRequest into REST (mr_data, commits, notes)."""
+    mr_data = {
+        "title": mr["title"],
+        "description": mr["description"],
+        "state": mr["state"],
+        "draft": mr["draft"],
+        "source_branch": mr["sourceBranch"],
+        "target_branch": mr["targetBranch"],
+        "updated_at": mr["updatedAt"],
+        "diff_refs": {
+            "base_sha": mr["diffRefs"]["baseSha"],
+            "head_sha": mr["diffRefs"]["headSha"],
+        },
+        "author": {"username": mr["author"]["username"], "avatar_url": mr["author"]["avatarUrl"]},
+        # Per-file line counts computed server-side; REST has no equivalent
+        "diff_stats": {d["path"]: [d["additions"], d["deletions"]] for d in mr["diffStats"] or ()},
+    }
+    commits_data = [
+        {
+            "id": c["sha"],
+            "message": c["message"],
+            "author_name": c["authorName"],
+            "author_email": c["authorEmail"],
+            "created_at": c["authoredDate"],
+            "web_url": c["webUrl"],
+        }
+        for c in mr["commits"]["nodes"]
+    ]
+    notes_data = [
+        {
+            # Global IDs look like gid://gitlab/Note/123; REST uses the number
+            "id": int(n["id"].rsplit("/", 1)[-1]),
+            "author": {"username": n["author"]["username"], "avatar_url": n["author"]["avatarUrl"]},
+            "body": n["body"],
+            "created_at": n["createdAt"],
+            "system": n["system"],
+        }
+        for n in mr["notes"]["nodes"]
+    ]
+    return mr_data, commits_data, notes_data
+
+
+def _parse_timestamp(value: str | None) -> datetime | None:
+    """Parse a GitLab timestamp; REST and GraphQL format the same instant differently."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
 
 
 class GitLabProvider(MergeRequestProvider):
@@ -24,15 +147,28 @@ class GitLabProvider(MergeRequestProvider):
     """
     
     name = "gitlab"
+    dispatch_pattern = r"/-/merge_requests/[0-9]+(?:[/?#]|$)"
     
     # Pattern matches any domain with /-/merge_requests/ in the path
-    # Captures the project path (can include groups/subgroups) and MR IID
-    _URL_PATTERN = re.compile(r"([^/]+\.[^/]+)/(.+?)/-/merge_requests/(\d+)")
+    # Captures the project path (can include groups/subgroups) and MR IID.
+    # Anchored at the start, and no group can cross a '?' or '#'.
+    _URL_PATTERN = re.compile(
+        r"(?:https?://)?(?P<host>[^/?#]+\.[^/?#]+)/(?P<path>[^?#]+?)"
+        r"/-/merge_requests/(?P<iid>[0-9]+)(?:[/?#]|$)",
+        re.ASCII,
+    )
     
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def _match(cls, url: str) -> re.Match[str] | None:
+        """Match a URL once; can_handle and parse_mr_url share the result."""
+        return cls._URL_PATTERN.match(url)
+
     @classmethod
     def can_handle(cls, url: str) -> bool:
         """Return True if URL looks like a GitLab MR URL."""
-        return "/-/merge_requests/" in url
+        # Cheap substring check first; the registry tries every provider per URL
+        return "/-/merge_requests/" in url and cls._match(url) is not None
     
     @classmethod
     def parse_mr_url(cls, url: str) -> tuple[str, str, int]:
@@ -47,11 +183,28 @@ class GitLabProvider(MergeRequestProvider):
         Raises:
             ValueError: If URL format is invalid
         """
-        match = cls._URL_PATTERN.search(url)
+        match = cls._match(url)
         if not match:
             raise ValueError(f"Invalid GitLab MR URL: {url}")
-        return match.group(1), match.group(2), int(match.group(3))
+        return match["host"], match["path"], int(match["iid"])
     
+    def __init__(self, use_rest: bool = GITLAB_USE_REST, use_cache: bool = GITLAB_MR_CACHE) -> None:
+        """Create a GitLab provider.
+
+        Args:
+            use_rest: Skip the GraphQL query and use REST only (GitLab < 13.x)
+            use_cache: Reuse MR payloads cached on disk while the MR is unchanged
+        """
+        super().__init__()
+        self.use_rest = use_rest
+        self.use_cache = use_cache
+        # Built once; every request reuses these dicts
+        self._headers = self._get_headers()
+        # GraphQL accepts bearer auth rather than PRIVATE-TOKEN
+        self._graphql_headers = {"Content-Type": "application/json", "User-Agent": USER_AGENT}
+        if GITLAB_TOKEN:
+            self._graphql_headers["Authorization"] = f"Bearer {GITLAB_TOKEN}"
+
     def _get_headers(self) -> dict[str, str]:
         """Get HTTP headers for GitLab API requests."""
         headers = {
@@ -74,11 +227,141 @@ class GitLabProvider(MergeRequestProvider):
         # Default: construct API URL from host
         return f"https://{host}/api/v4"
     
-    async def load_mr(self, url: str) -> PRInfo:
+    async def _fetch_metadata(
+        self,
+        client: httpx.AsyncClient,
+        api_base: str,
+        project_path: str,
+        iid: int,
+        include_activity: bool = True,
+    ) -> tuple[dict, list[dict], list[dict], str | None]:
+        """Fetch MR metadata, commits and notes as REST-shaped JSON.
+
+        Uses a single GraphQL query unless use_rest is set, falling back to
+        three concurrent REST requests. Without include_activity only the MR
+        itself is fetched.
+
+        Returns:
+            Tuple of (mr_data, commits_data, notes_data, etag); etag is the
+            REST MR response's ETag, or None when GraphQL served the MR
+        """
+        mr_url = f"{api_base}/projects/{quote_plus(project_path)}/merge_requests/{iid}"
+        if not include_activity:
+            mr_resp = await client.get(mr_url, headers=self._headers, timeout=DEFAULT_TIMEOUT)
+            mr_resp.raise_for_status()
+            return mr_resp.json(), [], [], mr_resp.headers.get("ETag")
+
+        if not self.use_rest:
+            try:
+                mr_data, commits_data, notes_data = await self._fetch_metadata_graphql(
+                    client, api_base, project_path, iid
+                )
+                return mr_data, commits_data, notes_data, None
+            except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
+                logger.warning("GraphQL MR query failed, falling back to REST: %s", e)
+
+        mr_resp, commits_data, notes_data = await asyncio.gather(
+            client.get(mr_url, headers=self._headers, timeout=DEFAULT_TIMEOUT),
+            self._fetch_json_list(client, f"{mr_url}/commits", self._headers),
+            self._fetch_json_list(client, f"{mr_url}/notes", self._headers),
+            return_exceptions=True,
+        )
+
+        # MR metadata is required
+        if isinstance(mr_resp, BaseException):
+            raise mr_resp
+        mr_resp.raise_for_status()
+
+        # Commits and notes are optional
+        if isinstance(commits_data, BaseException):
+            logger.warning("Failed to fetch commits for %s!%d: %s", project_path, iid, commits_data)
+            commits_data = []
+        if isinstance(notes_data, BaseException):
+            logger.warning("Failed to fetch notes for %s!%d: %s", project_path, iid, notes_data)
+            notes_data = []
+
+        return mr_resp.json(), commits_data, notes_data, mr_resp.headers.get("ETag")
+
+    async def _fetch_metadata_graphql(
+        self,
+        client: httpx.AsyncClient,
+        api_base: str,
+        project_path: str,
+        iid: int,
+    ) -> tuple[dict, list[dict], list[dict]]:
+        """Fetch MR metadata, commits and notes with one GraphQL query.
+
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+            ValueError: If the response carries GraphQL errors
+        """
+        resp = await client.post(
+            _graphql_url(api_base),
+            json={
+                "query": _GRAPHQL_MR_QUERY,
+                "variables": {"projectPath": project_path, "iid": str(iid)},
+            },
+            headers=self._graphql_headers,
+            timeout=DEFAULT_TIMEOUT,
+        )
+        resp.raise_for_status()
+        payload = orjson.loads(resp.content)
+        if payload.get("errors"):
+            raise ValueError(payload["errors"][0].get("message", "GraphQL error"))
+
+        mr = payload["data"]["project"]["mergeRequest"]
+        mr_data, commits_data, notes_data = _graphql_mr_to_rest(mr)
+
+        # Rare long lists are read in full over REST rather than via GraphQL cursors
+        mr_url = f"{api_base}/projects/{quote_plus(project_path)}/merge_requests/{iid}"
+        if mr["commits"]["pageInfo"]["hasNextPage"]:
+            commits_data = await self._fetch_json_list(
+                client, f"{mr_url}/commits", self._headers
+            ) or commits_data
+        if mr["notes"]["pageInfo"]["hasNextPage"]:
+            notes_data = await self._fetch_json_list(
+                client, f"{mr_url}/notes", self._headers
+            ) or notes_data
+        return mr_data, commits_data, notes_data
+
+    async def _revalidate(
+        self,
+        client: httpx.AsyncClient,
+        mr_url: str,
+        cached: dict,
+    ) -> dict | None:
+        """Check whether a cached MR payload is still current.
+
+        Sends If-None-Match with the stored ETag. A 304, or a 200 whose
+        updated_at is the same instant as the cached one (for servers that
+        don't send ETags, or payloads first fetched over GraphQL), means
+        nothing changed.
+
+        Returns:
+            The cached payload (with a refreshed ETag), or None if it is stale
+        """
+        headers = self._headers
+        if cached.get("etag"):
+            headers = {**headers, "If-None-Match": cached["etag"]}
+        try:
+            resp = await client.get(mr_url, headers=headers, timeout=DEFAULT_TIMEOUT)
+        except httpx.HTTPError as e:
+            logger.warning("Failed to revalidate cached MR %s: %s", mr_url, e)
+            return None
+        if resp.status_code == 304:
+            return cached
+        if resp.status_code == 200:
+            updated_at = _parse_timestamp(resp.json().get("updated_at"))
+            if updated_at is not None and updated_at == _parse_timestamp(cached["mr"].get("updated_at")):
+                return {**cached, "etag": resp.headers.get("ETag")}
+        return None
+
+    async def load_mr(self, url: str, include_activity: bool = True) -> PRInfo:
         """Load MR metadata from GitLab.
 
         Args:
             url: GitLab MR URL
+            include_activity: Also fetch commits and comments
 
         Returns:
             PRInfo with metadata and file list
@@ -90,68 +373,75 @@ class GitLabProvider(MergeRequestProvider):
         # URL-encode the project path for API calls
         encoded_project = quote_plus(project_path)
 
-        async with httpx.AsyncClient() as client:
-            # Fetch MR metadata
-            mr_resp = await client.get(
-                f"{api_base}/projects/{encoded_project}/merge_requests/{iid}",
-                headers=self._get_headers(),
-                timeout=DEFAULT_TIMEOUT,
-            )
-            mr_resp.raise_for_status()
-            mr_data = mr_resp.json()
+        client = get_http_client()
+        mr_url = f"{api_base}/projects/{encoded_project}/merge_requests/{iid}"
+        cache_path = mr_cache_path(self.name, host, project_path, iid)
 
-            # Fetch changed files (includes diffs)
-            changes_resp = await client.get(
-                f"{api_base}/projects/{encoded_project}/merge_requests/{iid}/changes",
-                headers=self._get_headers(),
-                timeout=DEFAULT_TIMEOUT,
+        payload = None
+        # Payloads carry every diff; read and write them off the event loop
+        cached = await asyncio.to_thread(load_mr_payload, cache_path) if self.use_cache else None
+        # A cached metadata-only load can't serve a request for activity
+        if cached and (cached["activity"] or not include_activity):
+            payload = await self._revalidate(client, mr_url, cached)
+
+        if payload is None:
+            # Changes come from REST (GraphQL has no diffs); the rest is fetched alongside
+            changes_resp, metadata = await asyncio.gather(
+                client.get(f"{mr_url}/changes", headers=self._headers, timeout=DEFAULT_TIMEOUT),
+                self._fetch_metadata(client, api_base, project_path, iid, include_activity),
+                return_exceptions=True,
             )
+            for result in (changes_resp, metadata):
+                if isinstance(result, BaseException):
+                    raise result
             changes_resp.raise_for_status()
-            changes_data = changes_resp.json()
+            mr_data, commits_data, notes_data, etag = metadata
+            payload = {
+                "etag": etag,
+                "activity": include_activity,
+                "mr": mr_data,
+                "changes": changes_resp.json(),
+                "commits": commits_data,
+                "notes": notes_data,
+            }
+        if self.use_cache and payload is not cached:
+            await asyncio.to_thread(save_mr_payload, cache_path, payload)
 
-            # Fetch commits using helper
-            commits_data = await self._fetch_json_list(
-                client,
-                f"{api_base}/projects/{encoded_project}/merge_requests/{iid}/commits",
-                self._get_headers(),
-            )
-            commits_list = [
-                {
-                    "sha": c["id"],
-                    "message": c["message"],
-                    "author": {
-                        "name": c["author_name"],
-                        "date": c["created_at"],
-                        "login": c.get("author_email"),
-                        "avatar_url": None,
-                    },
-                    "html_url": c["web_url"],
-                }
-                for c in commits_data
-            ]
-
-            # Fetch comments using helper
-            notes_data = await self._fetch_json_list(
-                client,
-                f"{api_base}/projects/{encoded_project}/merge_requests/{iid}/notes",
-                self._get_headers(),
-            )
-            comments_list = [
-                {
-                    "id": n["id"],
-                    "user": {
-                        "login": n["author"]["username"],
-                        "avatar_url": n["author"].get("avatar_url"),
-                    },
-                    "body": n["body"],
-                    "created_at": n["created_at"],
-                    "html_url": f"{url}#note_{n['id']}",
-                }
-                for n in notes_data
-                if not n.get("system", False)  # Exclude system notes
-            ]
+        mr_data, changes_data = payload["mr"], payload["changes"]
+        commits_data, notes_data = payload["commits"], payload["notes"]
+
+        commits_list = [
+            {
+                "sha": c["id"],
+                "message": c["message"],
+                "author": {
+                    "name": c["author_name"],
+                    "date": c["created_at"],
+                    "login": c.get("author_email"),
+                    "avatar_url": None,
+                },
+                "html_url": c["web_url"],
+            }
+            for c in commits_data
+        ]
+
+        comments_list = [
+            {
+                "id": n["id"],
+                "user": {
+                    "login": n["author"]["username"],
+                    "avatar_url": n["author"].get("avatar_url"),
+                },
+                "body": n["body"],
+                "created_at": n["created_at"],
+                "html_url": f"{url}#note_{n['id']}",
+            }
+            for n in notes_data
+            if not n.get("system", False)  # Exclude system notes
+        ]
 
         # Parse files from changes response
+        diff_stats = mr_data.get("diff_stats") or {}
         files = []
         for change in changes_data.get("changes", []):
             # Determine status
@@ -164,13 +454,18 @@ class GitLabProvider(MergeRequestProvider):
             else:
                 status = "modified"
 
-            # Count additions/deletions from diff
+            path = change.get("new_path") or change.get("old_path")
             diff = change.get("diff", "")
-            additions = diff.count("\n+") - diff.count("\n+++")
-            deletions = diff.count("\n-") - diff.count("\n---")
+            if path in diff_stats:
+                additions, deletions = diff_stats[path]
+            else:
+                # GitLab's per-file diff starts at the first hunk, with no
+                # ---/+++ header lines, so every "\n+"/"\n-" is a changed line
+                additions = diff.count("\n+")
+                deletions = diff.count("\n-")
 
             files.append({
-                "path": change.get("new_path") or change.get("old_path"),
+                "path": path,
                 "status": status,
                 "additions": max(0, additions),
                 "deletions": max(0, deletions),
@@ -211,8 +506,14 @@ class GitLabProvider(MergeRequestProvider):
             changed_files=len(files),
             commits_list=commits_list,
             comments=comments_list,
-            # Store GitLab-specific data for file fetching
-            provider_metadata={"host": host, "project_path": project_path},
+            # Store GitLab-specific data for file fetching, with the quoted
+            # project URL built once rather than per file
+            provider_metadata={
+                "host": host,
+                "project_path": project_path,
+                "api_base": api_base,
+                "files_url": f"{api_base}/projects/{encoded_project}/repository/files",
+            },
         )
 
         # Cache for later file fetching
@@ -220,6 +521,22 @@ class GitLabProvider(MergeRequestProvider):
 
         return pr_info
 
+    def _project_for(self, review_id: str) -> tuple[PRInfo, str, str, str]:
+        """Look up a cached MR with its API base, project path and files URL.
+
+        Raises:
+            ValueError: If the review is not cached
+        """
+        pr_info = self._mr_cache.get(review_id)
+        if not pr_info:
+            raise ValueError(f"Review {review_id} not found")
+        # Get GitLab-specific data from provider_metadata
+        meta = pr_info.provider_metadata
+        project_path = meta.get("project_path", f"{pr_info.owner}/{pr_info.repo}")
+        api_base = meta.get("api_base") or self._get_api_base(meta.get("host", "gitlab.com"))
+        files_url = meta.get("files_url") or f"{api_base}/projects/{quote_plus(project_path)}/repository/files"
+        return pr_info, api_base, project_path, files_url
+
     async def get_file_contents(
         self, review_id: str, path: str
     ) -> tuple[FileContents | None, FileContents | None]:
@@ -232,55 +549,156 @@ class GitLabProvider(MergeRequestProvider):
         Returns:
             Tuple of (old_file, new_file) - either can be None for added/deleted files
         """
-        pr_info = self._mr_cache.get(review_id)
-        if not pr_info:
-            raise ValueError(f"Review {review_id} not found")
+        pr_info, _api_base, project_path, files_url = self._project_for(review_id)
+        base_sha, head_sha = pr_info.base_sha, pr_info.head_sha
+
+        client = get_http_client()
+        raw_url = f"{files_url}/{quote_plus(path)}/raw"
 
-        # Get GitLab-specific data from provider_metadata
         host = pr_info.provider_metadata.get("host", "gitlab.com")
-        project_path = pr_info.provider_metadata.get("project_path", f"{pr_info.owner}/{pr_info.repo}")
-        api_base = self._get_api_base(host)
-        encoded_project = quote_plus(project_path)
-        encoded_path = quote_plus(path)
 
-        base_sha, head_sha = pr_info.base_sha, pr_info.head_sha
+        async def fetch(ref: str) -> FileContents | None:
+            cache_key = f"{project_path}/{ref}/{path}"
+            disk_path = file_cache_path(self.name, host, cache_key) if self.use_cache else None
+            data = await asyncio.to_thread(load_file_bytes, disk_path) if disk_path else None
+            if data is None:
+                try:
+                    # Stream into one buffer and decode once, rather than holding
+                    # the response bytes alongside the decoded text
+                    async with client.stream(
+                        "GET",
+                        raw_url,
+                        headers=self._headers,
+                        params={"ref": ref},
+                        timeout=DEFAULT_TIMEOUT,
+                    ) as resp:
+                        if resp.status_code != 200:
+                            return None  # File doesn't exist at this ref (added or deleted file)
+                        buf = bytearray()
+                        async for chunk in resp.aiter_bytes(STREAM_CHUNK_SIZE):
+                            buf += chunk
+                        data = bytes(buf)
+                except httpx.HTTPStatusError:
+                    return None
+                if disk_path:
+                    await asyncio.to_thread(save_file_bytes, disk_path, data)
+            return FileContents(
+                name=path,
+                contents=data.decode("utf-8", errors="replace"),
+                cache_key=cache_key,
+            )
 
-        async with httpx.AsyncClient() as client:
-            old_file = None
-            new_file = None
+        # Base and head versions are independent
+        old_file, new_file = await asyncio.gather(fetch(base_sha), fetch(head_sha))
 
-            # Fetch base version
-            try:
-                base_resp = await client.get(
-                    f"{api_base}/projects/{encoded_project}/repository/files/{encoded_path}/raw",
-                    headers=self._get_headers(),
-                    params={"ref": base_sha},
-                    timeout=DEFAULT_TIMEOUT,
-                )
-                if base_resp.status_code == 200:
-                    old_file = FileContents(
-                        name=path,
-                        contents=base_resp.text,
-                        cache_key=f"{project_path}/{base_sha}/{path}",
-                    )
-            except httpx.HTTPStatusError:
-                pass  # File doesn't exist in base (new file)
-
-            # Fetch head version
+        return old_file, new_file
+
+    async def get_all_file_contents(
+        self, review_id: str, paths: list[str]
+    ) -> list[tuple[FileContents | None, FileContents | None]]:
+        """Get old and new file contents for many files in an MR.
+
+        Uses one GraphQL blobs query per ref (and per GRAPHQL_BLOB_BATCH paths),
+        falling back to concurrent per-file REST requests.
+
+        Args:
+            review_id: The review ID from load_mr
+            paths: File paths within the repo
+
+        Returns:
+            List of (old_file, new_file) tuples in the same order as paths
+
+        Raises:
+            ValueError: If the review is not cached
+        """
+        pr_info, api_base, project_path, _files_url = self._project_for(review_id)
+        if not self.use_rest:
             try:
-                head_resp = await client.get(
-                    f"{api_base}/projects/{encoded_project}/repository/files/{encoded_path}/raw",
-                    headers=self._get_headers(),
-                    params={"ref": head_sha},
-                    timeout=DEFAULT_TIMEOUT,
-                )
-                if head_resp.status_code == 200:
-                    new_file = FileContents(
-                        name=path,
-                        contents=head_resp.text,
-                        cache_key=f"{project_path}/{head_sha}/{path}",
-                    )
-            except httpx.HTTPStatusError:
-                pass  # File doesn't exist in head (deleted file)
+                return await self._get_all_file_contents_graphql(pr_info, api_base, project_path, paths)
+            except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
+                logger.warning("GraphQL blobs query failed, falling back to REST: %s", e)
 
-        return old_file, new_file
+        sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+        async def one(path: str) -> tuple[FileContents | None, FileContents | None]:
+            async with sem:
+                return await self.get_file_contents(review_id, path)
+
+        return list(await asyncio.gather(*(one(path) for path in paths)))
+
+    async def _get_all_file_contents_graphql(
+        self,
+        pr_info: PRInfo,
+        api_base: str,
+        project_path: str,
+        paths: list[str],
+    ) -> list[tuple[FileContents | None, FileContents | None]]:
+        """Fetch base and head contents of paths with GraphQL blobs queries.
+
+        Raises:
+            httpx.HTTPStatusError: If a request fails
+            ValueError: If a response carries GraphQL errors
+        """
+        client = get_http_client()
+        host = pr_info.provider_metadata.get("host", "gitlab.com")
+        refs = (pr_info.base_sha, pr_info.head_sha)
+
+        def disk_path(ref: str, path: str) -> Path:
+            return file_cache_path(self.name, host, f"{project_path}/{ref}/{path}")
+
+        def load_cached() -> dict[str, dict[str, str]]:
+            cached: dict[str, dict[str, str]] = {ref: {} for ref in refs}
+            for ref in refs:
+                for path in paths:
+                    data = load_file_bytes(disk_path(ref, path))
+                    if data is not None:
+                        cached[ref][path] = data.decode("utf-8", errors="replace")
+            return cached
+
+        def save_found(found_by_ref: list[tuple[str, dict[str, str]]]) -> None:
+            for ref, found in found_by_ref:
+                for path, text in found.items():
+                    save_file_bytes(disk_path(ref, path), text.encode())
+
+        # Serve what the on-disk cache already has; query only the rest.
+        # The cache probe and write-back each run as one batch off the event loop.
+        if self.use_cache:
+            blobs = await asyncio.to_thread(load_cached)
+        else:
+            blobs = {ref: {} for ref in refs}
+        queries = []
+        for ref in refs:
+            missing = [path for path in paths if path not in blobs[ref]]
+            queries += [(ref, missing[i:i + GRAPHQL_BLOB_BATCH]) for i in range(0, len(missing), GRAPHQL_BLOB_BATCH)]
+
+        async def fetch(ref: str, batch: list[str]) -> dict[str, str]:
+            resp = await client.post(
+                _graphql_url(api_base),
+                json={
+                    "query": _GRAPHQL_BLOBS_QUERY,
+                    "variables": {"projectPath": project_path, "ref": ref, "paths": batch},
+                },
+                headers=self._graphql_headers,
+                timeout=DEFAULT_TIMEOUT,
+            )
+            resp.raise_for_status()
+            payload = orjson.loads(resp.content)
+            if payload.get("errors"):
+                raise ValueError(payload["errors"][0].get("message", "GraphQL error"))
+            # Paths missing at this ref (added or deleted files) have no node
+            nodes = payload["data"]["project"]["repository"]["blobs"]["nodes"]
+            return {n["path"]: n["rawBlob"] for n in nodes if n["rawBlob"] is not None}
+
+        results = await asyncio.gather(*(fetch(ref, batch) for ref, batch in queries))
+        found_by_ref = [(ref, found) for (ref, _batch), found in zip(queries, results)]
+        for ref, found in found_by_ref:
+            blobs[ref].update(found)
+        if self.use_cache:
+            await asyncio.to_thread(save_found, found_by_ref)
+
+        def contents(ref: str, path: str) -> FileContents | None:
+            if path not in blobs[ref]:
+                return None
+            return FileContents(name=path, contents=blobs[ref][path], cache_key=f"{project_path}/{ref}/{path}")
+
+        return [(contents(refs[0], path), contents(refs[1], path)) for path in paths]
@@ -1,5 +1,8 @@
 """Provider registry for automatic provider detection."""
 
+import re
+
+from ..lru import LRUCache
 from .base import MergeRequestProvider
 from .github import GitHubProvider
 from .gitlab import GitLabProvider
@@ -11,8 +14,28 @@ PROVIDERS: list[type[MergeRequestProvider]] = [
     GitHubProvider,
 ]
 
-# Cache provider instances by review_id for file fetching
-_provider_cache: dict[str, MergeRequestProvider] = {}
+# One pattern for all providers. Each branch is a lookahead from the start of
+# the URL, so branches are tried in PROVIDERS order and the first match wins.
+_DISPATCH_RE = re.compile(
+    r"\A(?:"
+    + "|".join(f"(?=.*?(?:{cls.dispatch_pattern}))(?P<{cls.name}>)" for cls in PROVIDERS)
+    + ")",
+    re.DOTALL,
+)
+# One shared instance per provider: the HTTP clients are module-level and each
+# instance's review cache is bounded, so there is nothing to gain from a
+# fresh provider per load
+_PROVIDERS_BY_NAME: dict[str, MergeRequestProvider] = {cls.name: cls() for cls in PROVIDERS}
+
+# Reviews whose provider is kept for file fetching, and for how long (seconds)
+PROVIDER_CACHE_SIZE = 256
+PROVIDER_CACHE_TTL = 3600.0
+
+# Cache provider instances by review_id for file fetching. Bounded, since each
+# provider holds its loaded PRInfo and the server runs indefinitely.
+_provider_cache: LRUCache[MergeRequestProvider] = LRUCache(
+    maxsize=PROVIDER_CACHE_SIZE, ttl=PROVIDER_CACHE_TTL
+)
 
 
 def get_provider_for_url(url: str) -> MergeRequestProvider:
@@ -22,15 +45,16 @@ def get_provider_for_url(url: str) -> MergeRequestProvider:
         url: A merge/pull request URL
         
     Returns:
-        An instance of the appropriate provider
+        The shared instance of the appropriate provider
         
     Raises:
         ValueError: If no provider can handle the URL
     """
-    for provider_cls in PROVIDERS:
-        if provider_cls.can_handle(url):
-            return provider_cls()
-    raise ValueError(f"No provider found for URL: {url}")
+    match = _DISPATCH_RE.match(url)
+    name = match.lastgroup if match else None
+    if name is None:
+        raise ValueError(f"No provider found for URL: {url}")
+    return _PROVIDERS_BY_NAME[name]
 
 
 def get_provider_for_review(review_id: str) -> MergeRequestProvider | None:
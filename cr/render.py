@@ -1,5 +1,9 @@
 """Rich console rendering for CLI output."""
 
+import functools
+import re
+
+from pygments.lexers import get_lexer_by_name
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
@@ -14,6 +18,21 @@ from .types import RLMTrace
 console = Console()
 
 
+# Resolved once rather than by name on every Syntax render
+_PYTHON_LEXER = get_lexer_by_name("python")
+_SYNTAX_THEME = Syntax.get_theme("monokai")
+# Code this short (on one line) is shown without Pygments highlighting
+PLAIN_CODE_CHARS = 200
+
+
+@functools.lru_cache(maxsize=128)
+def _code_renderable(code: str) -> Syntax | Text:
+    """Highlight a code block, skipping Pygments for one-liners."""
+    if len(code) < PLAIN_CODE_CHARS and "\n" not in code:
+        return Text(code, style="green")
+    return Syntax(code, _PYTHON_LEXER, theme=_SYNTAX_THEME, line_numbers=False)
+
+
 def print_step(step_num: int, reasoning: str, code: str):
     """Print a single RLM step with reasoning and code panels."""
     console.print()
@@ -38,7 +57,7 @@ def print_step(step_num: int, reasoning: str, code: str):
 
         console.print(
             Panel(
-                Syntax(code, "python", theme="monokai", line_numbers=False),
+                _code_renderable(code),
                 title="[green]Code[/green]",
                 border_style="green",
                 padding=(0, 1),
@@ -46,35 +65,47 @@ def print_step(step_num: int, reasoning: str, code: str):
         )
 
 
-def print_answer(answer: str, sources: list[str] | None = None):
-    """Print the final answer with sources."""
-    console.print()
-    console.rule("[bold green]Answer[/bold green]", style="green")
-    console.print()
+# Characters that can start Markdown formatting; answers without them print as-is
+_MARKDOWN_CHARS_RE = re.compile(r"[\n`*_#\[>|]")
+_RESPONSE_TITLE = Text.from_markup("[bold white]Response[/bold white]")
 
-    console.print(
-        Panel(
-            Markdown(answer),
-            title="[bold white]Response[/bold white]",
-            border_style="green",
-            padding=(1, 2),
-        )
-    )
 
-    if sources:
+def _answer_renderable(answer: str) -> Markdown | Text:
+    """Render Markdown only when the answer could contain any."""
+    if _MARKDOWN_CHARS_RE.search(answer) is None:
+        return Text(answer)
+    return Markdown(answer)
+
+
+def _response_panel(renderable: Markdown | Text) -> Panel:
+    """Wrap an answer in the response panel."""
+    return Panel(renderable, title=_RESPONSE_TITLE, border_style="green", padding=(1, 2))
+
+
+def print_answer(answer: str, sources: list[str] | None = None):
+    """Print the final answer with sources."""
+    # Buffer the whole block so it reaches the terminal in a single write
+    with console:
         console.print()
-        text = "\n".join(f"• {s}" for s in sources)
-        console.print(
-            Panel(
-                text,
-                title="[bold blue]Sources[/bold blue]",
-                border_style="blue",
-                padding=(0, 1),
+        console.rule("[bold green]Answer[/bold green]", style="green")
+        console.print()
+
+        console.print(_response_panel(_answer_renderable(answer)))
+
+        if sources:
+            console.print()
+            text = "\n".join(f"• {s}" for s in sources)
+            console.print(
+                Panel(
+                    text,
+                    title="[bold blue]Sources[/bold blue]",
+                    border_style="blue",
+                    padding=(0, 1),
+                )
             )
-        )
 
 
-def print_welcome(repo_path: str, file_count: int):
+def print_welcome(repo_path: str, file_count: int | str):
     """Print welcome message with repo info."""
     console.print()
     console.print(
@@ -1,37 +1,47 @@
 """RLM runner with DSPy configuration and trace capture."""
 
+import functools
 import json
 import logging
 import os
+import re
 import subprocess
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import dspy
+import orjson
 from dspy.primitives.python_interpreter import PythonInterpreter
 
 from .config import (
-    CR_CACHE_DIR,
     MAIN_MODEL,
     MAX_ITERATIONS,
     MAX_LLM_CALLS,
     SUB_MODEL,
     TRACES_DIR,
+    ensure_cache_dirs,
 )
-from .snapshot import build_snapshot
+from .snapshot_cache import load_or_build
 from .types import CodebaseSnapshot, RLMTrace, TraceStep
 
+logger = logging.getLogger(__name__)
 
-def build_deno_command() -> list[str]:
+
+@functools.lru_cache(maxsize=1)
+def build_deno_command() -> tuple[str, ...]:
     """Build a Deno command for RLM code execution.
 
     This is needed for Deno 2.x compatibility where npm packages (like pyodide)
     are stored in Deno's global cache. We use --node-modules-dir=false to ensure
     Deno uses its global npm cache rather than looking for a local node_modules.
 
+    The result is computed once per process (`deno info` is a subprocess);
+    call build_deno_command.cache_clear() to recompute it.
+
     Returns:
-        List of command arguments for Deno
+        Tuple of command arguments for Deno
     """
     # Get Deno's cache directory
     deno_dir = ""
@@ -62,12 +72,12 @@ def build_deno_command() -> list[str]:
 
     # Deno 2.x: Use --node-modules-dir=false to use global npm cache
     # This is critical for Deno 2.x which otherwise looks for local node_modules
-    return [
+    return (
         'deno', 'run',
         '--node-modules-dir=false',  # Use Deno's global npm cache
         f'--allow-read={",".join(read_paths)}',
         runner_path
-    ]
+    )
 
 
 class TraceCapture:
@@ -91,6 +101,14 @@ class TraceCapture:
         )
 
 
+# "RLM iteration N/M" header line, then Reasoning: ... and an optional Code: ...
+_LOG_RE = re.compile(
+    r"RLM iteration\s*(?P<iter>\d+)?[^\n]*\n.*?Reasoning:(?P<reasoning>.*?)(?:Code:(?P<code>.*))?\Z",
+    re.DOTALL,
+)
+_FENCE_RE = re.compile(r"\A```(?:python)?|```\Z")
+
+
 class RLMLogHandler(logging.Handler):
     """Logging handler that captures RLM iteration logs."""
 
@@ -104,39 +122,16 @@ class RLMLogHandler(logging.Handler):
         if "RLM iteration" not in msg:
             return
 
-        parts = msg.split("\n", 1)
-        header = parts[0]
-
-        # Extract iteration number
-        try:
-            iter_num = int(header.split("iteration")[1].strip().split("/")[0].strip())
-        except (ValueError, IndexError):
-            iter_num = self.trace_capture.current_step + 1
-
-        if len(parts) <= 1 or "Reasoning:" not in parts[1]:
+        match = _LOG_RE.search(msg)
+        if match is None:
             return
 
-        content = parts[1]
-        reasoning_start = content.find("Reasoning:") + len("Reasoning:")
-        code_start = content.find("Code:")
-
-        if code_start > 0:
-            reasoning = content[reasoning_start:code_start].strip()
-            code = content[code_start + len("Code:"):].strip()
-        else:
-            reasoning = content[reasoning_start:].strip()
-            code = ""
-
+        iter_num = int(match["iter"]) if match["iter"] else self.trace_capture.current_step + 1
+        reasoning = match["reasoning"].strip()
+        code = match["code"] or ""
         # Clean up code block markers
         if code:
-            code = code.strip()
-            for prefix in ("```python", "```"):
-                if code.startswith(prefix):
-                    code = code[len(prefix):]
-                    break
-            if code.endswith("```"):
-                code = code[:-3]
-            code = code.strip()
+            code = _FENCE_RE.sub("", code.strip()).strip()
 
         self.trace_capture.add_step(reasoning=reasoning, code=code)
 
@@ -163,25 +158,57 @@ def setup_rlm_logging(trace_capture: TraceCapture, on_step: Callable[[int, str,
 
 def save_trace(trace: RLMTrace) -> Path:
     """Save trace to JSON file."""
-    TRACES_DIR.mkdir(parents=True, exist_ok=True)
+    ensure_cache_dirs()
     timestamp = trace.started_at.strftime("%Y%m%d_%H%M%S")
     filename = f"{timestamp}.json"
     filepath = TRACES_DIR / filename
 
-    with open(filepath, "w") as f:
-        json.dump(trace.to_dict(), f, indent=2)
+    # orjson encodes long reasoning/code strings far faster than json.dump;
+    # OPT_NON_STR_KEYS keeps json's tolerance for non-string artifact keys
+    filepath.write_bytes(
+        orjson.dumps(trace.to_dict(), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    )
 
     return filepath
 
 
+# One writer thread keeps traces in submission order. Pending writes finish
+# before the interpreter exits (concurrent.futures joins its workers).
+_TRACE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-writer")
+
+
+def _save_trace_logged(trace: RLMTrace) -> None:
+    """Save a trace from the writer thread, logging rather than raising."""
+    try:
+        save_trace(trace)
+    except Exception:
+        logger.exception("Failed to save trace")
+
+
+# Last formatted history: sessions append one turn per question, so the next
+# call only formats what's new
+_history_cache: tuple[tuple[tuple[str, str], ...], str] | None = None
+
+
 def format_history(history: list[tuple[str, str]]) -> str:
-    """Format conversation history for RLM input."""
+    """Format conversation history for RLM input, reusing the previous call's text."""
+    global _history_cache
     if not history:
         return "No previous conversation."
-    lines = ["Previous conversation:"]
-    for i, (q, a) in enumerate(history, 1):
-        lines.extend([f"\nQ{i}: {q}", f"A{i}: {a}"])
-    return "\n".join(lines)
+
+    turns = tuple(history)
+    cached = _history_cache
+    if cached is not None and turns[:len(cached[0])] == cached[0]:
+        # Same history with new turns appended: format only those
+        prev_turns, text = cached
+        start = len(prev_turns)
+    else:
+        text, start = "Previous conversation:", 0
+    new_turns = [f"\nQ{i}: {q}\nA{i}: {a}" for i, (q, a) in enumerate(turns[start:], start + 1)]
+    if new_turns:
+        text = "\n".join([text, *new_turns])
+    _history_cache = (turns, text)
+    return text
 
 
 class CodebaseReviewRLM:
@@ -225,6 +252,7 @@ class CodebaseReviewRLM:
         question: str,
         history: list[tuple[str, str]] | None = None,
         save_trace_file: bool = True,
+        snapshot: CodebaseSnapshot | None = None,
     ) -> tuple[str, list[str], RLMTrace]:
         """Run the RLM on a codebase with a question.
 
@@ -233,14 +261,16 @@ class CodebaseReviewRLM:
             question: The question to answer
             history: Optional conversation history as [(question, answer), ...]
             save_trace_file: Whether to save the trace to a file
+            snapshot: Prebuilt snapshot of repo_path, if the caller has one
 
         Returns:
             Tuple of (answer, sources, trace)
         """
         self._ensure_configured()
 
-        # Build snapshot
-        snapshot = build_snapshot(repo_path)
+        # Build snapshot (reused from the on-disk cache if the repo is unchanged)
+        if snapshot is None:
+            snapshot = load_or_build(repo_path)
 
         # Create trace
         trace = RLMTrace(
@@ -281,9 +311,9 @@ class CodebaseReviewRLM:
             rlm_logger = logging.getLogger("dspy.predict.rlm")
             rlm_logger.removeHandler(handler)
 
-            # Save trace
+            # Save trace in the background; the caller doesn't wait on disk I/O
             if save_trace_file:
-                save_trace(trace)
+                _TRACE_EXECUTOR.submit(_save_trace_logged, trace)
 
         return answer, sources, trace
 
@@ -292,6 +322,7 @@ class CodebaseReviewRLM:
         repo_path: str | Path,
         question: str,
         save_trace_file: bool = True,
+        snapshot: CodebaseSnapshot | None = None,
     ) -> tuple[str, list[str], RLMTrace]:
         """Run a one-shot question (no history).
 
@@ -299,9 +330,12 @@ class CodebaseReviewRLM:
             repo_path: Path to the repository
             question: The question to answer
             save_trace_file: Whether to save the trace to a file
+            snapshot: Prebuilt snapshot of repo_path, if the caller has one
 
         Returns:
             Tuple of (answer, sources, trace)
         """
-        return self.run(repo_path, question, history=None, save_trace_file=save_trace_file)
+        return self.run(
+            repo_path, question, history=None, save_trace_file=save_trace_file, snapshot=snapshot
+        )
 
@@ -1,25 +1,97 @@
 """FastAPI server for Part 2: Web UI backend."""
 
 import asyncio
-import json
-from typing import AsyncGenerator
-
-from fastapi import FastAPI, HTTPException, Query
+import logging
+import threading
+from collections.abc import AsyncGenerator, Callable, Coroutine
+from contextlib import asynccontextmanager, suppress
+from typing import Any, Literal
+
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ConfigDict
 from sse_starlette.sse import EventSourceResponse
+from starlette.background import BackgroundTask
 
-from .config import API_HOST, API_PORT
-from .diff_rlm import FastAutoReview, DiffQARLM
+from .config import API_HOST, API_PORT, WARMUP_ON_STARTUP
+from .diff_rlm import DiffQARLM, FastAutoReview
 from .diff_types import DiffFileContext, DiffSelection, FileContents, RLMIteration
 from .providers import get_provider_for_url
-from .providers.registry import get_provider_for_review, cache_provider
+from .providers._http import close_http_client
+from .providers.registry import cache_provider, get_provider_for_review
+
+logger = logging.getLogger(__name__)
+
+
+def _warmup_rlms(*rlms: DiffQARLM | FastAutoReview) -> None:
+    """Configure RLM modules ahead of the first request (LM setup, Deno probe)."""
+    for rlm in rlms:
+        try:
+            rlm._ensure_configured()
+        except Exception as e:
+            logger.warning("Warmup of %s failed: %s", type(rlm).__name__, e)
+
+
+def _log_warmup_failure(task: asyncio.Task) -> None:
+    """Log an unexpected warmup error instead of leaving it unretrieved on the task."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("RLM warmup failed: %s", task.exception())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the RLM singletons on startup and close shared HTTP clients on shutdown."""
+    warmup_task = None
+    if WARMUP_ON_STARTUP:
+        # Create the singletons here so the worker thread doesn't race the getters
+        rlms = (get_diff_qa_rlm(), get_auto_review_rlm())
+        warmup_task = asyncio.create_task(asyncio.to_thread(_warmup_rlms, *rlms))
+        warmup_task.add_done_callback(_log_warmup_failure)
+        app.state.warmup_task = warmup_task
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        # The worker thread can't be interrupted, but shutdown needn't wait on it
+        warmup_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup_task
+    await close_http_client()
+
+
+class OrjsonRequest(Request):
+    """Request whose JSON body is decoded with orjson instead of the stdlib."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI
+            # still answers malformed bodies with a 422
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class OrjsonRoute(APIRoute):
+    """Route that hands endpoints an OrjsonRequest, so request models parse from orjson."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(OrjsonRequest(request.scope, request.receive))
+
+        return route_handler
+
 
 app = FastAPI(
     title="CR Review API",
     description="API for GitHub PR code review with Gemini RLM",
     version="0.1.0",
+    lifespan=lifespan,
 )
+# Must be set before the routes below are declared
+app.router.route_class = OrjsonRoute
 
 # CORS for local development
 app.add_middleware(
@@ -30,28 +102,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress PR metadata and file contents; Starlette leaves text/event-stream alone
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response encoded with orjson.
+
+    Endpoints whose payloads are built by our own to_dict() methods return one
+    of these with plain dicts, skipping response-model validation and
+    jsonable_encoder. Their response_model stays in the decorator for the
+    OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
 # RLM instances
 _diff_qa_rlm: DiffQARLM | None = None
 _auto_review_rlm: FastAutoReview | None = None
+# Guards first construction so concurrent callers share one instance
+_rlm_lock = threading.Lock()
 
 
 def get_diff_qa_rlm() -> DiffQARLM:
     global _diff_qa_rlm
     if _diff_qa_rlm is None:
-        _diff_qa_rlm = DiffQARLM()
+        with _rlm_lock:
+            if _diff_qa_rlm is None:
+                _diff_qa_rlm = DiffQARLM()
     return _diff_qa_rlm
 
 
 def get_auto_review_rlm() -> FastAutoReview:
     global _auto_review_rlm
     if _auto_review_rlm is None:
-        _auto_review_rlm = FastAutoReview()
+        with _rlm_lock:
+            if _auto_review_rlm is None:
+                _auto_review_rlm = FastAutoReview()
     return _auto_review_rlm
 
 
 # Request/Response models
 class LoadPRRequest(BaseModel):
     prUrl: str
+    # False skips commits and comments for a faster metadata-only load
+    includeActivity: bool = True
 
 
 class LoadPRResponse(BaseModel):
@@ -80,11 +177,30 @@ class FileContentsResponse(BaseModel):
     newFile: dict | None
 
 
+class DiffSelectionModel(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    path: str = ""
+    side: Literal["additions", "deletions", "unified"] = "unified"
+    startLine: int = 1
+    endLine: int = 1
+    mode: Literal["range", "single-line", "hunk", "file", "changeset"] = "changeset"
+
+    def to_selection(self) -> DiffSelection:
+        return DiffSelection(
+            path=self.path,
+            side=self.side,
+            start_line=self.startLine,
+            end_line=self.endLine,
+            mode=self.mode,
+        )
+
+
 class AskRequest(BaseModel):
     reviewId: str
     question: str
     conversation: list[dict] = []
-    selection: dict | None = None
+    selection: DiffSelectionModel | None = None
 
 
 class AskResponse(BaseModel):
@@ -113,9 +229,10 @@ async def api_load_pr(request: LoadPRRequest):
     """Load a GitHub/GitLab PR/MR for review."""
     try:
         provider = get_provider_for_url(request.prUrl)
-        pr_info = await provider.load_mr(request.prUrl)
+        pr_info = await provider.load_mr(request.prUrl, include_activity=request.includeActivity)
         cache_provider(pr_info.review_id, provider)
-        return LoadPRResponse(**pr_info.to_dict())
+        # Same shape as LoadPRResponse, without validating every file and commit dict
+        return OrjsonResponse(pr_info.to_dict())
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -133,10 +250,10 @@ async def api_get_file(
         if not provider:
             raise ValueError(f"Review {reviewId} not found")
         old_file, new_file = await provider.get_file_contents(reviewId, path)
-        return FileContentsResponse(
-            oldFile={"name": old_file.name, "contents": old_file.contents, "cacheKey": old_file.cache_key} if old_file else None,
-            newFile={"name": new_file.name, "contents": new_file.contents, "cacheKey": new_file.cache_key} if new_file else None,
-        )
+        return OrjsonResponse({
+            "oldFile": {"name": old_file.name, "contents": old_file.contents, "cacheKey": old_file.cache_key} if old_file else None,
+            "newFile": {"name": new_file.name, "contents": new_file.contents, "cacheKey": new_file.cache_key} if new_file else None,
+        })
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -149,15 +266,7 @@ async def api_ask(request: AskRequest):
     try:
         rlm = get_diff_qa_rlm()
         
-        selection = None
-        if request.selection:
-            selection = DiffSelection(
-                path=request.selection.get("path", ""),
-                side=request.selection.get("side", "unified"),
-                start_line=request.selection.get("startLine", 1),
-                end_line=request.selection.get("endLine", 1),
-                mode=request.selection.get("mode", "changeset"),
-            )
+        selection = request.selection.to_selection() if request.selection else None
         
         blocks, citations = await rlm.ask(
             review_id=request.reviewId,
@@ -166,10 +275,10 @@ async def api_ask(request: AskRequest):
             selection=selection,
         )
         
-        return AskResponse(
-            answerBlocks=[b.to_dict() for b in blocks],
-            citations=[c.to_dict() for c in citations],
-        )
+        return OrjsonResponse({
+            "answerBlocks": [b.to_dict() for b in blocks],
+            "citations": [c.to_dict() for c in citations],
+        })
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -183,10 +292,10 @@ async def api_review(reviewId: str = Query(...)):
         rlm = get_auto_review_rlm()
         issues, summary = await rlm.review(review_id=reviewId)
 
-        return ReviewResponse(
-            issues=[i.to_dict() for i in issues],
-            summary=summary,
-        )
+        return OrjsonResponse({
+            "issues": [i.to_dict() for i in issues],
+            "summary": summary,
+        })
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -225,6 +334,11 @@ async def api_suggestions(request: SuggestionRequest):
         ])
 
 
+def _sse(type_: str, data: dict) -> dict:
+    """Build an SSE message event whose data is the orjson-encoded envelope."""
+    return {"event": "message", "data": orjson.dumps({"type": type_, "data": data}).decode()}
+
+
 async def _stream_ask_response(
     review_id: str,
     question: str,
@@ -240,7 +354,11 @@ async def _stream_ask_response(
 
     try:
         # Send start event
-        yield {"event": "message", "data": json.dumps({"type": "start", "data": {"question": question}})}
+        yield _sse("start", {"question": question})
+
+        # Configure the RLM (or wait for the startup warmup to finish) off the
+        # event loop, so the start event reaches the client first
+        await asyncio.to_thread(rlm._ensure_configured)
 
         # Stream RLM iterations using the new streaming method
         blocks = []
@@ -253,70 +371,144 @@ async def _stream_ask_response(
             selection=selection,
         ):
             if isinstance(item, RLMIteration):
-                # Stream iteration event
+                # Stream iteration event; the iteration serializes itself, so
+                # only the envelope is added around its JSON
                 yield {
                     "event": "message",
-                    "data": json.dumps({
-                        "type": "iteration",
-                        "data": item.to_dict(),
-                    }),
+                    "data": (b'{"type":"iteration","data":' + item.to_json_bytes() + b"}").decode(),
                 }
-                await asyncio.sleep(0.01)
             else:
                 # Final result: tuple of (blocks, citations)
                 blocks, citations = item
 
-        # Stream each answer block
-        for i, block in enumerate(blocks):
-            yield {
-                "event": "message",
-                "data": json.dumps({
-                    "type": "block",
-                    "data": {"index": i, "block": block.to_dict()},
-                }),
-            }
-            await asyncio.sleep(0.01)
-
-        # Send citations
-        yield {
-            "event": "message",
-            "data": json.dumps({
-                "type": "citations",
-                "data": {"citations": [c.to_dict() for c in citations]},
-            }),
-        }
+        # Serialize the answer in one pass once the run is done; _StreamBroadcast
+        # then replays these encoded events to every subscriber
+        answer_events = [_sse("block", {"index": i, "block": block.to_dict()}) for i, block in enumerate(blocks)]
+        answer_events.append(_sse("citations", {"citations": [c.to_dict() for c in citations]}))
+
+        # Stream each answer block, then the citations
+        for event in answer_events:
+            yield event
 
         # Send complete
-        yield {"event": "message", "data": json.dumps({"type": "complete", "data": {}})}
+        yield _sse("complete", {})
 
     except Exception as e:
-        yield {"event": "message", "data": json.dumps({"type": "error", "data": {"error": str(e)}})}
+        yield _sse("error", {"error": str(e)})
+
+
+class _StreamBroadcast:
+    """One streamed RLM run whose encoded SSE events are shared by every subscriber.
+
+    Events are kept so late subscribers replay the run from the start. The run
+    is cancelled once its last subscriber is released; a run cancelled while
+    others still listen ends their streams with an error event.
+    """
+
+    def __init__(self, source: AsyncGenerator[dict, None]):
+        self.events: list[dict] = []
+        self.done = False
+        self.subscribers = 0
+        self._new_event = asyncio.Event()
+        self.task = asyncio.create_task(self._run(source))
+
+    async def _run(self, source: AsyncGenerator[dict, None]) -> None:
+        try:
+            async for event in source:
+                self.events.append(event)
+                self._new_event.set()
+                self._new_event = asyncio.Event()
+        except asyncio.CancelledError:
+            # Give anyone still replaying the run a terminal event
+            self.events.append(_sse("error", {"error": "Stream was cancelled"}))
+            raise
+        finally:
+            self.done = True
+            self._new_event.set()
+
+    def attach(self) -> Callable[[], None]:
+        """Count a subscriber now and return a callback that releases it once."""
+        self.subscribers += 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                self.done = True
+                self.task.cancel()
+
+        return release
+
+    async def subscribe(self, release: Callable[[], None]) -> AsyncGenerator[dict, None]:
+        """Yield every event of the run, waiting for new ones until it finishes."""
+        try:
+            i = 0
+            while True:
+                while i < len(self.events):
+                    yield self.events[i]
+                    i += 1
+                if self.done and i == len(self.events):
+                    return
+                await self._new_event.wait()
+        finally:
+            release()
+
+
+# In-flight streams keyed by the full request, so identical asks share one run
+_active_streams: dict[tuple, _StreamBroadcast] = {}
+
+
+def _shared_stream(
+    key: tuple, start: Callable[[], AsyncGenerator[dict, None]]
+) -> tuple[_StreamBroadcast, Callable[[], None]]:
+    """Return the in-flight broadcast for key and a release callback for the new subscriber.
+
+    A broadcast is started if none is running. The subscriber is counted before
+    returning, so the run isn't cancelled while its stream has yet to start.
+    """
+    broadcast = _active_streams.get(key)
+    if broadcast is None or broadcast.done:
+        broadcast = _StreamBroadcast(start())
+        _active_streams[key] = broadcast
+
+        def forget(_task: asyncio.Task) -> None:
+            if _active_streams.get(key) is broadcast:
+                del _active_streams[key]
+
+        broadcast.task.add_done_callback(forget)
+    return broadcast, broadcast.attach()
 
 
 @app.post("/api/diff/ask/stream")
 async def api_ask_stream(request: AskRequest):
     """Ask a question about the diff with streaming response (SSE)."""
-    selection = None
-    if request.selection:
-        selection = DiffSelection(
-            path=request.selection.get("path", ""),
-            side=request.selection.get("side", "unified"),
-            start_line=request.selection.get("startLine", 1),
-            end_line=request.selection.get("endLine", 1),
-            mode=request.selection.get("mode", "changeset"),
-        )
+    selection = request.selection.to_selection() if request.selection else None
+
+    key = (
+        request.reviewId,
+        request.question,
+        orjson.dumps(request.conversation, option=orjson.OPT_SORT_KEYS),
+        request.selection,
+    )
+    broadcast, release = _shared_stream(key, lambda: _stream_ask_response(
+        review_id=request.reviewId,
+        question=request.question,
+        conversation=request.conversation,
+        selection=selection,
+    ))
 
     return EventSourceResponse(
-        _stream_ask_response(
-            review_id=request.reviewId,
-            question=request.question,
-            conversation=request.conversation,
-            selection=selection,
-        ),
+        broadcast.subscribe(release),
         headers={
             "X-Accel-Buffering": "no",
             "Cache-Control": "no-cache",
         },
+        # Release even if the stream never started iterating
+        background=BackgroundTask(release),
     )
 
 
@@ -333,9 +525,9 @@ async def test_sse():
     async def generate():
         import asyncio
         for i in range(5):
-            yield {"event": "message", "data": json.dumps({"type": "test", "count": i})}
+            yield {"event": "message", "data": orjson.dumps({"type": "test", "count": i}).decode()}
             await asyncio.sleep(0.5)
-        yield {"event": "message", "data": json.dumps({"type": "complete"})}
+        yield {"event": "message", "data": orjson.dumps({"type": "complete"}).decode()}
 
     return EventSourceResponse(
         generate(),
@@ -346,8 +538,16 @@ async def test_sse():
     )
 
 
-def run_server():
-    """Run the FastAPI server."""
+def run_server(host: str | None = None, port: int | None = None):
+    """Run the FastAPI server, on uvloop and httptools when they are installed."""
+    import importlib.util
+
     import uvicorn
-    uvicorn.run(app, host=API_HOST, port=API_PORT)
+    uvicorn.run(
+        app,
+        host=host or API_HOST,
+        port=port or API_PORT,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+    )
 
@@ -1,21 +1,36 @@
 """Build a CodebaseSnapshot from a repository path."""
 
-import fnmatch
+import bisect
 import hashlib
 import os
 import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import TypeVar
+
+try:
+    import xxhash  # Optional: pip install "cr[xxhash]"
+except ImportError:
+    xxhash = None
 
 from .config import (
-    DEFAULT_IGNORE_PATTERNS,
-    EXCLUDE_GLOBS,
-    INCLUDE_GLOBS,
     MAX_FILE_BYTES,
     MAX_TOTAL_BYTES,
-    PRIORITY_PATTERNS,
+    is_excluded,
+    is_ignored,
+    is_included,
+    is_priority,
 )
 from .types import CodebaseSnapshot, FileInfo, RepoInfo, SymbolTag
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Threads reading and hashing files in build_snapshot
+SNAPSHOT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 
 # Language detection by extension
 EXTENSION_TO_LANGUAGE: dict[str, str] = {
@@ -110,60 +125,54 @@ def detect_language(path: Path) -> str:
 def should_ignore(path: Path, repo_root: Path) -> bool:
     """Check if a path should be ignored."""
     rel_path = str(path.relative_to(repo_root))
-    parts = path.parts
-
-    # Check default ignore patterns
-    for pattern in DEFAULT_IGNORE_PATTERNS:
-        # Check if any part matches
-        for part in parts:
-            if fnmatch.fnmatch(part, pattern):
-                return True
-        # Check full path
-        if fnmatch.fnmatch(rel_path, pattern):
-            return True
-
-    # Check user exclude globs
-    for pattern in EXCLUDE_GLOBS:
-        if pattern and fnmatch.fnmatch(rel_path, pattern.strip()):
-            return True
-
-    return False
+    # Default ignore patterns apply to each part and the full path; user
+    # exclude globs to the repo-relative path
+    return any(is_ignored(part) for part in path.parts) or is_ignored(rel_path) or is_excluded(rel_path)
 
 
 def matches_include_globs(path: Path, repo_root: Path) -> bool:
     """Check if path matches include globs (if any are specified)."""
-    if not INCLUDE_GLOBS:
-        return True  # No include globs = include everything not ignored
-
-    rel_path = str(path.relative_to(repo_root))
-    for pattern in INCLUDE_GLOBS:
-        if pattern and fnmatch.fnmatch(rel_path, pattern.strip()):
-            return True
-    return False
+    return is_included(str(path.relative_to(repo_root)))
 
 
 def is_priority_file(path: Path, repo_root: Path) -> bool:
     """Check if file matches priority patterns."""
     rel_path = str(path.relative_to(repo_root))
-    for pattern in PRIORITY_PATTERNS:
-        if fnmatch.fnmatch(rel_path, pattern):
-            return True
-        if fnmatch.fnmatch(path.name, pattern):
-            return True
-    return False
+    return is_priority(rel_path) or is_priority(path.name)
 
 
-def compute_sha1(content: bytes) -> str:
-    """Compute SHA1 hash of content."""
+def content_hash(content: bytes) -> str:
+    """Fingerprint file content (identity only, not a security boundary)."""
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(content)
     return hashlib.sha1(content).hexdigest()
 
 
+# Leading bytes checked for NULs when deciding a file is binary
+BINARY_SNIFF_BYTES = 8192
+
+
 def is_binary(content: bytes) -> bool:
     """Check if content appears to be binary."""
     # Check for null bytes in first 8KB
-    return b"\x00" in content[:8192]
+    return b"\x00" in content[:BINARY_SNIFF_BYTES]
 
 
+def read_text_bytes(path: str) -> bytes | None:
+    """Read a file's bytes, or return None if its first 8KB look binary.
+
+    Binary files are rejected after the first chunk instead of being read whole.
+    """
+    with open(path, "rb") as f:
+        head = f.read(BINARY_SNIFF_BYTES)
+        if is_binary(head):
+            return None
+        rest = f.read()
+    return head + rest if rest else head
+
+
+_NEWLINE_RE = re.compile("\n")
+
 # Simple regex patterns for symbol extraction
 SYMBOL_PATTERNS: dict[str, list[tuple[str, re.Pattern]]] = {
     "python": [
@@ -203,27 +212,113 @@ def extract_symbols(content: str, language: str) -> list[SymbolTag]:
     if not patterns:
         return []
 
-    symbols: list[SymbolTag] = []
-    lines = content.split("\n")
+    # Offsets of every newline, so a match's line number is a binary search
+    newlines = [m.start() for m in _NEWLINE_RE.finditer(content)]
 
+    # First kind found for a (symbol, line) wins, as patterns are listed by precedence
+    unique: dict[tuple[str, int], SymbolTag] = {}
     for kind, pattern in patterns:
         for match in pattern.finditer(content):
             symbol = match.group(1)
-            # Find line number
-            line_no = content[:match.start()].count("\n") + 1
-            symbols.append(SymbolTag(symbol=symbol, kind=kind, line_no=line_no))
+            line_no = bisect.bisect_left(newlines, match.start()) + 1
+            unique.setdefault((symbol, line_no), SymbolTag(symbol=symbol, kind=kind, line_no=line_no))
+
+    return sorted(unique.values(), key=lambda s: (s["line_no"], s["symbol"]))
 
-    # Sort by line number and dedupe
-    symbols.sort(key=lambda s: (s["line_no"], s["symbol"]))
-    seen = set()
-    unique = []
-    for s in symbols:
-        key = (s["symbol"], s["line_no"])
-        if key not in seen:
-            seen.add(key)
-            unique.append(s)
 
-    return unique
+def _skip_entry(name: str, rel_path: str) -> bool:
+    """should_ignore for a walk entry whose parent directories already passed."""
+    return is_ignored(name) or is_ignored(rel_path) or is_excluded(rel_path)
+
+
+def scan_files(repo_root: Path) -> list[tuple[str, os.DirEntry]]:
+    """Walk the repository and return (rel_path, entry) for every file that isn't ignored.
+
+    Uses os.scandir so callers can read sizes and mtimes from the entry's
+    cached stat() instead of looking each path up again.
+    """
+    # Parts above the repo root are the same for every entry, so check them once
+    if any(is_ignored(part) for part in repo_root.parts):
+        return []
+
+    found: list[tuple[str, os.DirEntry]] = []
+    stack = [("", str(repo_root))]
+    while stack:
+        rel_dir, dir_path = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue  # Unreadable directories are skipped, as os.walk does
+
+        for entry in entries:
+            rel_path = rel_dir + entry.name
+            if _skip_entry(entry.name, rel_path):
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # Like os.walk, list symlinked directories but don't descend into them
+                if not entry.is_symlink():
+                    stack.append((rel_path + os.sep, entry.path))
+            elif is_included(rel_path):
+                found.append((rel_path, entry))
+    return found
+
+
+def collect_files(repo_root: Path) -> list[Path]:
+    """Walk the repository and return every file that isn't ignored."""
+    return [Path(entry.path) for _, entry in scan_files(repo_root)]
+
+
+def _load_file(entry: os.DirEntry) -> tuple[int, FileInfo | None, list[SymbolTag]] | None:
+    """Stat, read and index one file (runs on a worker thread).
+
+    Returns None if the file can't be stat'ed, and a None FileInfo for files
+    that are too large, unreadable, binary or not UTF-8.
+    """
+    try:
+        size = entry.stat().st_size
+    except OSError:
+        return None
+
+    if size > MAX_FILE_BYTES:
+        return size, None, []
+
+    try:
+        content_bytes = read_text_bytes(entry.path)
+    except OSError:
+        return size, None, []
+
+    if content_bytes is None:
+        return size, None, []  # Binary
+
+    try:
+        content = content_bytes.decode("utf-8")
+    except UnicodeDecodeError:
+        return size, None, []
+
+    language = detect_language(Path(entry.name))
+    info = FileInfo(
+        language=language,
+        size_bytes=size,
+        content_hash=content_hash(content_bytes),
+        text=content,
+    )
+    return size, info, extract_symbols(content, language)
+
+
+def _ordered_map(pool: ThreadPoolExecutor, fn: Callable[[T], R], items: Iterable[T], window: int) -> Iterator[R]:
+    """Yield fn(item) for each item in order, keeping at most window calls in flight."""
+    pending: deque[Future[R]] = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 
 def build_snapshot(repo_path: str | Path) -> CodebaseSnapshot:
@@ -232,25 +327,12 @@ def build_snapshot(repo_path: str | Path) -> CodebaseSnapshot:
     if not repo_root.is_dir():
         raise ValueError(f"Repository path does not exist: {repo_root}")
 
-    # Collect all files
-    all_files: list[Path] = []
-    for root, dirs, files in os.walk(repo_root):
-        root_path = Path(root)
-
-        # Filter directories in-place to skip ignored ones
-        dirs[:] = [d for d in dirs if not should_ignore(root_path / d, repo_root)]
-
-        for f in files:
-            file_path = root_path / f
-            if not should_ignore(file_path, repo_root) and matches_include_globs(file_path, repo_root):
-                all_files.append(file_path)
-
     # Sort: priority files first, then alphabetically
-    priority_files = [f for f in all_files if is_priority_file(f, repo_root)]
-    other_files = [f for f in all_files if not is_priority_file(f, repo_root)]
-    priority_files.sort(key=lambda p: str(p.relative_to(repo_root)))
-    other_files.sort(key=lambda p: str(p.relative_to(repo_root)))
-    sorted_files = priority_files + other_files
+    def sort_key(item: tuple[str, os.DirEntry]) -> tuple[bool, str]:
+        rel_path, entry = item
+        return not (is_priority(rel_path) or is_priority(entry.name)), rel_path
+
+    sorted_files = sorted(scan_files(repo_root), key=sort_key)
 
     # Build file tree and collect file info
     file_tree: list[str] = []
@@ -259,54 +341,33 @@ def build_snapshot(repo_path: str | Path) -> CodebaseSnapshot:
     languages: dict[str, int] = {}
     total_bytes = 0
 
-    for file_path in sorted_files:
-        rel_path = str(file_path.relative_to(repo_root))
-        file_tree.append(rel_path)
+    # Files are read ahead on a thread pool but consumed in priority order, so
+    # the total size cap keeps the same files as a sequential walk would
+    with ThreadPoolExecutor(max_workers=SNAPSHOT_WORKERS) as pool:
+        loaded = _ordered_map(pool, _load_file, [entry for _, entry in sorted_files], SNAPSHOT_WORKERS * 4)
+        for (rel_path, _), result in zip(sorted_files, loaded):
+            file_tree.append(rel_path)
 
-        # Check file size
-        try:
-            size = file_path.stat().st_size
-        except OSError:
-            continue
+            if result is None:
+                continue
 
-        if size > MAX_FILE_BYTES:
-            continue  # Skip files that are too large
+            size, info, file_tags = result
+            if size > MAX_FILE_BYTES:
+                continue  # Skip files that are too large
 
-        if total_bytes + size > MAX_TOTAL_BYTES:
-            break  # Stop if we've reached the total size cap
+            if total_bytes + size > MAX_TOTAL_BYTES:
+                break  # Stop if we've reached the total size cap
 
-        # Read file content
-        try:
-            content_bytes = file_path.read_bytes()
-        except OSError:
-            continue
+            if info is None:
+                continue  # Unreadable, binary or not UTF-8
 
-        if is_binary(content_bytes):
-            continue  # Skip binary files
-
-        try:
-            content = content_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            continue  # Skip files that can't be decoded
+            files[rel_path] = info
+            if file_tags:
+                tags[rel_path] = file_tags
 
-        language = detect_language(file_path)
-        text_lines = content.split("\n")
-
-        files[rel_path] = FileInfo(
-            language=language,
-            size_bytes=size,
-            sha1=compute_sha1(content_bytes),
-            text_lines=text_lines,
-        )
-
-        # Extract symbols
-        file_tags = extract_symbols(content, language)
-        if file_tags:
-            tags[rel_path] = file_tags
-
-        # Update stats
-        languages[language] = languages.get(language, 0) + 1
-        total_bytes += size
+            # Update stats
+            languages[info["language"]] = languages.get(info["language"], 0) + 1
+            total_bytes += size
 
     repo_info = RepoInfo(
         root=str(repo_root),
@@ -321,4 +382,3 @@ def build_snapshot(repo_path: str | Path) -> CodebaseSnapshot:
         files=files,
         tags=tags,
     )
-
@@ -0,0 +1,97 @@
+"""On-disk cache of codebase snapshots keyed by repository state."""
+
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+
+from .config import (
+    DEFAULT_IGNORE_PATTERNS,
+    EXCLUDE_GLOBS,
+    INCLUDE_GLOBS,
+    MAX_FILE_BYTES,
+    MAX_TOTAL_BYTES,
+    PRIORITY_PATTERNS,
+    SNAPSHOTS_DIR,
+)
+from .snapshot import build_snapshot, scan_files
+from .types import CodebaseSnapshot
+
+# Bump when the pickled CodebaseSnapshot layout changes
+CACHE_VERSION = 4
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_key(repo_root: Path) -> str:
+    """Compute a cache key for the repository's current state.
+
+    The key covers the snapshot settings plus the (path, size, mtime) of every
+    file that would be indexed, so any edit, addition or removal changes it
+    without reading file contents.
+    """
+    digest = hashlib.sha256()
+    settings = (
+        CACHE_VERSION,
+        str(repo_root),
+        MAX_FILE_BYTES,
+        MAX_TOTAL_BYTES,
+        INCLUDE_GLOBS,
+        EXCLUDE_GLOBS,
+        DEFAULT_IGNORE_PATTERNS,
+        PRIORITY_PATTERNS,
+    )
+    digest.update(repr(settings).encode())
+
+    entries = []
+    for rel_path, entry in scan_files(repo_root):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        entries.append((rel_path, stat.st_size, stat.st_mtime_ns))
+    entries.sort()
+
+    for rel_path, size, mtime_ns in entries:
+        digest.update(f"{rel_path}\0{size}\0{mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def load_or_build(repo_path: str | Path, key: str | None = None) -> CodebaseSnapshot:
+    """Return a snapshot for repo_path, reusing a cached one if nothing changed.
+
+    Args:
+        repo_path: Path to the repository
+        key: snapshot_key of the repository, if the caller already computed it
+
+    Returns:
+        The cached or freshly built CodebaseSnapshot
+    """
+    repo_root = Path(repo_path).resolve()
+    if not repo_root.is_dir():
+        return build_snapshot(repo_root)  # Raises with the usual message
+
+    cache_path = SNAPSHOTS_DIR / f"{key or snapshot_key(repo_root)}.pkl"
+    try:
+        with open(cache_path, "rb") as f:
+            snapshot = pickle.load(f)
+        if isinstance(snapshot, CodebaseSnapshot):
+            return snapshot
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning("Ignoring unreadable snapshot cache %s: %s", cache_path, e)
+
+    snapshot = build_snapshot(repo_root)
+
+    try:
+        SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Failed to write snapshot cache %s: %s", cache_path, e)
+
+    return snapshot
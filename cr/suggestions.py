@@ -1,4 +1,7 @@
 
+import threading
+from functools import lru_cache
+
 import dspy
 from .diff_types import PRInfo
 from .config import SUB_MODEL
@@ -12,6 +15,10 @@ class SuggestionSignature(dspy.Signature):
     
     suggestions: list[str] = dspy.OutputField(desc="List of 4-5 short suggestion strings (max 5 words each)")
 
+@lru_cache(maxsize=256)
+def _pr_context(title: str, body_prefix: str) -> str:
+    return f"PR: {title}\n{body_prefix}"
+
 class SuggestionGenerator(dspy.Module):
     def __init__(self):
         super().__init__()
@@ -20,11 +27,10 @@ class SuggestionGenerator(dspy.Module):
         
     def forward(self, pr_info: PRInfo, conversation: list[dict], last_answer: str):
         # Format inputs
-        pr_context = f"PR: {pr_info.title}\n{pr_info.body[:500]}"
+        pr_context = _pr_context(pr_info.title, pr_info.body_excerpt)
         
         # Get last few messages
-        recent_msgs = conversation[-3:] if conversation else []
-        conv_text = "\n".join([f"{m['role']}: {m['content'][:200]}" for m in recent_msgs])
+        conv_text = "\n".join(f"{m['role']}: {m['content'][:200]}" for m in conversation[-3:]) if conversation else ""
         
         result = self.generate(
             pr_context=pr_context,
@@ -36,11 +42,14 @@ class SuggestionGenerator(dspy.Module):
 
 # Singleton instance
 _generator = None
+_generator_lock = threading.Lock()
 
 def get_suggestion_generator():
     global _generator
     if _generator is None:
-        # Ensure dspy is configured (should be done by main app, but safe to check)
-        # We assume dspy.configure is called elsewhere with the correct LMs
-        _generator = SuggestionGenerator()
+        with _generator_lock:
+            if _generator is None:
+                # Ensure dspy is configured (should be done by main app, but safe to check)
+                # We assume dspy.configure is called elsewhere with the correct LMs
+                _generator = SuggestionGenerator()
     return _generator
@@ -1,5 +1,6 @@
 """Type definitions for the codebase review tool."""
 
+import functools
 from dataclasses import dataclass, field
 from typing import TypedDict, Literal
 from datetime import datetime
@@ -9,8 +10,8 @@ class FileInfo(TypedDict):
     """Information about a single file in the snapshot."""
     language: str
     size_bytes: int
-    sha1: str
-    text_lines: list[str]
+    content_hash: str  # xxh3-128 when xxhash is installed, else SHA1
+    text: str  # Decoded contents; split on "\n" where lines are needed
 
 
 class SymbolTag(TypedDict):
@@ -28,25 +29,26 @@ class RepoInfo(TypedDict):
     total_bytes: int
 
 
-@dataclass
+@dataclass(slots=True)
 class CodebaseSnapshot:
     """Complete snapshot of a codebase for RLM consumption."""
     repo_info: RepoInfo
     file_tree: list[str]  # flat list of relative paths
     files: dict[str, FileInfo]  # path -> file info
     tags: dict[str, list[SymbolTag]] = field(default_factory=dict)  # path -> tags
+    # to_simple_dict() result, built on first use
+    _simple_dict: dict[str, str] | None = field(default=None, init=False, repr=False, compare=False)
 
     def to_simple_dict(self) -> dict[str, str]:
         """Convert to simple dict of path -> content for RLM.
 
         This is the format DSPy RLM works best with - a flat dictionary
         where keys are file paths and values are file contents as strings.
+        Built once per snapshot and shared between calls; don't mutate it.
         """
-        result = {}
-        for path, info in self.files.items():
-            content = "\n".join(info["text_lines"])
-            result[path] = content
-        return result
+        if self._simple_dict is None:
+            self._simple_dict = {path: info["text"] for path, info in self.files.items()}
+        return self._simple_dict
 
     def to_dict(self) -> dict:
         """Convert to plain dict for RLM input (full metadata)."""
@@ -58,7 +60,7 @@ class CodebaseSnapshot:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class TraceStep:
     """A single step in the RLM trace."""
     step: int
@@ -68,7 +70,7 @@ class TraceStep:
     artifacts: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class RLMTrace:
     """Complete trace of an RLM run."""
     question: str
@@ -103,7 +105,7 @@ class RLMTrace:
         }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Citation:
     """A source citation in the answer."""
     path: str
@@ -116,8 +118,12 @@ class Citation:
         return f"{self.path}:{self.start_line}-{self.end_line}"
 
     @classmethod
+    @functools.lru_cache(maxsize=4096)
     def parse(cls, citation_str: str) -> "Citation | None":
-        """Parse a citation string like 'path/to/file.py:10-20'."""
+        """Parse a citation string like 'path/to/file.py:10-20'.
+
+        Results are cached and shared, which is safe as citations are frozen.
+        """
         try:
             if ":" not in citation_str:
                 return None
@@ -33,7 +33,7 @@ API_HOST = os.getenv("API_HOST", "127.0.0.1")
 API_PORT = int(os.getenv("API_PORT", "8000"))
 
 # Default ignore patterns (always excluded)
-DEFAULT_IGNORE_PATTERNS = [
+DEFAULT_IGNORE_PATTERNS = (
     "node_modules",
     ".venv",
     "venv",
@@ -94,11 +94,11 @@ DEFAULT_IGNORE_PATTERNS = [
     "Cargo.lock",
     ".DS_Store",
     "Thumbs.db",
-]
+)
 
 # Priority patterns for inclusion (checked first when building snapshot)
 # These files are included first before hitting the MAX_TOTAL_BYTES limit
-PRIORITY_PATTERNS = [
+PRIORITY_PATTERNS = (
     # Documentation
     "README*",
     "readme*",
@@ -136,5 +136,5 @@ PRIORITY_PATTERNS = [
     "tests/**",
     "test/**",
     "spec/**",
-]
+)
 
@@ -0,0 +1,66 @@
+"""Shared test fixtures."""
+
+import logging
+
+import pytest
+import pytest_asyncio
+
+
+def pytest_configure(config):
+    """Silence per-request loggers; no test asserts on their output."""
+    for name in ("uvicorn.access", "httpx", "cr.server"):
+        logging.getLogger(name).disabled = True
+
+
+def pytest_addoption(parser):
+    """Register --record, which refreshes recorded HTTP fixtures from the live APIs."""
+    parser.addoption(
+        "--record",
+        action="store_true",
+        default=False,
+        help="hit the real GitHub API and rewrite tests/fixtures recordings",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _isolate_review_caches(monkeypatch):
+    """Give each test empty PR and provider caches so tests don't depend on order."""
+    from cr import github
+    from cr.lru import LRUCache
+    from cr.providers import registry
+
+    monkeypatch.setattr(github, "_pr_cache", LRUCache(github._pr_cache.maxsize, github._pr_cache.ttl))
+    monkeypatch.setattr(
+        registry, "_provider_cache", LRUCache(registry._provider_cache.maxsize, registry._provider_cache.ttl)
+    )
+
+
+@pytest_asyncio.fixture(scope="session")
+async def aclient():
+    """Async client that calls the app in-process through ASGITransport, shared by the run."""
+    from httpx import ASGITransport, AsyncClient
+
+    from cr.server import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def load_env():
+    """Load the .env file once per test run."""
+    from cr.config import _find_env_file, _load_env_file
+    env_file = _find_env_file()
+    if env_file is not None:
+        _load_env_file(env_file)
+
+
+@pytest.fixture(scope="session")
+def integration_client(load_env):
+    """One TestClient for the run, so app startup and RLM construction happen once."""
+    from fastapi.testclient import TestClient
+
+    from cr.server import app
+
+    with TestClient(app) as client:
+        yield client
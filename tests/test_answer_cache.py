@@ -0,0 +1,46 @@
+"""Tests for the on-disk one-shot answer cache."""
+
+import pytest
+
+import cr.config as config
+from cr.answer_cache import answer_key, load_answer, save_answer
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Create a tiny repository and point the cache at a temp directory."""
+    monkeypatch.setattr(config, "ANSWERS_DIR", tmp_path / "answers", raising=False)
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "main.py").write_text("print('hi')\n")
+    return root
+
+
+class TestAnswerCache:
+    """Tests for answer_key, load_answer and save_answer."""
+
+    def test_round_trip(self, repo):
+        """A saved answer is returned for the same key."""
+        key = answer_key(repo, "What does it print?")
+        assert load_answer(key) is None
+
+        save_answer(key, "It prints hi.", ["main.py"])
+
+        assert load_answer(key) == ("It prints hi.", ["main.py"])
+
+    def test_key_depends_on_question_and_repo(self, repo):
+        """Different questions or repo contents give different keys."""
+        key = answer_key(repo, "q1")
+        assert answer_key(repo, "q1") == key
+        assert answer_key(repo, "q2") != key
+
+        (repo / "extra.py").write_text("x = 1\n")
+        assert answer_key(repo, "q1") != key
+
+    def test_corrupt_entry_is_a_miss(self, repo):
+        """Unreadable cache files are ignored."""
+        key = answer_key(repo, "q")
+        config.ANSWERS_DIR.mkdir(parents=True)
+        (config.ANSWERS_DIR / f"{key}.json").write_text("{not json")
+
+        assert load_answer(key) is None
@@ -0,0 +1,67 @@
+"""Tests for the cr command-line entry point."""
+
+import pytest
+
+import cr.config as config
+import cr.snapshot_cache as snapshot_cache
+from cr import cli
+
+
+class TestMain:
+    """Tests for argument handling in cr.cli.main."""
+
+    def test_help_text_matches_argparse(self, monkeypatch):
+        """The precomputed help stays in sync with the real parser."""
+        monkeypatch.setenv("COLUMNS", "80")
+        assert cli._HELP_TEXT == cli._build_parser(None).format_help()
+
+    @pytest.mark.parametrize("argv, code", [([], 1), (["--help"], 0), (["-h"], 0)])
+    def test_help_fast_path(self, monkeypatch, capsys, argv, code):
+        """Bare `cr` and `cr --help` print help without building a parser."""
+        monkeypatch.setattr("sys.argv", ["cr", *argv])
+        monkeypatch.setattr(cli, "_build_parser", None)
+
+        with pytest.raises(SystemExit) as exc:
+            cli.main()
+
+        assert exc.value.code == code
+        assert capsys.readouterr().out == cli._HELP_TEXT
+
+
+class TestRunOneShot:
+    """Tests for cr.cli.run_one_shot."""
+
+    def test_walks_repo_once_and_reuses_snapshot(self, tmp_path, monkeypatch):
+        """The snapshot key is computed once and the built snapshot reaches the RLM."""
+        monkeypatch.setattr(config, "ANSWERS_DIR", tmp_path / "answers", raising=False)
+        monkeypatch.setattr(snapshot_cache, "SNAPSHOTS_DIR", tmp_path / "snapshots")
+        monkeypatch.setattr("cr.daemon.query_daemon", lambda *args: None)
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        (repo / "main.py").write_text("print('hi')\n")
+
+        calls = []
+        real_key = snapshot_cache.snapshot_key
+
+        def counting_key(repo_root):
+            calls.append(repo_root)
+            return real_key(repo_root)
+
+        monkeypatch.setattr(snapshot_cache, "snapshot_key", counting_key)
+
+        received = {}
+
+        class FakeRLM:
+            def __init__(self, on_step=None):
+                pass
+
+            def run_one_shot(self, **kwargs):
+                received.update(kwargs)
+                return "answer", [], None
+
+        monkeypatch.setattr("cr.rlm_runner.CodebaseReviewRLM", FakeRLM)
+
+        cli.run_one_shot(repo, "What does main do?")
+
+        assert len(calls) == 1
+        assert received["snapshot"].repo_info["total_files"] == 1
@@ -0,0 +1,68 @@
+"""Tests for configuration loading."""
+
+import os
+
+import pytest
+
+from cr.config import _load_env_file
+
+
+class TestLoadEnvFile:
+    """Tests for the built-in .env parser."""
+
+    def test_parses_keys_and_quotes(self, tmp_path, monkeypatch):
+        """Plain, quoted and exported values are loaded."""
+        for key in ("CR_T_PLAIN", "CR_T_DOUBLE", "CR_T_SINGLE", "CR_T_EXPORT", "CR_T_COMMENT"):
+            monkeypatch.delenv(key, raising=False)
+        env_file = tmp_path / ".env"
+        env_file.write_text(
+            "# comment\n"
+            "\n"
+            "CR_T_PLAIN=value\n"
+            'CR_T_DOUBLE="with spaces"\n'
+            "CR_T_SINGLE='x=y'\n"
+            "export CR_T_EXPORT=1\n"
+            "CR_T_COMMENT=abc # trailing\n"
+            "not a pair\n"
+        )
+
+        _load_env_file(env_file)
+
+        assert os.environ["CR_T_PLAIN"] == "value"
+        assert os.environ["CR_T_DOUBLE"] == "with spaces"
+        assert os.environ["CR_T_SINGLE"] == "x=y"
+        assert os.environ["CR_T_EXPORT"] == "1"
+        assert os.environ["CR_T_COMMENT"] == "abc"
+
+    def test_does_not_override_existing(self, tmp_path, monkeypatch):
+        """Variables already in the environment win over the file."""
+        monkeypatch.setenv("CR_T_EXISTING", "from-env")
+        env_file = tmp_path / ".env"
+        env_file.write_text("CR_T_EXISTING=from-file\n")
+
+        _load_env_file(env_file)
+
+        assert os.environ["CR_T_EXISTING"] == "from-env"
+
+    def test_missing_file_is_ignored(self, tmp_path):
+        """A missing file is a no-op."""
+        _load_env_file(tmp_path / "missing.env")
+
+
+class TestLazyCacheDirs:
+    """Tests for the lazily computed cache directory attributes."""
+
+    def test_subdirs_live_under_cache_dir(self):
+        """Cache subdirectories are derived from CR_CACHE_DIR."""
+        import cr.config as config
+
+        assert config.TRACES_DIR == config.CR_CACHE_DIR / "traces"
+        assert config.REVIEWS_DIR == config.CR_CACHE_DIR / "reviews"
+        assert config.SNAPSHOTS_DIR == config.CR_CACHE_DIR / "snapshots"
+
+    def test_unknown_attribute_raises(self):
+        """Unknown names still raise AttributeError."""
+        import cr.config as config
+
+        with pytest.raises(AttributeError):
+            config.NOT_A_SETTING
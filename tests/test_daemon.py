@@ -0,0 +1,83 @@
+"""Tests for the review daemon's socket protocol."""
+
+import socketserver
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+import cr.daemon as daemon
+from cr.daemon import ReviewDaemon, query_daemon
+
+
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    """Serve a tiny repo with a stubbed RLM on a temp socket."""
+    sock = tmp_path / "d.sock"
+    monkeypatch.setattr(daemon, "socket_path", lambda: sock)
+    monkeypatch.setattr("cr.snapshot_cache.SNAPSHOTS_DIR", tmp_path / "cache")
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "main.py").write_text("print('hi')\n")
+
+    rlm = MagicMock()
+    rlm.run.return_value = ("It prints hi.", ["main.py"], None)
+
+    server = ReviewDaemon(sock, repo, rlm=rlm)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield repo, rlm
+    server.shutdown()
+    server.server_close()
+
+
+class TestDaemon:
+    """Tests for query_daemon against a live ReviewDaemon."""
+
+    def test_answers_question(self, running_daemon):
+        """A question for the served repo is answered by the daemon."""
+        repo, rlm = running_daemon
+
+        answer, sources = query_daemon(repo, "What does it print?")
+
+        assert answer == "It prints hi."
+        assert sources == ["main.py"]
+        kwargs = rlm.run.call_args.kwargs
+        assert kwargs["question"] == "What does it print?"
+        assert "main.py" in kwargs["snapshot"].files
+
+    def test_other_repo_falls_back(self, running_daemon, tmp_path):
+        """Questions for a different repo return None so the CLI runs locally."""
+        assert query_daemon(tmp_path / "elsewhere", "q") is None
+
+    def test_run_error_is_raised(self, running_daemon):
+        """Errors inside the daemon surface as RuntimeError."""
+        repo, rlm = running_daemon
+        rlm.run.side_effect = ValueError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            query_daemon(repo, "q")
+
+    def test_no_daemon_returns_none(self, tmp_path, monkeypatch):
+        """Without a socket the client reports no daemon."""
+        monkeypatch.setattr(daemon, "socket_path", lambda: tmp_path / "missing.sock")
+        assert query_daemon(tmp_path, "q") is None
+
+    def test_malformed_reply_returns_none(self, tmp_path, monkeypatch):
+        """A truncated or non-JSON reply falls back to running locally."""
+        sock = tmp_path / "bad.sock"
+        monkeypatch.setattr(daemon, "socket_path", lambda: sock)
+
+        class Truncated(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.rfile.readline()
+                self.wfile.write(b'{"status": "o\n')
+
+        server = socketserver.UnixStreamServer(str(sock), Truncated)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            assert query_daemon(tmp_path, "q") is None
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -1,8 +1,15 @@
 """Tests for Diff RLM module."""
 
+import asyncio
+
 import pytest
 from cr.diff_rlm import (
     _build_diff_context_text,
+    _build_diff_context_text_cached,
+    _extract_json_array,
+    _fetch_file_contents,
+    _format_conversation,
+    _format_output,
     _parse_citations,
     _parse_answer_blocks,
 )
@@ -32,12 +39,9 @@ class TestBuildDiffContextText:
         
         text = _build_diff_context_text(files)
         
-        assert "src/main.py" in text
-        assert "modified" in text
-        assert "+5" in text
-        assert "-2" in text
-        assert "old code" in text
-        assert "new code" in text
+        expected = ["src/main.py", "modified", "+5", "-2", "old code", "new code"]
+        missing = [s for s in expected if s not in text]
+        assert not missing, f"Missing from context: {missing}"
 
     def test_added_file(self):
         """Test context for a newly added file."""
@@ -54,9 +58,9 @@ class TestBuildDiffContextText:
         
         text = _build_diff_context_text(files)
         
-        assert "new.py" in text
-        assert "Added File" in text
-        assert "new file content" in text
+        expected = ["new.py", "Added File", "new file content"]
+        missing = [s for s in expected if s not in text]
+        assert not missing, f"Missing from context: {missing}"
 
     def test_deleted_file(self):
         """Test context for a deleted file."""
@@ -73,9 +77,9 @@ class TestBuildDiffContextText:
         
         text = _build_diff_context_text(files)
         
-        assert "old.py" in text
-        assert "Deleted File" in text
-        assert "deleted file content" in text
+        expected = ["old.py", "Deleted File", "deleted file content"]
+        missing = [s for s in expected if s not in text]
+        assert not missing, f"Missing from context: {missing}"
 
     def test_patch_only(self):
         """Test context when only patch is available."""
@@ -91,77 +95,259 @@ class TestBuildDiffContextText:
         
         text = _build_diff_context_text(files)
         
-        assert "patched.py" in text
-        assert "Patch:" in text
-        assert "-old line" in text
+        expected = ["patched.py", "Patch:", "-old line", "+new line"]
+        missing = [s for s in expected if s not in text]
+        assert not missing, f"Missing from context: {missing}"
+
+    def test_patch_preferred_over_contents(self):
+        """Test that the patch is shown instead of full contents when both exist."""
+        files = [
+            DiffFileContext(
+                path="src/main.py",
+                old_file=FileContents(name="main.py", contents="full old body"),
+                new_file=FileContents(name="main.py", contents="full new body"),
+                patch="@@ -1 +1 @@\n-old line\n+new line",
+                status="modified",
+            )
+        ]
+
+        text = _build_diff_context_text(files)
+
         assert "+new line" in text
+        assert "full old body" not in text
+        assert "file_data['src/main.py']" in text
+
+    def test_only_first_files_inline(self, monkeypatch):
+        """Test that files past MAX_PROMPT_FILES are listed but not inlined."""
+        monkeypatch.setattr("cr.diff_rlm.MAX_PROMPT_FILES", 1)
+        files = [
+            DiffFileContext(path=f"f{i}.py", patch=f"+line {i}", status="modified")
+            for i in range(3)
+        ]
+
+        text = _build_diff_context_text(files)
+
+        assert "+line 0" in text
+        assert "+line 2" not in text
+        assert "f2.py" in text
+
+
+class TestBuildDiffContextTextCached:
+    """Tests for the per-review diff text cache."""
+
+    def _files(self, new_contents: str, cache_key: str | None = None) -> list[DiffFileContext]:
+        return [
+            DiffFileContext(
+                path="src/main.py",
+                old_file=FileContents(name="main.py", contents="old code"),
+                new_file=FileContents(name="main.py", contents=new_contents, cache_key=cache_key),
+            )
+        ]
+
+    def test_matches_uncached_and_reuses_text(self):
+        """Repeat turns with the same files reuse the same string."""
+        first = _build_diff_context_text_cached("cache-r1", self._files("new code"))
+        second = _build_diff_context_text_cached("cache-r1", self._files("new code"))
+
+        assert first == _build_diff_context_text(self._files("new code"))
+        assert second is first
+
+    def test_changed_contents_rebuild(self):
+        """Different file contents produce a fresh text."""
+        first = _build_diff_context_text_cached("cache-r2", self._files("new code"))
+        second = _build_diff_context_text_cached("cache-r2", self._files("newer code"))
+
+        assert "newer code" in second
+        assert "newer code" not in first
+
+
+class TestFetchFileContents:
+    """Tests for _fetch_file_contents function."""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency_and_order(self, monkeypatch):
+        """Results keep path order and in-flight requests stay under the cap."""
+        monkeypatch.setattr("cr.diff_rlm.MAX_CONCURRENT_FETCHES", 3)
+        in_flight = 0
+        peak = 0
+
+        class FakeProvider:
+            async def get_file_contents(self, review_id, path):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return None, FileContents(name=path, contents=path)
+
+        paths = [f"f{i}.py" for i in range(10)]
+        results = await _fetch_file_contents(FakeProvider(), "r1", paths)
+
+        assert [new.contents for _, new in results] == paths
+        assert peak == 3
+
+
+    @pytest.mark.asyncio
+    async def test_slow_file_times_out(self, monkeypatch):
+        """A fetch exceeding the timeout yields (None, None) without blocking the rest."""
+        monkeypatch.setattr("cr.diff_rlm.FILE_FETCH_TIMEOUT", 0.05)
+
+        class Provider:
+            async def get_file_contents(self, review_id, path):
+                if path == "slow.py":
+                    await asyncio.sleep(10)
+                return (None, FileContents(name=path, contents=path))
+
+        results = await _fetch_file_contents(Provider(), "r", ["a.py", "slow.py", "b.py"])
+
+        assert results[1] == (None, None)
+        assert results[0][1].contents == "a.py"
+        assert results[2][1].contents == "b.py"
+
+    @pytest.mark.asyncio
+    async def test_failure_is_reraised(self):
+        """A provider error propagates unwrapped."""
+
+        class Provider:
+            async def get_file_contents(self, review_id, path):
+                raise ValueError(f"bad {path}")
+
+        with pytest.raises(ValueError, match="bad"):
+            await _fetch_file_contents(Provider(), "r", ["a.py"])
+
+
+    @pytest.mark.asyncio
+    async def test_prefers_batch_fetch(self):
+        """Providers with get_all_file_contents are asked once for every path."""
+        class Provider:
+            async def get_file_contents(self, review_id, path):
+                raise AssertionError("per-file fetch should not be used")
+
+            async def get_all_file_contents(self, review_id, paths):
+                return [(None, FileContents(name=p, contents=p)) for p in paths]
+
+        results = await _fetch_file_contents(Provider(), "r", ["a.py", "b.py"])
+
+        assert [new.contents for _, new in results] == ["a.py", "b.py"]
+
+
+class TestFormatOutput:
+    """Tests for _format_output function."""
+
+    def test_matches_full_join_when_truncated(self):
+        """Truncated list output equals joining everything then slicing."""
+        result = [f"line {i}" for i in range(10000)]
+        assert _format_output(result, limit=100) == "\n".join(result)[:100]
+        assert _format_output(["", "", "x"], limit=100) == "\n\nx"
+
+    def test_strings_and_other_values(self):
+        """Strings are sliced and falsy values render as empty."""
+        assert _format_output("abcdef", limit=3) == "abc"
+        assert _format_output(None) == ""
+        assert _format_output(12345, limit=2) == "12"
+
+
+class TestFormatConversation:
+    """Tests for _format_conversation function."""
+
+    def test_incremental_matches_full_format(self):
+        """Appending turns gives the same text as formatting from scratch."""
+        convo = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+        first = _format_conversation("conv-r1", convo)
+        convo = convo + [{"role": "user", "content": "why?"}]
+        second = _format_conversation("conv-r1", convo)
+
+        assert first == "USER: hi\nASSISTANT: hello"
+        assert second == first + "\nUSER: why?"
+        assert _format_conversation("conv-r1", convo[1:]) == "ASSISTANT: hello\nUSER: why?"
+
+    def test_empty(self):
+        """No history renders the placeholder."""
+        assert _format_conversation("conv-r2", []) == "No previous conversation."
 
 
 class TestParseCitations:
     """Tests for _parse_citations function."""
 
-    def test_parse_string_simple(self):
-        """Test parsing simple path:line citations."""
-        raw = "src/main.py:10, src/utils.py:25"
+    @pytest.mark.parametrize("raw, expected", [
+        (
+            "src/main.py:10, src/utils.py:25",
+            [("src/main.py", 10, 10, "unified", ""), ("src/utils.py", 25, 25, "unified", "")],
+        ),
+        ("src/main.py:10-20", [("src/main.py", 10, 20, "unified", "")]),
+        (
+            [{"path": "src/main.py", "side": "additions", "startLine": 5, "endLine": 10, "reason": "bug here"}],
+            [("src/main.py", 5, 10, "additions", "bug here")],
+        ),
+    ], ids=["string-simple", "string-range", "dict-list"])
+    def test_parse(self, raw, expected):
+        """Test parsing path:line strings, path:start-end ranges and dict lists."""
         citations = _parse_citations(raw)
-        
-        assert len(citations) == 2
-        assert citations[0].path == "src/main.py"
-        assert citations[0].start_line == 10
-        assert citations[0].end_line == 10
-
-    def test_parse_string_range(self):
-        """Test parsing path:start-end citations."""
-        raw = "src/main.py:10-20"
+
+        assert [(c.path, c.start_line, c.end_line, c.side, c.reason) for c in citations] == expected
+
+    def test_parse_mixed_list(self):
+        """Test parsing a list mixing dicts and path:line strings."""
+        raw = [{"path": "a.py", "startLine": 3, "endLine": 4}, "b.py:7-9", "not a citation"]
         citations = _parse_citations(raw)
-        
-        assert len(citations) == 1
-        assert citations[0].start_line == 10
-        assert citations[0].end_line == 20
-
-    def test_parse_dict_list(self):
-        """Test parsing list of dict citations."""
-        raw = [
-            {"path": "src/main.py", "side": "additions", "startLine": 5, "endLine": 10, "reason": "bug here"},
+
+        assert [(c.path, c.start_line, c.end_line) for c in citations] == [
+            ("a.py", 3, 4),
+            ("b.py", 7, 9),
         ]
-        citations = _parse_citations(raw)
-        
-        assert len(citations) == 1
-        assert citations[0].path == "src/main.py"
-        assert citations[0].side == "additions"
-        assert citations[0].start_line == 5
-        assert citations[0].end_line == 10
-        assert citations[0].reason == "bug here"
+        assert citations[0].label is None
 
 
-class TestParseAnswerBlocks:
-    """Tests for _parse_answer_blocks function."""
+class TestExtractJsonArray:
+    """Tests for _extract_json_array function."""
 
-    def test_markdown_only(self):
-        """Test parsing pure markdown content."""
-        answer = "This is a **markdown** response."
-        blocks = _parse_answer_blocks(answer)
-        
-        assert len(blocks) == 1
-        assert blocks[0].type == "markdown"
-        assert "markdown" in blocks[0].content
+    def test_array_with_surrounding_text(self):
+        """The array is found inside prose, even with brackets in strings."""
+        text = 'Here you go:\n[{"title": "Off by one in a[i]", "citations": ["a.py:1-2"]}]\nDone [x].'
+        assert _extract_json_array(text) == [{"title": "Off by one in a[i]", "citations": ["a.py:1-2"]}]
 
-    def test_code_block(self):
-        """Test parsing content with code block."""
-        answer = """Here is the fix:
+    def test_skips_non_json_brackets(self):
+        """A bracketed prefix that isn't JSON doesn't hide the real array."""
+        assert _extract_json_array('[WIP] issues: [{"title": "t"}]') == [{"title": "t"}]
 
-```python
-def fixed_function():
-    return True
-```
+    def test_raw_newlines_in_strings(self):
+        """Literal newlines inside strings are tolerated."""
+        assert _extract_json_array('[{"explanation": "line one\nline two"}]') == [
+            {"explanation": "line one line two"}
+        ]
+
+    def test_no_array(self):
+        """Text without a JSON array yields an empty list."""
+        assert _extract_json_array("No issues found.") == []
+        assert _extract_json_array("[unterminated") == []
+
+    def test_pathological_brackets(self):
+        """Deeply nested or repeated non-JSON brackets are given up on quickly."""
+        assert _extract_json_array("[" * 5000 + "x" + "]" * 5000) == []
+        assert _extract_json_array("[x]" * 100000 + '[{"title": "t"}]') == []
+        assert _extract_json_array("[" * 100000) == []
 
-That should work."""
+
+class TestParseAnswerBlocks:
+    """Tests for _parse_answer_blocks function."""
+
+    @pytest.mark.parametrize("answer, expected", [
+        (
+            "This is a **markdown** response.",
+            [("markdown", "This is a **markdown** response.", None)],
+        ),
+        (
+            "Here is the fix:\n\n```python\ndef fixed_function():\n    return True\n```\n\nThat should work.",
+            [
+                ("markdown", "Here is the fix:\n", None),
+                ("code", "def fixed_function():\n    return True", "python"),
+                ("markdown", "\nThat should work.", None),
+            ],
+        ),
+    ], ids=["markdown-only", "code-block"])
+    def test_parse(self, answer, expected):
+        """Test splitting an answer into markdown and fenced code blocks."""
         blocks = _parse_answer_blocks(answer)
-        
-        assert len(blocks) == 3
-        assert blocks[0].type == "markdown"
-        assert blocks[1].type == "code"
-        assert blocks[1].language == "python"
-        assert "def fixed_function" in blocks[1].content
-        assert blocks[2].type == "markdown"
+
+        assert [(b.type, b.content, b.language) for b in blocks] == expected
 
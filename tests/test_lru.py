@@ -0,0 +1,34 @@
+"""Tests for the bounded LRU cache."""
+
+from cr.lru import LRUCache
+
+
+class TestLRUCache:
+    """Tests for LRUCache eviction and expiry."""
+
+    def test_evicts_least_recently_used(self):
+        """The oldest untouched entry is dropped once maxsize is exceeded."""
+        cache = LRUCache(maxsize=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache.get("a")
+        cache["c"] = 3
+
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache["c"] == 3
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        """Entries older than ttl behave as missing."""
+        now = [1000.0]
+        monkeypatch.setattr("cr.lru.time.monotonic", lambda: now[0])
+        cache = LRUCache(maxsize=10, ttl=60)
+        cache["a"] = 1
+
+        now[0] += 59
+        assert cache.get("a") == 1
+
+        now[0] += 2
+        assert "a" not in cache
+        assert cache.get("a") is None
+        assert len(cache) == 0
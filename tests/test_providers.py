@@ -1,15 +1,26 @@
 """Tests for provider abstraction and GitLab provider."""
 
+import asyncio
+
+import httpx
+import orjson
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
 
+import cr.config as config
 from cr.providers import get_provider_for_url
 from cr.providers.github import GitHubProvider
 from cr.providers.gitlab import GitLabProvider
-from cr.providers.registry import get_provider_for_review, cache_provider, clear_provider_cache
+from cr.providers.registry import get_provider_for_review, cache_provider
 from cr.diff_types import PRInfo
 
 
+@pytest.fixture(autouse=True)
+def mr_cache_dir(tmp_path, monkeypatch):
+    """Keep the on-disk MR cache inside the test's temp directory."""
+    monkeypatch.setattr(config, "MR_CACHE_DIR", tmp_path / "merge_requests", raising=False)
+    return tmp_path / "merge_requests"
+
+
 class TestProviderDetection:
     """Tests for provider URL detection."""
 
@@ -53,29 +64,43 @@ class TestProviderDetection:
         assert isinstance(provider, GitLabProvider)
         assert provider.name == "gitlab"
     
+    def test_get_provider_for_url_reuses_instance(self):
+        """Lookups return one shared instance per provider."""
+        first = get_provider_for_url("https://github.com/a/b/pull/1")
+        assert get_provider_for_url("https://github.com/c/d/pull/2") is first
+
     def test_get_provider_for_url_unknown(self):
         """Registry raises error for unknown URLs."""
         with pytest.raises(ValueError, match="No provider found"):
             get_provider_for_url("https://bitbucket.org/owner/repo/pull-requests/1")
 
+    def test_dispatch_matches_can_handle_order(self):
+        """The combined dispatch regex picks the first provider whose can_handle accepts."""
+        from cr.providers import PROVIDERS
+
+        urls = [
+            "https://github.com/o/r/pull/1",
+            "https://github.example.com/o/r/pull/12/files",
+            "https://gitlab.com/g/sub/p/-/merge_requests/3",
+            "https://github.com/o/r/-/merge_requests/2/pull/3",
+            "https://git.example.com/-/merge_requests/new/github/o/r/pull/3",
+        ]
+        for url in urls:
+            expected = next(cls for cls in PROVIDERS if cls.can_handle(url))
+            assert type(get_provider_for_url(url)) is expected
+
 
 class TestGitHubProviderUrlParsing:
     """Tests for GitHub URL parsing."""
-    
-    def test_parse_standard_url(self):
-        """Parse standard github.com URL."""
-        owner, repo, number = GitHubProvider.parse_pr_url("https://github.com/AsyncFuncAI/deepwiki/pull/448")
-        assert owner == "AsyncFuncAI"
-        assert repo == "deepwiki"
-        assert number == 448
-    
-    def test_parse_with_trailing(self):
-        """Parse URL with trailing path."""
-        owner, repo, number = GitHubProvider.parse_pr_url("https://github.com/owner/repo/pull/123/files")
-        assert owner == "owner"
-        assert repo == "repo"
-        assert number == 123
-    
+
+    @pytest.mark.parametrize("url, expected", [
+        ("https://github.com/AsyncFuncAI/deepwiki/pull/448", ("AsyncFuncAI", "deepwiki", 448)),
+        ("https://github.com/owner/repo/pull/123/files", ("owner", "repo", 123)),
+    ], ids=["standard", "trailing-path"])
+    def test_parse_url(self, url, expected):
+        """Valid PR URLs parse into (owner, repo, number)."""
+        assert GitHubProvider.parse_pr_url(url) == expected
+
     def test_parse_invalid_raises(self):
         """Invalid URL raises ValueError."""
         with pytest.raises(ValueError, match="Invalid GitHub PR URL"):
@@ -84,41 +109,41 @@ class TestGitHubProviderUrlParsing:
 
 class TestGitLabProviderUrlParsing:
     """Tests for GitLab URL parsing."""
-    
-    def test_parse_standard_url(self):
-        """Parse standard gitlab.com URL."""
-        host, project, iid = GitLabProvider.parse_mr_url("https://gitlab.com/owner/repo/-/merge_requests/123")
-        assert host == "gitlab.com"
-        assert project == "owner/repo"
-        assert iid == 123
-    
-    def test_parse_nested_group(self):
-        """Parse URL with nested groups."""
-        host, project, iid = GitLabProvider.parse_mr_url("https://gitlab.com/group/subgroup/project/-/merge_requests/42")
-        assert host == "gitlab.com"
-        assert project == "group/subgroup/project"
-        assert iid == 42
-    
-    def test_parse_self_hosted(self):
-        """Parse self-hosted GitLab URL."""
-        host, project, iid = GitLabProvider.parse_mr_url("https://gitlab.example.com/org/repo/-/merge_requests/99")
-        assert host == "gitlab.example.com"
-        assert project == "org/repo"
-        assert iid == 99
-    
+
+    @pytest.mark.parametrize("url, expected", [
+        ("https://gitlab.com/owner/repo/-/merge_requests/123", ("gitlab.com", "owner/repo", 123)),
+        ("https://gitlab.com/group/subgroup/project/-/merge_requests/42", ("gitlab.com", "group/subgroup/project", 42)),
+        ("https://gitlab.example.com/org/repo/-/merge_requests/99", ("gitlab.example.com", "org/repo", 99)),
+        # Trailing tabs, queries and fragments don't leak into the parse
+        ("https://gitlab.com/g/p/-/merge_requests/5/diffs", ("gitlab.com", "g/p", 5)),
+        ("https://gitlab.com/g/p/-/merge_requests/5?tab=commits", ("gitlab.com", "g/p", 5)),
+        ("https://gitlab.com/g/p/-/merge_requests/5#note_1", ("gitlab.com", "g/p", 5)),
+    ], ids=["standard", "nested-group", "self-hosted", "diffs-tab", "query", "fragment"])
+    def test_parse_url(self, url, expected):
+        """Valid MR URLs parse into (host, project path, iid)."""
+        assert GitLabProvider.parse_mr_url(url) == expected
+
     def test_parse_invalid_raises(self):
         """Invalid URL raises ValueError."""
         with pytest.raises(ValueError, match="Invalid GitLab MR URL"):
             GitLabProvider.parse_mr_url("https://github.com/owner/repo/pull/1")
 
+    @pytest.mark.parametrize("url", [
+        "https://gitlab.com/g/p/-/merge_requests/5abc",
+        "https://gitlab.com/g/p/-/merge_requests/new",
+    ])
+    def test_rejects_non_numeric_iid(self, url):
+        """The IID must be a whole path segment of digits."""
+        assert not GitLabProvider.can_handle(url)
+
 
 class TestGitLabProvider:
     """Tests for GitLab provider API calls."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_mr_response(self):
-        """Mock GitLab MR API response."""
-        return {
+        """Mock GitLab MR API response body, encoded once per module."""
+        return orjson.dumps({
             "iid": 123,
             "title": "Add feature",
             "description": "This MR adds a feature",
@@ -132,12 +157,12 @@ class TestGitLabProvider:
                 "head_sha": "def456head",
                 "start_sha": "start123",
             },
-        }
+        })
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_changes_response(self):
-        """Mock GitLab MR changes API response."""
-        return {
+        """Mock GitLab MR changes API response body, encoded once per module."""
+        return orjson.dumps({
             "changes": [
                 {
                     "new_path": "src/main.py",
@@ -148,61 +173,541 @@ class TestGitLabProvider:
                     "diff": "@@ -1,5 +1,10 @@\n+new line",
                 },
             ],
+        })
+
+    @pytest.fixture
+    def api(self, mock_mr_response, mock_changes_response):
+        """Responses for the REST endpoints load_mr requests, keyed by last path segment."""
+        return {
+            "123": httpx.Response(200, content=mock_mr_response),
+            "changes": httpx.Response(200, content=mock_changes_response),
+            "commits": httpx.Response(200, json=[]),
+            "notes": httpx.Response(200, json=[]),
         }
 
     @pytest.mark.asyncio
-    async def test_load_mr_success(self, mock_mr_response, mock_changes_response):
-        """Test successful MR loading."""
-        provider = GitLabProvider()
-        
-        with patch("cr.providers.gitlab.httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client_class.return_value.__aenter__.return_value = mock_client
-            
-            # Mock MR response
-            mr_resp = MagicMock()
-            mr_resp.json.return_value = mock_mr_response
-            mr_resp.raise_for_status = MagicMock()
-            
-            # Mock changes response
-            changes_resp = MagicMock()
-            changes_resp.json.return_value = mock_changes_response
-            changes_resp.raise_for_status = MagicMock()
-            
-            # Mock commits response
-            commits_resp = MagicMock()
-            commits_resp.status_code = 200
-            commits_resp.json.return_value = []
-            
-            # Mock notes response
-            notes_resp = MagicMock()
-            notes_resp.status_code = 200
-            notes_resp.json.return_value = []
-            
-            mock_client.get = AsyncMock(side_effect=[mr_resp, changes_resp, commits_resp, notes_resp])
-            
-            pr_info = await provider.load_mr("https://gitlab.com/test/repo/-/merge_requests/123")
-            
-            assert pr_info.owner == "test"
-            assert pr_info.repo == "repo"
-            assert pr_info.number == 123
-            assert pr_info.title == "Add feature"
-            assert pr_info.base_sha == "abc123base"
-            assert pr_info.head_sha == "def456head"
-            assert len(pr_info.files) == 1
-            
-            # Check caching
-            cached = provider.get_cached_mr(pr_info.review_id)
-            assert cached is not None
+    async def test_load_mr_success(self, api, monkeypatch):
+        """Test successful MR loading over REST."""
+        provider = GitLabProvider(use_rest=True)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: api[request.url.path.rsplit("/", 1)[-1]]
+        ))
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: client)
+
+        pr_info = await provider.load_mr("https://gitlab.com/test/repo/-/merge_requests/123")
+
+        assert pr_info.owner == "test"
+        assert pr_info.repo == "repo"
+        assert pr_info.number == 123
+        assert pr_info.title == "Add feature"
+        assert pr_info.base_sha == "abc123base"
+        assert pr_info.head_sha == "def456head"
+        assert len(pr_info.files) == 1
+        assert pr_info.files[0]["additions"] == 1
+        assert pr_info.provider_metadata["files_url"] == (
+            "https://gitlab.com/api/v4/projects/test%2Frepo/repository/files"
+        )
+
+        # Check caching
+        cached = provider.get_cached_mr(pr_info.review_id)
+        assert cached is not None
+
+    @pytest.mark.asyncio
+    async def test_load_mr_tolerates_activity_failures(self, api, monkeypatch):
+        """A failed commits or notes request doesn't fail the MR load."""
+        provider = GitLabProvider(use_rest=True)
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            segment = request.url.path.rsplit("/", 1)[-1]
+            if segment in ("commits", "notes"):
+                raise httpx.ConnectError("down")
+            return api[segment]
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: client)
+
+        pr_info = await provider.load_mr("https://gitlab.com/test/repo/-/merge_requests/123")
+
+        assert pr_info.title == "Add feature"
+        assert pr_info.commits_list == []
+        assert pr_info.comments == []
+        assert len(seen) == 4
+
+
+class TestGitLabProviderGraphQL:
+    """Tests for loading GitLab MR metadata over GraphQL."""
+
+    URL = "https://gitlab.com/g/p/-/merge_requests/7"
+    MR_GRAPHQL = {
+        "title": "T",
+        "description": None,
+        "state": "merged",
+        "draft": False,
+        "sourceBranch": "feat",
+        "targetBranch": "main",
+        "updatedAt": "2024-01-03T00:00:00Z",
+        "diffRefs": {"baseSha": "b1", "headSha": "h1"},
+        "diffStats": [{"path": "a.py", "additions": 3, "deletions": 2}],
+        "author": {"username": "u", "avatarUrl": "https://a/u"},
+        "commits": {
+            "pageInfo": {"hasNextPage": False},
+            "nodes": [{
+                "sha": "c1",
+                "message": "m",
+                "webUrl": "https://gitlab.com/g/p/-/commit/c1",
+                "authoredDate": "2024-01-01T00:00:00Z",
+                "authorName": "U",
+                "authorEmail": "u@example.com",
+            }],
+        },
+        "notes": {
+            "pageInfo": {"hasNextPage": False},
+            "nodes": [
+                {"id": "gid://gitlab/Note/5", "body": "hi", "createdAt": "2024-01-02T00:00:00Z",
+                 "system": False, "author": {"username": "r", "avatarUrl": None}},
+                {"id": "gid://gitlab/Note/6", "body": "added 1 commit", "createdAt": "2024-01-02T00:00:00Z",
+                 "system": True, "author": {"username": "u", "avatarUrl": None}},
+            ],
+        },
+    }
+    CHANGES = {"changes": [{"new_path": "a.py", "old_path": "a.py", "diff": "@@ -1 +1 @@\n+x"}]}
+
+    def _transport(self, seen, graphql_status=200):
+        """MockTransport serving the changes endpoint and the GraphQL query."""
+        def handler(request):
+            seen.append(request)
+            if request.url.path == "/api/graphql":
+                data = {"data": {"project": {"mergeRequest": self.MR_GRAPHQL}}}
+                return httpx.Response(graphql_status, json=data)
+            if request.url.path.endswith("/changes"):
+                return httpx.Response(200, json=self.CHANGES)
+            if request.url.path.endswith("/merge_requests/7"):
+                return httpx.Response(200, json={
+                    "title": "REST", "description": "", "state": "opened",
+                    "source_branch": "feat", "target_branch": "main",
+                    "diff_refs": {"base_sha": "b1", "head_sha": "h1"},
+                    "author": {"username": "u"},
+                })
+            return httpx.Response(200, json=[])
+        return httpx.MockTransport(handler)
+
+    @pytest.mark.asyncio
+    async def test_graphql_replaces_metadata_requests(self, monkeypatch):
+        """MR, commits and notes come from one GraphQL POST alongside the changes GET."""
+        seen = []
+        client = httpx.AsyncClient(transport=self._transport(seen))
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: client)
+
+        pr_info = await GitLabProvider(use_rest=False).load_mr(self.URL)
+
+        assert sorted(r.url.path for r in seen) == [
+            "/api/graphql",
+            "/api/v4/projects/g/p/merge_requests/7/changes",
+        ]
+        assert pr_info.title == "T"
+        assert pr_info.state == "merged"
+        assert pr_info.base_sha == "b1"
+        assert pr_info.commits_list[0]["sha"] == "c1"
+        assert [c["id"] for c in pr_info.comments] == [5]
+        assert pr_info.comments[0]["html_url"] == f"{self.URL}#note_5"
+        # Line counts come from diffStats rather than the patch text
+        assert (pr_info.files[0]["additions"], pr_info.files[0]["deletions"]) == (3, 2)
+
+    @pytest.mark.asyncio
+    async def test_graphql_failure_falls_back_to_rest(self, monkeypatch):
+        """A failed GraphQL query is retried over REST."""
+        seen = []
+        client = httpx.AsyncClient(transport=self._transport(seen, graphql_status=404))
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: client)
+
+        pr_info = await GitLabProvider(use_rest=False).load_mr(self.URL)
+
+        assert pr_info.title == "REST"
+        assert any(r.url.path.endswith("/notes") for r in seen)
+
+
+class TestGitLabMrCache:
+    """Tests for the on-disk GitLab MR cache."""
+
+    URL = "https://gitlab.com/g/p/-/merge_requests/7"
+    MR = {
+        "title": "T", "description": "", "state": "opened", "updated_at": "2024-01-01T00:00:00.000Z",
+        "source_branch": "feat", "target_branch": "main",
+        "diff_refs": {"base_sha": "b1", "head_sha": "h1"},
+        "author": {"username": "u"},
+    }
+    # Same instant as MR's updated_at, formatted the way GraphQL returns it
+    MR_GRAPHQL = {**TestGitLabProviderGraphQL.MR_GRAPHQL, "updatedAt": "2024-01-01T00:00:00Z"}
+
+    def _client(self, seen, mr=None, etag='"v1"'):
+        """Client whose MR endpoint answers 304 to a matching If-None-Match."""
+        mr = mr or self.MR
+
+        def handler(request):
+            seen.append(request)
+            if request.url.path == "/api/graphql":
+                return httpx.Response(200, json={"data": {"project": {"mergeRequest": self.MR_GRAPHQL}}})
+            if request.url.path.endswith("/merge_requests/7"):
+                if request.headers.get("If-None-Match") == etag:
+                    return httpx.Response(304)
+                return httpx.Response(200, json=mr, headers={"ETag": etag})
+            if request.url.path.endswith("/changes"):
+                return httpx.Response(200, json={"changes": []})
+            return httpx.Response(200, json=[])
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    @pytest.mark.asyncio
+    async def test_unchanged_mr_is_served_from_cache(self, monkeypatch):
+        """Later loads of an unchanged MR make a single conditional GET."""
+        seen = []
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: self._client(seen))
+        provider = GitLabProvider(use_rest=True, use_cache=True)
+
+        first = await provider.load_mr(self.URL)
+        # The ETag from the first REST fetch already earns a 304
+        seen.clear()
+        second = await provider.load_mr(self.URL)
+
+        assert len(seen) == 1
+        assert seen[0].headers["If-None-Match"] == '"v1"'
+        assert second.title == first.title
+        assert second.review_id != first.review_id
+
+    @pytest.mark.asyncio
+    async def test_graphql_payload_is_served_from_cache(self, monkeypatch):
+        """A GraphQL-fetched MR is revalidated by timestamp, then by ETag."""
+        seen = []
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: self._client(seen))
+        provider = GitLabProvider(use_rest=False, use_cache=True)
+
+        first = await provider.load_mr(self.URL)
+        # No ETag is known yet; REST's updated_at is the same instant as GraphQL's
+        seen.clear()
+        await provider.load_mr(self.URL)
+        assert len(seen) == 1
+        assert "If-None-Match" not in seen[0].headers
+        # The ETag stored by that revalidation now earns a 304
+        seen.clear()
+        third = await provider.load_mr(self.URL)
+
+        assert len(seen) == 1
+        assert seen[0].headers["If-None-Match"] == '"v1"'
+        assert third.title == first.title
+
+    @pytest.mark.asyncio
+    async def test_updated_mr_is_refetched(self, monkeypatch):
+        """A newer updated_at invalidates the cached payload."""
+        seen = []
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: self._client(seen))
+        provider = GitLabProvider(use_rest=True, use_cache=True)
+        await provider.load_mr(self.URL)
+
+        updated = {**self.MR, "title": "T2", "updated_at": "2024-02-01T00:00:00Z"}
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: self._client(seen, updated, '"v2"'))
+        pr_info = await provider.load_mr(self.URL)
+
+        assert pr_info.title == "T2"
+
+    @pytest.mark.asyncio
+    async def test_use_cache_false_skips_disk(self, monkeypatch, mr_cache_dir):
+        """With caching disabled nothing is written."""
+        seen = []
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: self._client(seen))
+
+        await GitLabProvider(use_rest=True, use_cache=False).load_mr(self.URL)
+
+        assert not mr_cache_dir.exists()
+
+
+class TestGitHubProviderLoadMr:
+    """Tests for GitHubProvider.load_mr against a mocked GitHub API."""
+
+    FILES = [{"filename": "a.py", "status": "modified", "additions": 1, "deletions": 0, "patch": "+x"}]
+    PR_REST = {
+        "title": "T",
+        "body": None,
+        "state": "open",
+        "draft": False,
+        "base": {"sha": "b1", "ref": "main"},
+        "head": {"sha": "h1", "ref": "feat"},
+        "user": {"login": "u", "avatar_url": "https://a/u"},
+        "commits": 1,
+    }
+    PR_GRAPHQL = {
+        "title": "T",
+        "body": "",
+        "state": "MERGED",
+        "isDraft": False,
+        "baseRefOid": "b1",
+        "headRefOid": "h1",
+        "baseRefName": "main",
+        "headRefName": "feat",
+        "additions": 1,
+        "deletions": 0,
+        "changedFiles": 1,
+        "author": None,
+        "commits": {
+            "totalCount": 1,
+            "pageInfo": {"hasNextPage": False},
+            "nodes": [{"commit": {
+                "oid": "c1",
+                "message": "msg",
+                "url": "https://github.com/o/r/commit/c1",
+                "author": {"name": "N", "date": "2024-01-01T00:00:00Z", "user": {"login": "u", "avatarUrl": "https://a/u"}},
+            }}],
+        },
+        "comments": {"pageInfo": {"hasNextPage": False}, "nodes": [{
+            "databaseId": 7,
+            "body": "hi",
+            "createdAt": "2024-01-02T00:00:00Z",
+            "url": "https://github.com/o/r/pull/1#c7",
+            "author": {"login": "v", "avatarUrl": "https://a/v"},
+        }]},
+    }
+
+    @pytest.fixture
+    def use_transport(self, monkeypatch):
+        """Route the shared client through an httpx.MockTransport handler."""
+        from cr.providers import github
+
+        def install(handler):
+            monkeypatch.setattr(github, "get_http_client", lambda: httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            ))
+
+        return install
+
+    @pytest.mark.asyncio
+    async def test_graphql_with_token(self, monkeypatch, use_transport):
+        """With a token, metadata comes from one GraphQL query plus the files request."""
+        monkeypatch.setattr("cr.providers.github.GITHUB_TOKEN", "tok")
+        seen = []
+
+        def handler(request):
+            seen.append((request.method, request.url.path))
+            if request.url.path == "/graphql":
+                assert request.headers["Authorization"] == "bearer tok"
+                return httpx.Response(200, json={"data": {"repository": {"pullRequest": self.PR_GRAPHQL}}})
+            return httpx.Response(200, json=self.FILES)
+
+        use_transport(handler)
+        pr_info = await GitHubProvider().load_mr("https://github.com/o/r/pull/1")
+
+        assert sorted(seen) == [("GET", "/repos/o/r/pulls/1/files"), ("POST", "/graphql")]
+        assert pr_info.state == "closed"
+        assert pr_info.user == {"login": "ghost", "avatar_url": ""}
+        assert pr_info.commits_list[0]["sha"] == "c1"
+        assert pr_info.commits_list[0]["author"]["login"] == "u"
+        assert pr_info.comments[0]["id"] == 7
+        assert pr_info.files[0]["patch"] == "+x"
+
+    @pytest.mark.asyncio
+    async def test_without_activity_skips_commits_and_comments(self, monkeypatch, use_transport):
+        """include_activity=False fetches only the PR and its files."""
+        monkeypatch.setattr("cr.providers.github.GITHUB_TOKEN", "tok")
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            if request.url.path.endswith("/files"):
+                return httpx.Response(200, json=self.FILES)
+            return httpx.Response(200, json=self.PR_REST)
+
+        use_transport(handler)
+        pr_info = await GitHubProvider().load_mr("https://github.com/o/r/pull/1", include_activity=False)
+
+        assert sorted(seen) == ["/repos/o/r/pulls/1", "/repos/o/r/pulls/1/files"]
+        assert pr_info.commits_list == []
+        assert pr_info.comments == []
+        assert pr_info.commits == 1
+
+    @pytest.mark.asyncio
+    async def test_graphql_error_falls_back_to_rest(self, monkeypatch, use_transport):
+        """A failing GraphQL query falls back to the REST endpoints."""
+        monkeypatch.setattr("cr.providers.github.GITHUB_TOKEN", "tok")
+
+        def handler(request):
+            path = request.url.path
+            if path == "/graphql":
+                return httpx.Response(200, json={"errors": [{"message": "nope"}]})
+            if path.endswith("/files"):
+                return httpx.Response(200, json=self.FILES)
+            if path.endswith("/pulls/1"):
+                return httpx.Response(200, json=self.PR_REST)
+            return httpx.Response(200, json=[])
+
+        use_transport(handler)
+        pr_info = await GitHubProvider().load_mr("https://github.com/o/r/pull/1")
+
+        assert pr_info.title == "T"
+        assert pr_info.base_sha == "b1"
+        assert pr_info.commits_list == []
+
+
+class TestConditionalRequests:
+    """Tests for ETag revalidation in MergeRequestProvider._get_json."""
+
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_cached_body(self):
+        """A 304 answer returns the body cached from the earlier 200."""
+        sent_etags = []
+
+        def handler(request):
+            sent_etags.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=[{"id": 1}], headers={"ETag": '"v1"'})
+
+        url = "https://api.example.com/etag-items"
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first, _ = await GitHubProvider._get_json(client, url, {})
+            first.append({"id": 2})  # Callers may mutate what they get back
+            second, _ = await GitHubProvider._get_json(client, url, {})
+
+        assert sent_etags == [None, '"v1"']
+        assert second == [{"id": 1}]
+
+
+class TestGitHubProviderFileContents:
+    """Tests for GitHubProvider.get_file_contents."""
+
+    @pytest.mark.asyncio
+    async def test_contents_cached_by_sha(self, monkeypatch):
+        """A second request for the same file and SHAs is served from the cache."""
+        from cr.providers import github
+
+        monkeypatch.setattr(GitHubProvider, "_file_cache", github.LRUCache(maxsize=16))
+        requests = []
+
+        def handler(request):
+            requests.append(request.url.params["ref"])
+            if request.url.params["ref"] == "base":
+                return httpx.Response(404)
+            return httpx.Response(200, text="new body")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(github, "get_http_client", lambda: client)
+
+        provider = GitHubProvider()
+        provider._mr_cache["r1"] = PRInfo(
+            review_id="r1", owner="o", repo="r", number=1, title="", body="",
+            base_sha="base", head_sha="head", files=[],
+        )
+
+        first = await provider.get_file_contents("r1", "a.py")
+        second = await provider.get_file_contents("r1", "a.py")
+        await client.aclose()
+
+        assert first == second
+        assert first[0] is None
+        assert first[1].contents == "new body"
+        assert sorted(requests) == ["base", "head"]
+
+
+
+class TestGitLabAllFileContents:
+    """Tests for GitLabProvider.get_all_file_contents."""
+
+    def _provider(self, use_rest=False, use_cache=False):
+        """Provider with one cached MR."""
+        provider = GitLabProvider(use_rest=use_rest, use_cache=use_cache)
+        provider._mr_cache["r1"] = PRInfo(
+            review_id="r1", owner="g", repo="p", number=1, title="", body="",
+            base_sha="base", head_sha="head", files=[],
+            provider_metadata={"host": "gitlab.com", "project_path": "g/p"},
+        )
+        return provider
+
+    @pytest.mark.asyncio
+    async def test_graphql_fetches_each_ref_once(self, monkeypatch):
+        """All paths come from one blobs query per ref, in path order."""
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            variables = orjson.loads(request.content)["variables"]
+            # a.py is new in head; c.py was deleted
+            present = {"base": ["b.py", "c.py"], "head": ["a.py", "b.py"]}[variables["ref"]]
+            nodes = [{"path": p, "rawBlob": f"{variables['ref']}:{p}"} for p in variables["paths"] if p in present]
+            return httpx.Response(200, json={"data": {"project": {"repository": {"blobs": {"nodes": nodes}}}}})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: client)
+
+        results = await self._provider().get_all_file_contents("r1", ["a.py", "b.py", "c.py"])
+
+        assert len(seen) == 2
+        assert [(old and old.contents, new and new.contents) for old, new in results] == [
+            (None, "head:a.py"),
+            ("base:b.py", "head:b.py"),
+            ("base:c.py", None),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_graphql_failure_falls_back_to_rest(self, monkeypatch):
+        """When GraphQL fails each file is fetched over REST."""
+        def handler(request):
+            if request.url.path == "/api/graphql":
+                return httpx.Response(500)
+            return httpx.Response(200, text=request.url.params["ref"])
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: client)
+
+        results = await self._provider().get_all_file_contents("r1", ["a.py", "b.py"])
+
+        assert [(old.contents, new.contents) for old, new in results] == [("base", "head")] * 2
+
+    @pytest.mark.asyncio
+    async def test_contents_are_cached_on_disk(self, monkeypatch):
+        """Files fetched once at a commit are read back from disk afterwards."""
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, text=f"{request.url.params['ref']}:é")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr("cr.providers.gitlab.get_http_client", lambda: client)
+        provider = self._provider(use_rest=True, use_cache=True)
+
+        first = await provider.get_file_contents("r1", "a.py")
+        second = await provider.get_all_file_contents("r1", ["a.py"])
+
+        assert len(seen) == 2
+        assert second == [first]
+        assert first[1].contents == "head:é"
+
+
+class TestPagination:
+    """Tests for following Link pagination in list fetches."""
+
+    @pytest.mark.asyncio
+    async def test_fetches_remaining_pages(self):
+        """Pages 2..N from rel="last" are fetched and appended in order."""
+        url = "https://api.example.com/items"
+        requested = []
+
+        def handler(request):
+            page = int(request.url.params.get("page", 1))
+            requested.append(page)
+            headers = {}
+            if page == 1:
+                headers["Link"] = f'<{url}?per_page=2&page=2>; rel="next", <{url}?per_page=2&page=3>; rel="last"'
+            return httpx.Response(200, json=[page * 10, page * 10 + 1], headers=headers)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            items = await GitHubProvider._fetch_json_list(client, url, {}, {"per_page": 2})
+
+        assert items == [10, 11, 20, 21, 30, 31]
+        assert sorted(requested) == [1, 2, 3]
 
 
 class TestProviderCache:
     """Tests for provider caching."""
-    
-    def setup_method(self):
-        """Clear cache before each test."""
-        clear_provider_cache()
-    
+
     def test_cache_and_retrieve(self):
         """Test caching and retrieving providers."""
         provider = GitHubProvider()
@@ -215,3 +720,72 @@ class TestProviderCache:
         """Test retrieving non-existent provider."""
         result = get_provider_for_review("nonexistent")
         assert result is None
+
+    def test_bounded(self, monkeypatch):
+        """The oldest reviews are evicted once the cache is full."""
+        from cr.providers import registry
+
+        monkeypatch.setattr(registry._provider_cache, "maxsize", 2)
+        for review_id in ("a", "b", "c"):
+            cache_provider(review_id, GitHubProvider())
+
+        assert get_provider_for_review("a") is None
+        assert get_provider_for_review("c") is not None
+
+
+class TestSharedClient:
+    """Tests for the HTTP client shared by all providers."""
+
+    @pytest.mark.asyncio
+    async def test_reused_until_closed(self):
+        """Calls on one event loop share a client; closing resets it."""
+        from cr.providers import _http
+
+        first = _http.get_http_client()
+        assert _http.get_http_client() is first
+
+        await _http.close_http_client()
+        assert first.is_closed
+        assert _http._client is None
+
+    @pytest.mark.asyncio
+    async def test_caps_requests_in_flight(self):
+        """No more than max_in_flight requests are sent at once."""
+        from cr.providers.base import BoundedAsyncClient
+
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200)
+
+        async with BoundedAsyncClient(max_in_flight=3, transport=httpx.MockTransport(handler)) as client:
+            await asyncio.gather(*(client.get(f"https://x/{i}") for i in range(10)))
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_cap_is_per_host(self):
+        """A saturated host doesn't hold up requests to another."""
+        from cr.providers.base import BoundedAsyncClient
+
+        release = asyncio.Event()
+
+        async def handler(request):
+            if request.url.host == "slow":
+                await release.wait()
+            return httpx.Response(200)
+
+        async with BoundedAsyncClient(max_in_flight=1, transport=httpx.MockTransport(handler)) as client:
+            slow = asyncio.create_task(client.get("https://slow/"))
+            await asyncio.sleep(0)
+            resp = await asyncio.wait_for(client.get("https://fast/"), timeout=1)
+            release.set()
+            await slow
+
+        assert resp.status_code == 200
@@ -0,0 +1,115 @@
+"""Tests for RLM log capture, history formatting and trace saving."""
+
+import json
+import logging
+from datetime import datetime
+
+from cr.rlm_runner import RLMLogHandler, TraceCapture, format_history, save_trace
+from cr.types import RLMTrace
+
+
+def _emit(handler, msg):
+    """Send one log message through the handler."""
+    handler.emit(logging.LogRecord("dspy.predict.rlm", logging.INFO, __file__, 0, msg, None, None))
+
+
+class TestRLMLogHandler:
+    """Tests for parsing RLM iteration log messages."""
+
+    def _handler(self):
+        """Handler recording on_step callbacks."""
+        steps = []
+        trace = RLMTrace(question="q", repo_path="/r", started_at=datetime.now())
+        handler = RLMLogHandler(TraceCapture(trace), on_step=lambda *args: steps.append(args))
+        return handler, trace, steps
+
+    def test_parses_iteration_reasoning_and_code(self):
+        """The header number, reasoning and fenced code are extracted."""
+        handler, trace, steps = self._handler()
+
+        _emit(handler, "RLM iteration 3/20\nReasoning: look at main\nCode:\n```python\nprint(1)\n```")
+
+        assert steps == [(3, "look at main", "print(1)")]
+        assert trace.steps[0].code == "print(1)"
+
+    def test_reasoning_without_code(self):
+        """A message with no Code: section records empty code."""
+        handler, _trace, steps = self._handler()
+
+        _emit(handler, "RLM iteration 1/5\nReasoning: done")
+
+        assert steps == [(1, "done", "")]
+
+    def test_missing_iteration_number_uses_next_step(self):
+        """A header without a number falls back to the next step number."""
+        handler, _trace, steps = self._handler()
+
+        _emit(handler, "RLM iteration ?\nReasoning: a")
+        _emit(handler, "RLM iteration\nReasoning: b")
+
+        assert [s[0] for s in steps] == [1, 2]
+
+    def test_ignores_other_messages(self):
+        """Messages without an iteration header or reasoning are skipped."""
+        handler, trace, steps = self._handler()
+
+        _emit(handler, "something else")
+        _emit(handler, "RLM iteration 1/5")
+
+        assert steps == []
+        assert trace.steps == []
+
+
+class TestSaveTrace:
+    """Tests for writing traces to disk."""
+
+    def test_round_trips_as_json(self, tmp_path, monkeypatch):
+        """The written file is indented JSON matching to_dict."""
+        monkeypatch.setattr("cr.rlm_runner.TRACES_DIR", tmp_path)
+        monkeypatch.setattr("cr.rlm_runner.ensure_cache_dirs", lambda: None)
+        trace = RLMTrace(question="q", repo_path="/r", started_at=datetime(2024, 1, 1))
+        TraceCapture(trace).add_step("why", "print(1)", artifacts={1: "x"})
+
+        path = save_trace(trace)
+
+        assert path.parent == tmp_path
+        assert json.loads(path.read_text()) == json.loads(json.dumps(trace.to_dict()))
+        assert path.read_text().startswith('{\n  "')
+
+    def test_write_errors_are_logged(self, monkeypatch, caplog):
+        """Background writes log failures instead of raising."""
+        from cr.rlm_runner import _save_trace_logged
+
+        def fail(trace):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("cr.rlm_runner.save_trace", fail)
+        trace = RLMTrace(question="q", repo_path="/r", started_at=datetime(2024, 1, 1))
+
+        _save_trace_logged(trace)
+
+        assert "Failed to save trace" in caplog.text
+
+
+class TestFormatHistory:
+    """Tests for format_history."""
+
+    @staticmethod
+    def _naive(history):
+        """Reference formatting, rebuilt from scratch."""
+        lines = ["Previous conversation:"]
+        for i, (q, a) in enumerate(history, 1):
+            lines.extend([f"\nQ{i}: {q}", f"A{i}: {a}"])
+        return "\n".join(lines)
+
+    def test_incremental_matches_full_format(self):
+        """Appending turns, repeating a call and resetting all match a fresh format."""
+        history = []
+        assert format_history(history) == "No previous conversation."
+        for i in range(3):
+            history.append((f"q{i}", f"a{i}"))
+            assert format_history(history) == self._naive(history)
+        assert format_history(history) == self._naive(history)
+
+        other = [("x", "y")]
+        assert format_history(other) == self._naive(other)
@@ -1,172 +1,521 @@
 """Tests for FastAPI server."""
 
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import orjson
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
 
-from cr.server import app
-from cr.diff_types import PRInfo, FileContents, AnswerBlock, DiffCitation
+import cr.server as server
+from cr.diff_types import (
+    AnswerBlock,
+    DiffCitation,
+    DiffSelection,
+    FileContents,
+    PRInfo,
+    ReviewIssue,
+    RLMIteration,
+)
+from cr.server import _active_streams, _shared_stream, _stream_ask_response, app
+
+_MOCK_PR_INFO = PRInfo(
+    review_id="test123",
+    owner="test",
+    repo="repo",
+    number=42,
+    title="Test PR",
+    body="Test body",
+    base_sha="base",
+    head_sha="head",
+    files=[{"path": "file.py", "status": "modified"}],
+)
+_OLD_FILE = FileContents(name="file.py", contents="old", cache_key="old-key")
+_NEW_FILE = FileContents(name="file.py", contents="new", cache_key="new-key")
+_ADDED_FILE = FileContents(name="new.py", contents="new content")
+_BIG_FILE = FileContents(name="big.py", contents="x = 1\n" * 1000)
+_MOCK_BLOCKS = [AnswerBlock(type="markdown", content="Test answer")]
+_MOCK_CITATIONS = [DiffCitation(path="file.py", side="additions", start_line=1, end_line=5)]
+_HEALTH_URL = httpx.URL("/health")
+_LOAD_PR_URL = httpx.URL("/api/github/load_pr")
+_FILE_URL = httpx.URL("/api/github/file", params={"reviewId": "test123", "path": "file.py"})
+_ADDED_FILE_URL = httpx.URL("/api/github/file", params={"reviewId": "test123", "path": "new.py"})
+_BIG_FILE_URL = httpx.URL("/api/github/file", params={"reviewId": "test123", "path": "big.py"})
+_MISSING_FILE_URL = httpx.URL("/api/github/file", params={"reviewId": "unknown", "path": "file.py"})
+_ASK_URL = httpx.URL("/api/diff/ask")
+_REVIEW_URL = httpx.URL("/api/diff/review", params={"reviewId": "test123"})
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_LOAD_PR_BODY = orjson.dumps({"prUrl": "https://github.com/test/repo/pull/42"})
+_INVALID_URL_BODY = orjson.dumps({"prUrl": "invalid-url"})
+_ASK_BODY = orjson.dumps({"reviewId": "test123", "question": "What does this code do?"})
+_ASK_SELECTION_BODY = orjson.dumps({
+    "reviewId": "test123",
+    "question": "Why?",
+    "selection": {"path": "a.py", "startLine": 3, "endLine": 7},
+})
+_MOCK_ISSUES = [
+    ReviewIssue(
+        title="Potential null reference",
+        severity="high",
+        category="investigation",
+        explanation_markdown="The code may throw a null reference exception.",
+    )
+]
+
+
+def _areturn(value):
+    """Async function that ignores its arguments and returns value."""
+    async def stub(*args, **kwargs):
+        return value
+    return stub
+
+
+def _araise(exc):
+    """Async function that ignores its arguments and raises exc."""
+    async def stub(*args, **kwargs):
+        raise exc
+    return stub
 
 
 @pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+def patched(aclient, monkeypatch):
+    """Apply {dotted.name: value} patches for this test and return the client."""
+    def apply(mapping):
+        for target, value in mapping.items():
+            monkeypatch.setattr(target, value)
+        return aclient
+    return apply
+
+
+@pytest.fixture(scope="module")
+def _rlm_template():
+    """RLM stand-in with an async ask, built once per module."""
+    rlm = MagicMock()
+    rlm.ask = AsyncMock()
+    return rlm
+
+
+@pytest.fixture
+def mock_rlm(_rlm_template):
+    """The shared RLM stand-in with calls and return values cleared."""
+    _rlm_template.reset_mock(return_value=True, side_effect=True)
+    return _rlm_template
 
 
 class TestHealthEndpoint:
     """Tests for health check endpoint."""
 
-    def test_health(self, client):
+    @pytest.mark.asyncio
+    async def test_health(self, aclient):
         """Test health endpoint returns ok."""
-        response = client.get("/health")
+        response = await aclient.get(_HEALTH_URL)
         assert response.status_code == 200
         assert response.json() == {"status": "ok"}
 
 
-class TestLoadPREndpoint:
-    """Tests for /api/github/load_pr endpoint."""
-
-    def test_load_pr_success(self, client):
-        """Test successful PR loading."""
-        mock_pr_info = PRInfo(
-            review_id="test123",
-            owner="test",
-            repo="repo",
-            number=42,
-            title="Test PR",
-            body="Test body",
-            base_sha="base",
-            head_sha="head",
-            files=[{"path": "file.py", "status": "modified"}],
+class TestWarmup:
+    """Tests for RLM warmup on server startup."""
+
+    def test_startup_warms_rlms(self, monkeypatch):
+        """Starting the app configures both RLM singletons in the background."""
+        monkeypatch.setattr("cr.server.WARMUP_ON_STARTUP", True)
+        warmed = threading.Event()
+        with patch("cr.server._warmup_rlms", side_effect=lambda *rlms: warmed.set()) as warmup:
+            with TestClient(app):
+                assert warmed.wait(timeout=5)
+
+        rlms = warmup.call_args.args
+        assert [type(r).__name__ for r in rlms] == ["DiffQARLM", "FastAutoReview"]
+
+    def test_warmup_failure_is_logged(self, monkeypatch):
+        """An error escaping the warmup thread is logged rather than left on the task."""
+        monkeypatch.setattr("cr.server.WARMUP_ON_STARTUP", True)
+        logged = threading.Event()
+        with patch("cr.server._warmup_rlms", side_effect=RuntimeError("no deno")), \
+                patch.object(server.logger, "warning", side_effect=lambda *args: logged.set()) as warning:
+            with TestClient(app):
+                assert logged.wait(timeout=5)
+
+        assert "no deno" in str(warning.call_args.args)
+
+
+class TestRLMSingletons:
+    """Tests for the lazily created RLM singletons."""
+
+    def test_concurrent_first_calls_share_instance(self, monkeypatch):
+        """Threads racing the first call construct the RLM only once."""
+
+        def slow_rlm():
+            time.sleep(0.05)
+            return MagicMock()
+
+        constructor = MagicMock(side_effect=slow_rlm)
+        monkeypatch.setattr(server, "DiffQARLM", constructor)
+        monkeypatch.setattr(server, "_diff_qa_rlm", None)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(server.get_diff_qa_rlm())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert constructor.call_count == 1
+        assert all(r is results[0] for r in results)
+
+
+class TestRequestParsing:
+    """Tests for orjson request body decoding."""
+
+    @pytest.mark.asyncio
+    async def test_body_decoded_with_orjson(self, aclient):
+        """JSON bodies go through orjson before model validation."""
+        with patch("orjson.loads", wraps=orjson.loads) as loads, \
+                patch("cr.server.get_provider_for_url", side_effect=ValueError("Unsupported")):
+            response = await aclient.post(_LOAD_PR_URL, json={"prUrl": "https://example.com/x"})
+
+        assert response.status_code == 400
+        loads.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_malformed_body_is_422(self, aclient):
+        """Invalid JSON is still reported as a validation error."""
+        response = await aclient.post(
+            _LOAD_PR_URL,
+            content=b"{bad",
+            headers=_JSON_HEADERS,
         )
-        
-        mock_provider = MagicMock()
-        mock_provider.load_mr = AsyncMock(return_value=mock_pr_info)
-        
-        with patch("cr.server.get_provider_for_url", return_value=mock_provider):
-            with patch("cr.server.cache_provider"):
-                response = client.post(
-                    "/api/github/load_pr",
-                    json={"prUrl": "https://github.com/test/repo/pull/42"},
-                )
-            
-                assert response.status_code == 200
-                data = response.json()
-                assert data["reviewId"] == "test123"
-                assert data["title"] == "Test PR"
-                assert data["repo"]["owner"] == "test"
-                assert len(data["files"]) == 1
-
-    def test_load_pr_invalid_url(self, client):
-        """Test error on invalid PR URL."""
-        with patch("cr.server.get_provider_for_url") as mock_get_provider:
-            mock_get_provider.side_effect = ValueError("No provider found for URL")
-            
-            response = client.post(
-                "/api/github/load_pr",
-                json={"prUrl": "invalid-url"},
-            )
-            
-            assert response.status_code == 400
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "json_invalid"
+
+
+class TestEndpointSuccess:
+    """Success paths for the load_pr, file, ask and review endpoints."""
+
+    @pytest.mark.parametrize("target, stub_method, ret, method, path, body, extract, expected", [
+        (
+            "get_provider_for_url", "load_mr", _MOCK_PR_INFO,
+            "post", _LOAD_PR_URL, _LOAD_PR_BODY,
+            lambda d: (d["reviewId"], d["title"], d["repo"]["owner"], len(d["files"])),
+            ("test123", "Test PR", "test", 1),
+        ),
+        (
+            "get_provider_for_review", "get_file_contents", (_OLD_FILE, _NEW_FILE),
+            "get", _FILE_URL, None,
+            lambda d: (d["oldFile"]["contents"], d["newFile"]["contents"]),
+            ("old", "new"),
+        ),
+        (
+            "get_diff_qa_rlm", "ask", (_MOCK_BLOCKS, _MOCK_CITATIONS),
+            "post", _ASK_URL, _ASK_BODY,
+            lambda d: (len(d["answerBlocks"]), d["answerBlocks"][0]["type"], len(d["citations"])),
+            (1, "markdown", 1),
+        ),
+        (
+            "get_auto_review_rlm", "review", (_MOCK_ISSUES, "Summary"),
+            "post", _REVIEW_URL, None,
+            lambda d: (len(d["issues"]), d["issues"][0]["severity"], d["summary"]),
+            (1, "high", "Summary"),
+        ),
+    ], ids=["load_pr", "file", "ask", "review"])
+    @pytest.mark.asyncio
+    async def test_endpoint_success(
+        self, patched, target, stub_method, ret, method, path, body, extract, expected
+    ):
+        """Each endpoint returns 200 with the stubbed provider or RLM result."""
+        stub = SimpleNamespace(**{stub_method: _areturn(ret)})
+        client = patched({f"cr.server.{target}": MagicMock(return_value=stub)})
+
+        kwargs = {"content": body, "headers": _JSON_HEADERS} if body is not None else {}
+        response = await getattr(client, method)(path, **kwargs)
+
+        assert response.status_code == 200
+        assert extract(response.json()) == expected
+
+
+class TestEndpointErrors:
+    """Error-to-status mappings for the load_pr, file, ask and review endpoints."""
+
+    @pytest.mark.parametrize("target, stub_method, exc, method, path, body, code", [
+        ("get_provider_for_url", "load_mr", ValueError("No provider found for URL"),
+         "post", _LOAD_PR_URL, _INVALID_URL_BODY, 400),
+        ("get_provider_for_url", "load_mr", RuntimeError("boom"),
+         "post", _LOAD_PR_URL, _LOAD_PR_BODY, 500),
+        ("get_provider_for_review", "get_file_contents", ValueError("Review unknown not found"),
+         "get", _MISSING_FILE_URL, None, 404),
+        ("get_diff_qa_rlm", "ask", ValueError("Review test123 not found"),
+         "post", _ASK_URL, _ASK_BODY, 404),
+        ("get_auto_review_rlm", "review", ValueError("Review test123 not found"),
+         "post", _REVIEW_URL, None, 404),
+    ], ids=["load_pr-invalid", "load_pr-failure", "file", "ask", "review"])
+    @pytest.mark.asyncio
+    async def test_error_mapping(self, patched, target, stub_method, exc, method, path, body, code):
+        """Exceptions from the provider or RLM become the endpoint's HTTP error."""
+        stub = SimpleNamespace(**{stub_method: _araise(exc)})
+        client = patched({f"cr.server.{target}": MagicMock(return_value=stub)})
+
+        kwargs = {"content": body, "headers": _JSON_HEADERS} if body is not None else {}
+        response = await getattr(client, method)(path, **kwargs)
+
+        assert response.status_code == code
+        assert str(exc) in response.json()["detail"]
 
 
 class TestGetFileEndpoint:
     """Tests for /api/github/file endpoint."""
 
-    def test_get_file_success(self, client):
-        """Test successful file fetch."""
-        old_file = FileContents(name="file.py", contents="old", cache_key="old-key")
-        new_file = FileContents(name="file.py", contents="new", cache_key="new-key")
-        
-        mock_provider = MagicMock()
-        mock_provider.get_file_contents = AsyncMock(return_value=(old_file, new_file))
-        
-        with patch("cr.server.get_provider_for_review", return_value=mock_provider):
-            response = client.get("/api/github/file?reviewId=test123&path=file.py")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["oldFile"]["contents"] == "old"
-            assert data["newFile"]["contents"] == "new"
-
-    def test_get_file_added(self, client):
+    @pytest.mark.asyncio
+    async def test_get_file_added(self, patched):
         """Test getting a newly added file."""
-        new_file = FileContents(name="new.py", contents="new content")
-        
-        mock_provider = MagicMock()
-        mock_provider.get_file_contents = AsyncMock(return_value=(None, new_file))
-        
-        with patch("cr.server.get_provider_for_review", return_value=mock_provider):
-            response = client.get("/api/github/file?reviewId=test123&path=new.py")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["oldFile"] is None
-            assert data["newFile"]["contents"] == "new content"
-
-    def test_get_file_not_found(self, client):
+        mock_provider = SimpleNamespace(get_file_contents=_areturn((None, _ADDED_FILE)))
+        client = patched({"cr.server.get_provider_for_review": MagicMock(return_value=mock_provider)})
+
+        response = await client.get(_ADDED_FILE_URL)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["oldFile"] is None
+        assert data["newFile"]["contents"] == "new content"
+
+    @pytest.mark.asyncio
+    async def test_large_file_is_gzipped(self, patched):
+        """Responses over the threshold are compressed for gzip-capable clients."""
+        mock_provider = SimpleNamespace(get_file_contents=_areturn((None, _BIG_FILE)))
+        client = patched({"cr.server.get_provider_for_review": MagicMock(return_value=mock_provider)})
+
+        response = await client.get(
+            _BIG_FILE_URL,
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["newFile"]["contents"] == _BIG_FILE.contents
+
+    @pytest.mark.asyncio
+    async def test_get_file_not_found(self, patched):
         """Test error when review not found."""
-        with patch("cr.server.get_provider_for_review", return_value=None):
-            response = client.get("/api/github/file?reviewId=unknown&path=file.py")
-            
-            assert response.status_code == 404
+        client = patched({"cr.server.get_provider_for_review": MagicMock(return_value=None)})
+
+        response = await client.get(_MISSING_FILE_URL)
+
+        assert response.status_code == 404
 
 
 class TestAskEndpoint:
     """Tests for /api/diff/ask endpoint."""
 
-    def test_ask_success(self, client):
-        """Test successful question."""
-        mock_blocks = [AnswerBlock(type="markdown", content="Test answer")]
-        mock_citations = [DiffCitation(path="file.py", side="additions", start_line=1, end_line=5)]
-        
-        with patch("cr.server.get_diff_qa_rlm") as mock_get_rlm:
-            mock_rlm = MagicMock()
-            mock_rlm.ask = AsyncMock(return_value=(mock_blocks, mock_citations))
-            mock_get_rlm.return_value = mock_rlm
-            
-            response = client.post(
-                "/api/diff/ask",
-                json={
-                    "reviewId": "test123",
-                    "question": "What does this code do?",
-                },
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data["answerBlocks"]) == 1
-            assert data["answerBlocks"][0]["type"] == "markdown"
-            assert len(data["citations"]) == 1
-
-
-class TestReviewEndpoint:
-    """Tests for /api/diff/review endpoint."""
-
-    def test_review_success(self, client):
-        """Test successful review."""
-        from cr.diff_types import ReviewIssue
-        
-        mock_issues = [
-            ReviewIssue(
-                title="Potential null reference",
-                severity="high",
-                category="investigation",
-                explanation_markdown="The code may throw a null reference exception.",
-            )
-        ]
-        
-        with patch("cr.server.get_auto_review_rlm") as mock_get_rlm:
-            mock_rlm = MagicMock()
-            mock_rlm.review = AsyncMock(return_value=(mock_issues, "Summary"))
-            mock_get_rlm.return_value = mock_rlm
-            
-            response = client.post("/api/diff/review?reviewId=test123")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data["issues"]) == 1
-            assert data["issues"][0]["severity"] == "high"
-            assert data["summary"] == "Summary"
+    @pytest.mark.asyncio
+    async def test_ask_with_selection(self, patched, mock_rlm):
+        """A camelCase selection is parsed into a DiffSelection with defaults filled in."""
+        mock_rlm.ask.return_value = ([], [])
+        client = patched({"cr.server.get_diff_qa_rlm": MagicMock(return_value=mock_rlm)})
+
+        response = await client.post(
+            _ASK_URL, content=_ASK_SELECTION_BODY, headers=_JSON_HEADERS
+        )
+
+        assert response.status_code == 200
+        assert mock_rlm.ask.call_args.kwargs["selection"] == DiffSelection(
+            path="a.py", side="unified", start_line=3, end_line=7, mode="changeset"
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("field", ["side", "mode"])
+    async def test_invalid_selection_is_422(self, patched, mock_rlm, field):
+        """An unknown side or mode is rejected before it reaches the RLM."""
+        client = patched({"cr.server.get_diff_qa_rlm": MagicMock(return_value=mock_rlm)})
+        body = orjson.dumps({
+            "reviewId": "test123",
+            "question": "Why?",
+            "selection": {"path": "a.py", field: "bogus"},
+        })
+
+        response = await client.post(_ASK_URL, content=body, headers=_JSON_HEADERS)
+
+        assert response.status_code == 422
+        mock_rlm.ask.assert_not_called()
+
+
+class TestStreamAskResponse:
+    """Tests for the SSE generator behind /api/diff/ask/stream."""
+
+    @pytest.mark.asyncio
+    async def test_event_sequence(self):
+        """Iterations, blocks, citations and completion are streamed as JSON."""
+
+        async def fake_ask_stream(**kwargs):
+            yield RLMIteration(iteration=1, max_iterations=3, reasoning="r", code="print(1)", output="1")
+            yield [AnswerBlock(type="markdown", content="Done")], [
+                DiffCitation(path="a.py", side="unified", start_line=1, end_line=2)
+            ]
+
+        rlm = SimpleNamespace(ask_stream=fake_ask_stream, _ensure_configured=lambda: None)
+
+        with patch("cr.server.get_diff_qa_rlm", return_value=rlm):
+            events = [
+                json.loads(e["data"])
+                async for e in _stream_ask_response("r1", "Why?", [], None)
+            ]
+
+        assert [e["type"] for e in events] == ["start", "iteration", "block", "citations", "complete"]
+        assert events[1]["data"] == {
+            "iteration": 1,
+            "maxIterations": 3,
+            "reasoning": "r",
+            "code": "print(1)",
+            "output": "1",
+        }
+        assert events[2]["data"]["block"] == {"type": "markdown", "content": "Done"}
+        assert events[3]["data"]["citations"][0]["path"] == "a.py"
+
+    @pytest.mark.asyncio
+    async def test_start_sent_before_rlm_configured(self):
+        """The start event goes out before the RLM is configured, off the event loop."""
+
+        async def fake_ask_stream(**kwargs):
+            yield [], []
+
+        configured_on = []
+        rlm = SimpleNamespace(
+            ask_stream=fake_ask_stream,
+            _ensure_configured=lambda: configured_on.append(threading.current_thread()),
+        )
+
+        with patch("cr.server.get_diff_qa_rlm", return_value=rlm):
+            stream = _stream_ask_response("r1", "Why?", [], None)
+            first = json.loads((await anext(stream))["data"])
+            assert first["type"] == "start"
+            assert configured_on == []
+
+            rest = [json.loads(e["data"])["type"] async for e in stream]
+
+        assert rest == ["citations", "complete"]
+        assert configured_on and configured_on[0] is not threading.main_thread()
+
+
+class TestRunServer:
+    """Tests for run_server's uvicorn options."""
+
+    @pytest.mark.parametrize("installed, loop, http", [
+        (True, "uvloop", "httptools"),
+        (False, "asyncio", "h11"),
+    ])
+    def test_picks_fast_loop_when_installed(self, installed, loop, http):
+        """uvloop/httptools are used only when importable."""
+        pytest.importorskip("uvicorn")
+        from cr.server import run_server
+
+        with patch("uvicorn.run") as run, \
+                patch("importlib.util.find_spec", return_value=object() if installed else None):
+            run_server("0.0.0.0", 9000)
+
+        kwargs = run.call_args.kwargs
+        assert (kwargs["host"], kwargs["port"]) == ("0.0.0.0", 9000)
+        assert (kwargs["loop"], kwargs["http"]) == (loop, http)
+
+
+async def _drain(broadcast, release):
+    """Collect every event a subscriber receives."""
+    return [e async for e in broadcast.subscribe(release)]
+
+
+class TestSharedStream:
+    """Tests for sharing one streamed RLM run between identical asks."""
+
+    @pytest.mark.asyncio
+    async def test_identical_asks_share_one_run(self):
+        """Concurrent subscribers get the same encoded events from a single run."""
+        runs = []
+
+        async def source():
+            runs.append(1)
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield {"event": "message", "data": str(i)}
+
+        first, release_first = _shared_stream(("r1", "Why?"), source)
+        second, release_second = _shared_stream(("r1", "Why?"), source)
+
+        a, b = await asyncio.gather(_drain(first, release_first), _drain(second, release_second))
+
+        assert first is second
+        assert len(runs) == 1
+        assert [e["data"] for e in a] == ["0", "1", "2"]
+        assert all(x is y for x, y in zip(a, b))
+
+    @pytest.mark.asyncio
+    async def test_last_subscriber_leaving_cancels_run(self):
+        """A run nobody is listening to anymore is cancelled and forgotten."""
+        async def source():
+            yield {"event": "message", "data": "start"}
+            await asyncio.Event().wait()
+
+        broadcast, release = _shared_stream(("r2", "q"), source)
+        events = broadcast.subscribe(release)
+        assert (await anext(events))["data"] == "start"
+
+        await events.aclose()
+        with pytest.raises(asyncio.CancelledError):
+            await broadcast.task
+
+        assert broadcast.task.cancelled()
+        assert ("r2", "q") not in _active_streams
+
+    @pytest.mark.asyncio
+    async def test_attached_subscriber_keeps_run_alive_before_iterating(self):
+        """A subscriber counts from the moment it is handed the run, not when it starts reading."""
+        gate = asyncio.Event()
+
+        async def source():
+            yield {"event": "message", "data": "start"}
+            await gate.wait()
+            yield {"event": "message", "data": "answer"}
+
+        first, release_first = _shared_stream(("r3", "q"), source)
+        events = first.subscribe(release_first)
+        assert (await anext(events))["data"] == "start"
+        second, release_second = _shared_stream(("r3", "q"), source)
+
+        # The first client disconnects before the second one's stream starts
+        await events.aclose()
+        assert not second.task.done()
+
+        gate.set()
+        assert [e["data"] for e in await _drain(second, release_second)] == ["start", "answer"]
+
+    @pytest.mark.asyncio
+    async def test_release_without_iterating_cancels_run(self):
+        """Releasing a subscriber whose stream never started still cancels an unwatched run."""
+        async def source():
+            await asyncio.Event().wait()
+            yield {}
+
+        broadcast, release = _shared_stream(("r4", "q"), source)
+        release()
+        release()  # Response cleanup and the generator may both release
+
+        with pytest.raises(asyncio.CancelledError):
+            await broadcast.task
+        assert broadcast.subscribers == 0
+
+    @pytest.mark.asyncio
+    async def test_run_cancelled_elsewhere_ends_with_error(self):
+        """Subscribers of a run cancelled for another reason get a terminal error event."""
+        async def source():
+            yield {"event": "message", "data": "start"}
+            await asyncio.Event().wait()
+
+        broadcast, release = _shared_stream(("r5", "q"), source)
+        events = broadcast.subscribe(release)
+        assert (await anext(events))["data"] == "start"
+
+        broadcast.task.cancel()
+        rest = [e async for e in events]
 
+        assert [json.loads(e["data"])["type"] for e in rest] == ["error"]
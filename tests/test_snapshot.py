@@ -0,0 +1,30 @@
+"""Tests for snapshot building helpers."""
+
+from cr.snapshot import extract_symbols
+
+
+class TestExtractSymbols:
+    """Tests for regex symbol extraction."""
+
+    def test_line_numbers_and_order(self):
+        """Symbols carry 1-based line numbers and are sorted by line."""
+        content = "import os\nclass A:\n    def run(self):\n        pass\nasync def main():\n    pass\n"
+
+        symbols = extract_symbols(content, "python")
+
+        assert [(s["symbol"], s["kind"], s["line_no"]) for s in symbols] == [
+            ("os", "import", 1),
+            ("A", "class", 2),
+            ("run", "function", 3),
+            ("main", "function", 5),
+        ]
+
+    def test_overlapping_patterns_keep_first_kind(self):
+        """A line matched by several patterns is reported once, under the first kind."""
+        symbols = extract_symbols("export class Foo {}\n", "typescript")
+
+        assert symbols == [{"symbol": "Foo", "kind": "class", "line_no": 1}]
+
+    def test_unknown_language(self):
+        """Languages without patterns yield no symbols."""
+        assert extract_symbols("anything", "text") == []
@@ -0,0 +1,96 @@
+"""Tests for the on-disk snapshot cache."""
+
+import os
+
+import pytest
+
+import cr.snapshot_cache as snapshot_cache
+from cr.snapshot_cache import load_or_build, snapshot_key
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Create a tiny repository and point the cache at a temp directory."""
+    monkeypatch.setattr(snapshot_cache, "SNAPSHOTS_DIR", tmp_path / "cache")
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "main.py").write_text("def main():\n    pass\n")
+    (root / "README.md").write_text("# Demo\n")
+    return root
+
+
+class TestSnapshotCache:
+    """Tests for load_or_build and snapshot_key."""
+
+    def test_second_load_uses_cache(self, repo, monkeypatch):
+        """An unchanged repo is loaded from disk instead of rebuilt."""
+        first = load_or_build(repo)
+        assert first.repo_info["total_files"] == 2
+
+        def fail(_):
+            raise AssertionError("snapshot should come from the cache")
+
+        monkeypatch.setattr(snapshot_cache, "build_snapshot", fail)
+        second = load_or_build(repo)
+
+        assert second.file_tree == first.file_tree
+        assert second.files == first.files
+
+    def test_key_changes_when_file_changes(self, repo):
+        """Editing a file invalidates the cache key."""
+        before = snapshot_key(repo)
+        target = repo / "main.py"
+        target.write_text("def main():\n    return 1\n")
+        stat = target.stat()
+        os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert snapshot_key(repo) != before
+
+    def test_key_ignores_ignored_files(self, repo):
+        """Files excluded from the snapshot don't affect the key."""
+        before = snapshot_key(repo)
+        (repo / "node_modules").mkdir()
+        (repo / "node_modules" / "dep.js").write_text("module.exports = 1;\n")
+
+        assert snapshot_key(repo) == before
+
+    def test_exclude_globs_and_priority_order(self, repo, monkeypatch):
+        """User exclude globs drop files; priority files sort first."""
+        import cr.config as config
+
+        monkeypatch.setattr(config, "_EXCLUDE_RE", config._compile_globs(["docs/*"]))
+        (repo / "docs").mkdir()
+        (repo / "docs" / "guide.md").write_text("# Guide\n")
+        (repo / "notes.txt").write_text("todo\n")
+
+        snapshot = snapshot_cache.build_snapshot(repo)
+
+        assert snapshot.file_tree == ["README.md", "main.py", "notes.txt"]
+
+    def test_total_cap_follows_priority_order(self, repo, monkeypatch):
+        """Parallel reads still fill MAX_TOTAL_BYTES in sorted order."""
+        import cr.snapshot as snapshot
+
+        (repo / "notes.txt").write_text("x" * 100)
+        (repo / "blob.dat").write_bytes(b"\x00" * 10)
+        monkeypatch.setattr(snapshot, "MAX_TOTAL_BYTES", 40)
+
+        result = snapshot.build_snapshot(repo)
+
+        assert list(result.files) == ["README.md", "main.py"]
+        assert result.file_tree == ["README.md", "main.py", "blob.dat", "notes.txt"]
+
+    def test_missing_repo_raises(self, tmp_path):
+        """A missing repository path still raises ValueError."""
+        with pytest.raises(ValueError, match="does not exist"):
+            load_or_build(tmp_path / "missing")
+
+    def test_simple_dict_built_once(self, repo):
+        """to_simple_dict is built once and shares each file's stored text."""
+        snapshot = load_or_build(repo)
+
+        simple = snapshot.to_simple_dict()
+
+        assert simple["main.py"] == "def main():\n    pass\n"
+        assert simple["main.py"] is snapshot.files["main.py"]["text"]
+        assert snapshot.to_simple_dict() is simple
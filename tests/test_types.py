@@ -0,0 +1,26 @@
+"""Tests for core type definitions."""
+
+import dataclasses
+
+import pytest
+
+from cr.types import Citation
+
+
+class TestCitationParse:
+    """Tests for Citation.parse."""
+
+    def test_parses_ranges_and_single_lines(self):
+        """Ranges and single lines both parse; other strings return None."""
+        assert Citation.parse("cr/app.py:10-20") == Citation(path="cr/app.py", start_line=10, end_line=20)
+        assert Citation.parse("C:/repo/app.py:7") == Citation(path="C:/repo/app.py", start_line=7, end_line=7)
+        assert Citation.parse("no-line-number") is None
+        assert Citation.parse("app.py:ten") is None
+
+    def test_results_are_cached_and_frozen(self):
+        """Repeated strings share one immutable Citation."""
+        first = Citation.parse("cr/cached.py:1-2")
+
+        assert Citation.parse("cr/cached.py:1-2") is first
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            first.start_line = 5